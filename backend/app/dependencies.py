@@ -17,6 +17,8 @@ from app.domain.repositories.user_repository import IUserRepository
 from app.infrastructure.repositories.sqlalchemy_user_repository import SqlalchemyUserRepository
 from app.domain.repositories.asset_data_source import IAssetDataSource
 from app.infrastructure.services.google_sheets_asset_data_source import GoogleSheetsAssetDataSource
+from app.domain.repositories.async_asset_data_source import IAsyncAssetDataSource
+from app.infrastructure.services.async_google_sheets_asset_data_source import AsyncGoogleSheetsAssetDataSource
 
 # --- USE CASES ---
 from app.domain.use_cases.analysis.get_dashboard_data import GetDashboardDataUseCase
@@ -27,6 +29,7 @@ from app.domain.use_cases.analysis.get_sheet_names import GetSheetNamesUseCase
 from app.domain.use_cases.analysis.get_download_file import GetDownloadFileUseCase
 from app.domain.use_cases.analysis.get_master_data import GetMasterDataUseCase
 from app.domain.use_cases.analysis.query_assets import QueryAssetsUseCase
+from app.domain.use_cases.analysis.query_assets_batch import QueryAssetsBatchUseCase
 from app.domain.use_cases.analysis.query_resource import QueryResourceUseCase
 from app.domain.use_cases.history.get_all_history import GetAllHistoryUseCase
 from app.domain.use_cases.history.delete_history import DeleteHistoryUseCase
@@ -44,11 +47,24 @@ from app.infrastructure.services.chart_service import ChartService
 from app.infrastructure.services.document_analyzer import DocumentAnalyzer
 from app.infrastructure.services.auth_service import IAuthService, FirebaseAuthService
 from app.infrastructure.services.download_service import DownloadService
+from app.infrastructure.services.sheet_cache_service import SheetCacheService
+from app.infrastructure.services.query_result_cache_service import QueryResultCacheService
+from app.infrastructure.services.asset_query_engine import IAssetQueryEngine, create_query_engine
+from app.infrastructure.services.document_encoder import IDocumentEncoder, create_document_encoder
+from app.infrastructure.services.analysis_result_cache_service import AnalysisResultCacheService
+from app.infrastructure.services.incremental_analysis_service import IncrementalAnalysisService
 
 # --- INSTANCE SINGLETON / GLOBAL ---
 preview_state_service_instance = PreviewStateService()
 chart_service_instance = ChartService()
-asset_data_source_instance = GoogleSheetsAssetDataSource()
+sheet_cache_service_instance = SheetCacheService()
+query_result_cache_instance = QueryResultCacheService()
+query_engine_instance = create_query_engine()
+document_encoder_instance = create_document_encoder()
+analysis_result_cache_instance = AnalysisResultCacheService()
+incremental_analysis_instance = IncrementalAnalysisService()
+asset_data_source_instance = GoogleSheetsAssetDataSource(sheet_cache_service_instance)
+async_asset_data_source_instance = AsyncGoogleSheetsAssetDataSource(sheet_cache_service_instance)
 document_analyzer_instance = DocumentAnalyzer()
 auth_service_instance = FirebaseAuthService()
 download_service_instance = DownloadService()
@@ -63,9 +79,15 @@ class AppContainer:
         self.preview_state = preview_state_service_instance
         self.chart_service = chart_service_instance
         self.asset_data_source = asset_data_source_instance
+        self.async_asset_data_source = async_asset_data_source_instance
         self.document_analyzer = document_analyzer_instance
         self.auth_service = auth_service_instance
         self.download_service = download_service_instance
+        self.query_result_cache = query_result_cache_instance
+        self.query_engine = query_engine_instance
+        self.document_encoder = document_encoder_instance
+        self.analysis_result_cache = analysis_result_cache_instance
+        self.incremental_analysis = incremental_analysis_instance
 
     def get_use_case(self, use_case_name: str, db_session: Session):
         """
@@ -77,14 +99,22 @@ class AppContainer:
 
         use_case_map = {
             "get_dashboard_data": GetDashboardDataUseCase(history_repo, file_repo, self.preview_state, self.chart_service),
-            "trigger_analysis": TriggerAnalysisUseCase(self.asset_data_source, self.document_analyzer, self.preview_state, self.chart_service),
-            "save_latest_analysis": SaveLatestAnalysisUseCase(history_repo, file_repo, self.preview_state),
+            "trigger_analysis": TriggerAnalysisUseCase(
+                self.asset_data_source, self.document_analyzer, self.preview_state, self.chart_service,
+                self.document_encoder, self.analysis_result_cache, self.incremental_analysis
+            ),
+            "save_latest_analysis": SaveLatestAnalysisUseCase(history_repo, file_repo, self.preview_state, self.incremental_analysis),
             "get_all_history": GetAllHistoryUseCase(history_repo, file_repo),
             "delete_history": DeleteHistoryUseCase(history_repo, file_repo),
             "get_stats_data": GetStatsDataUseCase(history_repo, file_repo, self.preview_state, self.chart_service),
-            "get_sheet_names": GetSheetNamesUseCase(self.asset_data_source),
-            "get_master_data": GetMasterDataUseCase(self.asset_data_source),
-            "query_assets": QueryAssetsUseCase(self.asset_data_source),
+            "get_sheet_names": GetSheetNamesUseCase(self.asset_data_source, self.async_asset_data_source),
+            "get_master_data": GetMasterDataUseCase(self.asset_data_source, self.async_asset_data_source),
+            "query_assets": QueryAssetsUseCase(
+                self.asset_data_source, self.async_asset_data_source, self.query_result_cache, self.query_engine
+            ),
+            "query_assets_batch": QueryAssetsBatchUseCase(QueryAssetsUseCase(
+                self.asset_data_source, self.async_asset_data_source, self.query_result_cache, self.query_engine
+            )),
             "query_resource": QueryResourceUseCase(file_repo),
             "get_resources": GetResourcesUseCase(file_repo),
             "get_prompts": GetPromptsUseCase(),
@@ -116,6 +146,9 @@ def get_chart_service() -> ChartService:
 def get_asset_data_source() -> IAssetDataSource:
     return asset_data_source_instance
 
+def get_async_asset_data_source() -> IAsyncAssetDataSource:
+    return async_asset_data_source_instance
+
 def get_document_analyzer() -> DocumentAnalyzer:
     return document_analyzer_instance
 
@@ -125,6 +158,21 @@ def get_auth_service() -> IAuthService:
 def get_download_service() -> DownloadService:
     return download_service_instance
 
+def get_query_result_cache() -> QueryResultCacheService:
+    return query_result_cache_instance
+
+def get_query_engine() -> IAssetQueryEngine:
+    return query_engine_instance
+
+def get_document_encoder() -> IDocumentEncoder:
+    return document_encoder_instance
+
+def get_analysis_result_cache() -> AnalysisResultCacheService:
+    return analysis_result_cache_instance
+
+def get_incremental_analysis() -> IncrementalAnalysisService:
+    return incremental_analysis_instance
+
 def get_history_repository(db: Session = Depends(get_db)) -> IHistoryRepository:
     return SqlalchemyHistoryRepository(db)
     
@@ -148,16 +196,23 @@ def trigger_analysis_use_case(
     asset_data_source: IAssetDataSource = Depends(get_asset_data_source),
     document_analyzer: DocumentAnalyzer = Depends(get_document_analyzer),
     preview_state_service: PreviewStateService = Depends(get_preview_state_service),
-    chart_service: ChartService = Depends(get_chart_service)
+    chart_service: ChartService = Depends(get_chart_service),
+    document_encoder: IDocumentEncoder = Depends(get_document_encoder),
+    analysis_result_cache: AnalysisResultCacheService = Depends(get_analysis_result_cache),
+    incremental_analysis: IncrementalAnalysisService = Depends(get_incremental_analysis)
 ) -> TriggerAnalysisUseCase:
-    return TriggerAnalysisUseCase(asset_data_source, document_analyzer, preview_state_service, chart_service)
+    return TriggerAnalysisUseCase(
+        asset_data_source, document_analyzer, preview_state_service, chart_service,
+        document_encoder, analysis_result_cache, incremental_analysis
+    )
 
 def save_latest_analysis_use_case(
     history_repo: IHistoryRepository = Depends(get_history_repository),
     file_repo: IFileRepository = Depends(get_file_repository),
-    preview_state_service: PreviewStateService = Depends(get_preview_state_service)
+    preview_state_service: PreviewStateService = Depends(get_preview_state_service),
+    incremental_analysis: IncrementalAnalysisService = Depends(get_incremental_analysis)
 ) -> SaveLatestAnalysisUseCase:
-    return SaveLatestAnalysisUseCase(history_repo, file_repo, preview_state_service)
+    return SaveLatestAnalysisUseCase(history_repo, file_repo, preview_state_service, incremental_analysis)
 
 def get_all_history_use_case(
     history_repo: IHistoryRepository = Depends(get_history_repository),
@@ -180,9 +235,10 @@ def get_stats_data_use_case(
     return GetStatsDataUseCase(history_repo, file_repo, preview_state_service, chart_service)
 
 def get_sheet_names_use_case(
-    asset_data_source: IAssetDataSource = Depends(get_asset_data_source)
+    asset_data_source: IAssetDataSource = Depends(get_asset_data_source),
+    async_asset_data_source: IAsyncAssetDataSource = Depends(get_async_asset_data_source)
 ) -> GetSheetNamesUseCase:
-    return GetSheetNamesUseCase(asset_data_source)
+    return GetSheetNamesUseCase(asset_data_source, async_asset_data_source)
 
 def get_download_file_use_case(
     db: Session = Depends(get_db),
@@ -192,14 +248,23 @@ def get_download_file_use_case(
     return GetDownloadFileUseCase(db, asset_data_source, download_service)
 
 def get_master_data_use_case(
-    asset_data_source: IAssetDataSource = Depends(get_asset_data_source)
+    asset_data_source: IAssetDataSource = Depends(get_asset_data_source),
+    async_asset_data_source: IAsyncAssetDataSource = Depends(get_async_asset_data_source)
 ) -> GetMasterDataUseCase:
-    return GetMasterDataUseCase(asset_data_source)
+    return GetMasterDataUseCase(asset_data_source, async_asset_data_source)
 
 def query_assets_use_case(
-    asset_data_source: IAssetDataSource = Depends(get_asset_data_source)
+    asset_data_source: IAssetDataSource = Depends(get_asset_data_source),
+    async_asset_data_source: IAsyncAssetDataSource = Depends(get_async_asset_data_source),
+    result_cache: QueryResultCacheService = Depends(get_query_result_cache),
+    query_engine: IAssetQueryEngine = Depends(get_query_engine)
 ) -> QueryAssetsUseCase:
-    return QueryAssetsUseCase(asset_data_source)
+    return QueryAssetsUseCase(asset_data_source, async_asset_data_source, result_cache, query_engine)
+
+def query_assets_batch_use_case(
+    query_assets: QueryAssetsUseCase = Depends(query_assets_use_case)
+) -> QueryAssetsBatchUseCase:
+    return QueryAssetsBatchUseCase(query_assets)
 
 def query_resource_use_case(
     file_repo: IFileRepository = Depends(get_file_repository)
@@ -12,4 +12,6 @@ class History:
     upload_date: datetime
     cycle_assets: Optional[List[Dict[str, Any]]] = field(default_factory=list) 
     user_email: Optional[str] = None
-    sheet_name: Optional[str] = None
\ No newline at end of file
+    sheet_name: Optional[str] = None
+    # Rollup keuangan per AREA saat analisis disimpan (None untuk riwayat lama)
+    financial_summary: Optional[List[Dict[str, Any]]] = None
\ No newline at end of file
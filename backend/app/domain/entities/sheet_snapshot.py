@@ -0,0 +1,111 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+import pandas as pd
+
+class SnapshotArtifacts(dict):
+    """
+    Wadah artifact per versi sheet (dict nama -> artifact). Setiap artifact baru diukur dengan
+    'measure' lalu ukurannya dilaporkan ke 'on_added', sehingga pemilik (entri cache) dapat
+    menghitungnya terhadap batas memori. Artifact yang memegang sumber daya (mis. koneksi
+    database) mendaftarkan 'dispose' yang dipanggil saat pemiliknya dibuang.
+    """
+
+    def __init__(
+        self,
+        measure: Optional[Callable[[Any], int]] = None,
+        on_added: Optional[Callable[[int], None]] = None
+    ):
+        super().__init__()
+        self.measure = measure
+        self.on_added = on_added
+        self.size_bytes = 0
+        self._disposers: Dict[str, Callable[[Any], None]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(
+        self,
+        name: str,
+        builder: Callable[[], Any],
+        size_of: Optional[Callable[[Any], int]] = None,
+        dispose: Optional[Callable[[Any], None]] = None
+    ) -> Any:
+        """
+        Artifact 'name', dibangun dengan 'builder' jika belum ada. 'size_of' menggantikan 'measure'
+        untuk artifact ini, 'dispose' melepas sumber dayanya saat wadah ini dibuang.
+        """
+        if name in self:
+            return self[name]
+        value = builder()
+        with self._lock:
+            # Jika dua thread membangun bersamaan, hasil pertama yang dipakai semua
+            existing = self.get(name)
+            if existing is None:
+                self[name] = value
+                if dispose:
+                    self._disposers[name] = dispose
+        if existing is not None:
+            if dispose:
+                self._dispose_value(name, value, dispose)
+            return existing
+        measure = size_of or self.measure
+        size = int(measure(value)) if measure else 0
+        with self._lock:
+            self.size_bytes += size
+            on_added = self.on_added
+        if on_added and size:
+            on_added(size)
+        return value
+
+    def dispose(self):
+        """Melepas sumber daya artifact lalu mengosongkan wadah; pemanggil berikutnya membangun ulang."""
+        with self._lock:
+            disposers = [(name, self.get(name), dispose) for name, dispose in self._disposers.items()]
+            self._disposers.clear()
+            self.clear()
+            self.size_bytes = 0
+            self.on_added = None
+        for name, value, dispose in disposers:
+            self._dispose_value(name, value, dispose)
+
+    @staticmethod
+    def _dispose_value(name: str, value: Any, dispose: Callable[[Any], None]):
+        try:
+            dispose(value)
+        except Exception as e:
+            logging.warning(f"[CACHE] Gagal melepas artifact '{name}': {e}")
+
+@dataclass
+class SheetSnapshot:
+    """
+    Mewakili isi satu sheet pada satu versi konten.
+    'dataframe' dipakai bersama oleh semua pemanggil, sehingga tidak boleh dimodifikasi.
+    'artifacts' menampung turunan data (frame ternormalisasi, indeks, dll.) yang
+    dibangun sekali per versi dan ikut tersimpan di cache selama versinya sama.
+    """
+    spreadsheet_id: str
+    sheet_name: str
+    version: str
+    dataframe: pd.DataFrame
+    artifacts: Dict[str, Any] = field(default_factory=dict)
+
+    def get_artifact(
+        self,
+        name: str,
+        builder: Callable[[], Any],
+        size_of: Optional[Callable[[Any], int]] = None,
+        dispose: Optional[Callable[[Any], None]] = None
+    ) -> Any:
+        """
+        Mengambil artifact berdasarkan nama, membangunnya dengan 'builder' jika belum ada.
+        'size_of' dipakai untuk artifact yang ukurannya tidak bisa diperkirakan dari objeknya
+        (mis. koneksi database); ukuran dilaporkan ke cache jika artifacts berasal dari cache.
+        'dispose' dipanggil saat entri cache pemilik artifact dibuang (mis. menutup koneksi).
+        """
+        if isinstance(self.artifacts, SnapshotArtifacts):
+            return self.artifacts.get_or_build(name, builder, size_of, dispose)
+        if name not in self.artifacts:
+            # setdefault: jika dua thread membangun bersamaan, hasil pertama yang dipakai semua
+            self.artifacts.setdefault(name, builder())
+        return self.artifacts[name]
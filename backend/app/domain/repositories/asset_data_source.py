@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List, Optional
 import pandas as pd
 
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+
 class IAssetDataSource(ABC):
     """
     Interface abstrak untuk sumber data aset.
@@ -10,9 +12,40 @@ class IAssetDataSource(ABC):
     """
 
     @abstractmethod
-    def fetch_data(self, sheet_name: str | None) -> pd.DataFrame:
+    def fetch_data(
+        self,
+        sheet_name: str | None,
+        spreadsheet_id: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         """
         Mengambil data aset sebagai Pandas DataFrame dari sumber yang ditentukan.
+        Jika 'columns' diisi, hanya kolom tersebut yang diambil (nama kolom header,
+        tidak peka huruf besar); kolom yang tidak ada diabaikan.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_snapshot(self, sheet_name: str | None, spreadsheet_id: Optional[str] = None) -> SheetSnapshot:
+        """
+        Mengambil sheet sebagai SheetSnapshot (data + versi + artifacts per versi) tanpa menyalin.
+        DataFrame di dalamnya dipakai bersama sehingga tidak boleh dimodifikasi.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_many(
+        self,
+        sheet_names: Optional[List[str]] = None,
+        spreadsheet_id: Optional[str] = None,
+        force_refresh: bool = False
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Mengambil beberapa sheet sekaligus dalam satu round trip.
+        Mengembalikan dict nama sheet -> DataFrame; sheet yang tidak ada tidak disertakan.
+        Jika 'sheet_names' None, seluruh sheet pada sumber diambil.
+        Dengan force_refresh=True, sheet selalu diunduh ulang walaupun masih segar di cache;
+        artifacts tetap dipakai ulang jika isi sheet ternyata tidak berubah.
         """
         raise NotImplementedError
 
@@ -21,4 +54,12 @@ class IAssetDataSource(ABC):
         """
         Mengambil daftar nama sheet yang tersedia dari sumber data.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    def invalidate_cache(self, sheet_name: Optional[str] = None, spreadsheet_id: Optional[str] = None) -> None:
+        """
+        Membuang data sheet yang di-cache sehingga pembacaan berikutnya mengambil data segar.
+        Tanpa argumen, seluruh cache dibersihkan.
+        """
+        raise NotImplementedError
@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+
+class IAsyncAssetDataSource(ABC):
+    """
+    Varian async dari IAssetDataSource.
+    Dipakai oleh jalur kode async (misalnya handler WebSocket MCP) agar pengambilan
+    data tidak memblokir event loop. Bentuk DataFrame yang dihasilkan identik.
+    """
+
+    @abstractmethod
+    async def fetch_data(
+        self,
+        sheet_name: Optional[str],
+        spreadsheet_id: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Mengambil data aset sebagai Pandas DataFrame dari sumber yang ditentukan.
+        Jika 'columns' diisi, hanya kolom tersebut yang diambil.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def fetch_snapshot(self, sheet_name: Optional[str], spreadsheet_id: Optional[str] = None) -> SheetSnapshot:
+        """
+        Mengambil sheet sebagai SheetSnapshot (data + versi + artifacts per versi) tanpa menyalin.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def fetch_many(
+        self,
+        sheet_names: Optional[List[str]] = None,
+        spreadsheet_id: Optional[str] = None,
+        force_refresh: bool = False
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Mengambil beberapa sheet sekaligus dalam satu round trip.
+        Mengembalikan dict nama sheet -> DataFrame; sheet yang tidak ada tidak disertakan.
+        Dengan force_refresh=True, sheet selalu diunduh ulang walaupun masih segar di cache.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_sheet_names(self, spreadsheet_id: Optional[str] = None) -> List[str]:
+        """
+        Mengambil daftar nama sheet yang tersedia dari sumber data.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def invalidate_cache(self, sheet_name: Optional[str] = None, spreadsheet_id: Optional[str] = None) -> None:
+        """
+        Membuang data sheet yang di-cache sehingga pembacaan berikutnya mengambil data segar.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def aclose(self) -> None:
+        """
+        Menutup koneksi HTTP yang dipakai bersama (dipanggil saat aplikasi shutdown).
+        """
+        raise NotImplementedError
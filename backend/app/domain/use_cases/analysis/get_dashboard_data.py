@@ -6,6 +6,7 @@ from app.domain.repositories.history_repository import IHistoryRepository
 from app.domain.repositories.file_repository import IFileRepository
 from app.infrastructure.services.preview_state_service import PreviewStateService 
 from app.infrastructure.services.chart_service import ChartService
+from app.infrastructure.services.financial_rollup_service import FinancialRollupService
 
 class GetDashboardDataUseCase:
     """Use case untuk mengambil data yang akan ditampilkan di dashboard utama."""
@@ -20,6 +21,7 @@ class GetDashboardDataUseCase:
         self.file_repo = file_repo
         self.preview_state_service = preview_state_service
         self.chart_service = chart_service
+        self.financial_rollup = FinancialRollupService()
 
     def _filter_by_area(self, df: pd.DataFrame, area: str | None) -> pd.DataFrame:
         """Helper untuk memfilter DataFrame berdasarkan area."""
@@ -57,6 +59,8 @@ class GetDashboardDataUseCase:
                 "available_areas": available_areas,
                 "is_temporary": True,
                 "cycle_assets_table": latest_result["cycle_assets_table"],
+                # Rollup keuangan dari analisis terakhir, tanpa menghitung ulang
+                "financial_summary": self.financial_rollup.filter_areas(latest_result.get("financial_summary") or [], area),
                 "timestamp": "temporary"
             }
 
@@ -79,6 +83,11 @@ class GetDashboardDataUseCase:
         available_areas = ["Semua Area"]
         if 'AREA' in full_df.columns:
             available_areas.extend(sorted(full_df['AREA'].dropna().unique().tolist()))
+
+        # Rollup tersimpan bersama riwayat; riwayat lama (sebelum kolom ini ada) dihitung dari file data
+        financial_summary = latest_history.financial_summary
+        if financial_summary is None:
+            financial_summary = self.financial_rollup.build(full_df)
         
         return {
             "data_available": True,
@@ -88,5 +97,6 @@ class GetDashboardDataUseCase:
             "available_areas": available_areas,
             "is_temporary": False,
             "cycle_assets_table": latest_history.cycle_assets,
+            "financial_summary": self.financial_rollup.filter_areas(financial_summary, area),
             "timestamp": latest_history.timestamp
         }
\ No newline at end of file
@@ -7,6 +7,7 @@ import logging
 
 from app.domain.repositories.asset_data_source import IAssetDataSource
 from app.infrastructure.services.download_service import DownloadService
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
 
 class GetDownloadFileUseCase:
     """Use case untuk mempersiapkan dan membuat file unduhan (CSV/XLSX)."""
@@ -19,6 +20,7 @@ class GetDownloadFileUseCase:
         self.db = db
         self.asset_data_source = asset_data_source
         self.download_service = download_service
+        self.normalizer = AssetFrameNormalizer()
 
     def execute(
         self,
@@ -33,7 +35,9 @@ class GetDownloadFileUseCase:
         Mengembalikan buffer file, nama file, dan tipe media.
         """
         if source == 'temporary':
-            df = self.asset_data_source.fetch_data(sheet_name)
+            # Memakai frame kanonik yang sudah di-cache per versi sheet, tanpa kolom internal
+            snapshot = self.asset_data_source.fetch_snapshot(sheet_name)
+            df = self.normalizer.display_frame(self.normalizer.from_snapshot(snapshot))
             if df.empty:
                 raise ValueError(f"Tidak ada data sementara untuk diunduh dari sheet '{sheet_name or 'Default'}'.")
             
@@ -51,7 +55,7 @@ class GetDownloadFileUseCase:
             raise ValueError("Sumber data tidak valid. Gunakan 'temporary' atau 'history'.")
 
         # 2. Normalisasi Kolom dan Filtering Area
-        df.columns = [str(col).strip().upper() for col in df.columns]
+        df = self.normalizer.normalize_columns(df)
         
         if area and area != "Semua Area" and 'AREA' in df.columns:
             df = df[df['AREA'] == area].copy()
@@ -60,9 +64,7 @@ class GetDownloadFileUseCase:
             raise ValueError(f"Tidak ada data yang cocok dengan kriteria area '{area}'.")
 
         # --- PERBAIKAN UTAMA: Kembalikan Label (Rp) untuk File Unduhan ---
-        for col in df.columns:
-            if 'NILAI ASET' in col:
-                df.rename(columns={col: 'NILAI ASET (Rp)'}, inplace=True)
-                break
+        if self.normalizer.COL_NILAI_ASET in df.columns:
+            df = df.rename(columns={self.normalizer.COL_NILAI_ASET: 'NILAI ASET (Rp)'})
 
         return self.download_service.create_file_buffer(df, file_format, filename_part)
\ No newline at end of file
@@ -1,28 +1,106 @@
 import os
+import asyncio
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+from app.domain.entities.sheet_snapshot import SheetSnapshot
 from app.domain.repositories.asset_data_source import IAssetDataSource
+from app.domain.repositories.async_asset_data_source import IAsyncAssetDataSource
+from app.infrastructure.services.columnar_encoder import ColumnarEncoder
+from app.infrastructure.services.result_paginator import InvalidCursorError, ResultPaginator
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
 
 class GetMasterDataUseCase:
     """Use case untuk mengambil seluruh data mentah dari sumber tertentu."""
-    def __init__(self, asset_data_source: IAssetDataSource):
+    def __init__(
+        self,
+        asset_data_source: IAssetDataSource,
+        async_asset_data_source: Optional[IAsyncAssetDataSource] = None
+    ):
         self.asset_data_source = asset_data_source
+        self.async_asset_data_source = async_asset_data_source
+        self.paginator = ResultPaginator()
+        self.columnar_encoder = ColumnarEncoder()
 
-    def execute(self, sheet_name: Optional[str] = None, source: str = 'master') -> List[Dict[str, Any]]:
+    def _resolve_target(self, source: str, sheet_name: Optional[str]) -> Tuple[Optional[str], str]:
+        """Menentukan ID spreadsheet dan nama sheet berdasarkan sumber (master/siklus)."""
+        if source == 'siklus':
+            return os.getenv("GOOGLE_SHEET_ID_SIKLUS"), sheet_name or 'CYCLE-1-YEAR-2026'
+        return os.getenv("GOOGLE_SHEET_ID_MASTER"), sheet_name or 'MASTER-SHEET'
+
+    def execute(
+        self,
+        sheet_name: Optional[str] = None,
+        source: str = 'master',
+        columns: Optional[List[str]] = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        format: Optional[str] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Mengambil data mentah dan mengembalikannya dalam bentuk list of dict (JSON-ready).
+        Jika 'columns' diisi, hanya kolom tersebut yang diambil dari sheet.
+        Jika 'page_size'/'cursor' diisi, hasil dikembalikan per halaman: {"data": [...], "page": {...}}.
+        Dengan format='columnar', data berbentuk kolom ({"columns": [...], "data": [...]}), bukan list of dict.
         """
-        if source == 'siklus':
-            target_id = os.getenv("GOOGLE_SHEET_ID_SIKLUS")
-            default_sheet = 'CYCLE-1-YEAR-2026' 
-        else:
-            target_id = os.getenv("GOOGLE_SHEET_ID_MASTER")
-            default_sheet = 'MASTER-SHEET'
-
-        target_sheet = sheet_name or default_sheet
-        
-        df = self.asset_data_source.fetch_data(target_sheet, spreadsheet_id=target_id)
-        
+        target_id, target_sheet = self._resolve_target(source, sheet_name)
+        if page_size is None and not cursor:
+            df = self.asset_data_source.fetch_data(target_sheet, spreadsheet_id=target_id, columns=columns)
+            return self._to_records(df, format)
+
+        # Paginasi memakai snapshot cache (versi konten) agar cursor terikat pada versi sheet
+        snapshot = self.asset_data_source.fetch_snapshot(target_sheet, spreadsheet_id=target_id)
+        return self._to_page(snapshot, target_sheet, columns, page_size, cursor, format)
+
+    async def execute_async(
+        self,
+        sheet_name: Optional[str] = None,
+        source: str = 'master',
+        columns: Optional[List[str]] = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        format: Optional[str] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """Varian async: data diambil tanpa memblokir event loop."""
+        if not self.async_asset_data_source:
+            return await asyncio.to_thread(
+                self.execute, sheet_name=sheet_name, source=source, columns=columns,
+                page_size=page_size, cursor=cursor, format=format
+            )
+
+        target_id, target_sheet = self._resolve_target(source, sheet_name)
+        if page_size is None and not cursor:
+            df = await self.async_asset_data_source.fetch_data(target_sheet, spreadsheet_id=target_id, columns=columns)
+            return await asyncio.to_thread(self._to_records, df, format)
+
+        snapshot = await self.async_asset_data_source.fetch_snapshot(target_sheet, spreadsheet_id=target_id)
+        return await asyncio.to_thread(self._to_page, snapshot, target_sheet, columns, page_size, cursor, format)
+
+    def _to_page(
+        self,
+        snapshot: SheetSnapshot,
+        target_sheet: str,
+        columns: Optional[List[str]],
+        page_size: Optional[int],
+        cursor: Optional[str],
+        format: Optional[str] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        fingerprint = self.paginator.fingerprint({"sheet": target_sheet, "columns": columns})
+        try:
+            page_request = self.paginator.resolve(page_size, cursor, snapshot.version, fingerprint)
+        except InvalidCursorError as e:
+            return [{"error": str(e)}]
+
+        df = snapshot.dataframe
+        page_info = self.paginator.page_info(page_request, len(df), snapshot.version, fingerprint)
+        # Potong halaman dulu, baru proyeksikan kolom, agar hanya baris halaman ini yang disalin
+        page = df.iloc[page_request.offset:page_request.offset + page_request.page_size]
+        if columns and not page.empty:
+            page = SheetValuesParser().project(page, columns)
+        return {"data": self._to_records(page, format), "page": page_info}
+
+    def _to_records(self, df: pd.DataFrame, format: Optional[str] = None) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        if ColumnarEncoder.wants_columnar(format):
+            return self.columnar_encoder.encode(df)
         if df.empty:
             return []
             
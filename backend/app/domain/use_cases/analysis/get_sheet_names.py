@@ -1,20 +1,33 @@
 import os
+import asyncio
 from typing import List, Optional
 from app.domain.repositories.asset_data_source import IAssetDataSource
+from app.domain.repositories.async_asset_data_source import IAsyncAssetDataSource
 
 class GetSheetNamesUseCase:
     """Use case untuk mendapatkan daftar nama sheet dari sumber tertentu."""
-    def __init__(self, asset_data_source: IAssetDataSource):
+    def __init__(
+        self,
+        asset_data_source: IAssetDataSource,
+        async_asset_data_source: Optional[IAsyncAssetDataSource] = None
+    ):
         self.asset_data_source = asset_data_source
+        self.async_asset_data_source = async_asset_data_source
+
+    def _resolve_spreadsheet_id(self, source: str) -> Optional[str]:
+        if source == 'siklus':
+            return os.getenv("GOOGLE_SHEET_ID_SIKLUS")
+        return os.getenv("GOOGLE_SHEET_ID_MASTER")
 
     def execute(self, source: str = 'master') -> List[str]:
         """
         Menjalankan logika pengambilan nama sheet.
         source: 'master' atau 'siklus'
         """
-        if source == 'siklus':
-            target_id = os.getenv("GOOGLE_SHEET_ID_SIKLUS")
-        else:
-            target_id = os.getenv("GOOGLE_SHEET_ID_MASTER")
+        return self.asset_data_source.get_sheet_names(spreadsheet_id=self._resolve_spreadsheet_id(source))
 
-        return self.asset_data_source.get_sheet_names(spreadsheet_id=target_id)
\ No newline at end of file
+    async def execute_async(self, source: str = 'master') -> List[str]:
+        """Varian async: nama sheet diambil tanpa memblokir event loop."""
+        if not self.async_asset_data_source:
+            return await asyncio.to_thread(self.execute, source=source)
+        return await self.async_asset_data_source.get_sheet_names(spreadsheet_id=self._resolve_spreadsheet_id(source))
\ No newline at end of file
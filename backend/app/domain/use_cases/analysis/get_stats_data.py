@@ -6,6 +6,7 @@ from app.domain.repositories.history_repository import IHistoryRepository
 from app.domain.repositories.file_repository import IFileRepository
 from app.infrastructure.services.preview_state_service import PreviewStateService
 from app.infrastructure.services.chart_service import ChartService
+from app.infrastructure.services.columnar_encoder import ColumnarEncoder
 
 class GetStatsDataUseCase:
     """Use case untuk mengambil data statistik detail untuk halaman Statistik."""
@@ -20,6 +21,7 @@ class GetStatsDataUseCase:
         self.file_repo = file_repo
         self.preview_state_service = preview_state_service
         self.chart_service = chart_service
+        self.columnar_encoder = ColumnarEncoder()
 
     def _filter_by_area(self, df: pd.DataFrame, area: str | None) -> pd.DataFrame:
         """Helper untuk memfilter DataFrame berdasarkan area."""
@@ -31,30 +33,31 @@ class GetStatsDataUseCase:
             return df[df['AREA'] == area].copy()
         return df
 
-    def execute(self, timestamp: Optional[str] = None, area: Optional[str] = None) -> Dict[str, Any]:
+    def execute(self, timestamp: Optional[str] = None, area: Optional[str] = None, format: Optional[str] = None) -> Dict[str, Any]:
         """
         Menjalankan logika untuk mendapatkan data statistik.
         Jika timestamp tidak diberikan, ambil data terbaru yang tersedia.
         Jika diberikan, ambil dari riwayat yang spesifik.
+        Dengan format='columnar', table_data dikembalikan dalam bentuk kolom.
         """
         if timestamp and timestamp != "temporary":
-            return self._get_specific_history(timestamp, area)
+            return self._get_specific_history(timestamp, area, format)
         else:
-            return self._get_latest_available_data(area)
+            return self._get_latest_available_data(area, format)
 
-    def _get_latest_available_data(self, area: str | None) -> Dict[str, Any]:
+    def _get_latest_available_data(self, area: str | None, format: Optional[str] = None) -> Dict[str, Any]:
         """Mengambil data terbaru, memprioritaskan state preview."""
         latest_result = self.preview_state_service.get()
         if latest_result and latest_result.get("data_available"):
-            return self._format_preview_data(latest_result, area)
+            return self._format_preview_data(latest_result, area, format)
 
         latest_history = self.history_repo.get_latest()
         if not latest_history:
             raise FileNotFoundError("Tidak ada data analisis yang tersedia, baik sementara maupun tersimpan.")
         
-        return self._get_specific_history(latest_history.timestamp, area)
+        return self._get_specific_history(latest_history.timestamp, area, format)
 
-    def _get_specific_history(self, timestamp: str, area: str | None) -> Dict[str, Any]:
+    def _get_specific_history(self, timestamp: str, area: str | None, format: Optional[str] = None) -> Dict[str, Any]:
         """Mengambil dan memformat data dari riwayat berdasarkan timestamp."""
         target_history = self.history_repo.get_by_timestamp(timestamp)
         if not target_history:
@@ -80,7 +83,7 @@ class GetStatsDataUseCase:
         return {
             "data_available": True,
             "summary_text": target_history.summary,
-            "table_data": df.to_dict(orient='records'),
+            "table_data": self._table_data(df, format),
             "chart_data": self.chart_service.create_chart_data(df),
             "timestamp": target_history.timestamp,
             "sheet_name": target_history.sheet_name,
@@ -89,7 +92,7 @@ class GetStatsDataUseCase:
             "is_temporary": False
         }
 
-    def _format_preview_data(self, preview_data: Dict, area: str | None) -> Dict[str, Any]:
+    def _format_preview_data(self, preview_data: Dict, area: str | None, format: Optional[str] = None) -> Dict[str, Any]:
         """Memformat data dari state preview."""
         full_df = preview_data["dataframe"]
         df = self._filter_by_area(full_df, area)
@@ -101,11 +104,16 @@ class GetStatsDataUseCase:
         return {
             "data_available": True,
             "summary_text": preview_data["summary_text"],
-            "table_data": df.to_dict(orient='records'),
+            "table_data": self._table_data(df, format),
             "chart_data": self.chart_service.create_chart_data(df),
             "timestamp": "Analisis Saat Ini (Belum Disimpan)",
             "sheet_name": preview_data["options"].get('sheet_name') or 'MASTER-SHEET', 
             "available_areas": available_areas,
             "cycle_assets_table": preview_data["cycle_assets_table"],
             "is_temporary": True
-        }
\ No newline at end of file
+        }
+
+    def _table_data(self, df: pd.DataFrame, format: Optional[str]) -> Any:
+        if ColumnarEncoder.wants_columnar(format):
+            return self.columnar_encoder.encode(df)
+        return df.to_dict(orient='records')
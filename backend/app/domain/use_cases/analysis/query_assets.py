@@ -1,11 +1,25 @@
+import copy
 import json
 import os
+import asyncio
+import numpy as np
 import pandas as pd
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 from datetime import datetime
 
+from app.domain.entities.sheet_snapshot import SheetSnapshot
 from app.domain.repositories.asset_data_source import IAssetDataSource
+from app.domain.repositories.async_asset_data_source import IAsyncAssetDataSource
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+from app.infrastructure.services.asset_index_service import AssetIndexService
+from app.infrastructure.services.asset_cube_service import AssetCubeService, DimensionFilter
+from app.infrastructure.services.asset_query_planner import AssetQueryPlanner, Predicate
+from app.infrastructure.services.asset_query_engine import IAssetQueryEngine, PandasQueryEngine
+from app.infrastructure.services.query_result_cache_service import QueryResultCacheService
+from app.infrastructure.services.columnar_encoder import ColumnarEncoder
+from app.infrastructure.services.financial_rollup_service import FinancialRollupService
+from app.infrastructure.services.result_paginator import InvalidCursorError, ResultPaginator
 
 class QueryAssetsUseCase:
     """
@@ -14,10 +28,116 @@ class QueryAssetsUseCase:
     dan berbagai task agregasi untuk LLM.
     Mendukung sumber data dinamis (Master vs Siklus).
     """
-    def __init__(self, asset_data_source: IAssetDataSource):
+    COLUMN_ALIASES = {
+        'MANUFAKTUR': 'MANUFACTURE', 'BRAND': 'MANUFACTURE', 'PABRIKAN': 'MANUFACTURE',
+        'PIC': 'PIC TEAM FAV', 'PIC TEAM': 'PIC TEAM FAV', 'LOKASI': 'AREA',
+        'MODEL': 'MODEL/TYPE', 'TIPE': 'MODEL/TYPE', 'NO SERI': 'SERIAL NUMBER',
+        'NILAI': 'NILAI ASET', 'TANGGAL': 'TANGGAL INVENTORY',
+        'STATUS INVENTORY': 'HASIL INVENTORY', 
+        'STATUS': 'HASIL INVENTORY',  
+        'INVENTARIS': 'HASIL INVENTORY'        
+    }
+    # Query agregasi yang hasilnya kecil dan sering diulang oleh LLM router, sehingga layak di-cache
+    AGGREGATION_TASKS = ('get_distribution_analysis', 'get_top_values', 'get_top_per_group', 'breakdown', 'get_financial_summary')
+    CACHED_CALCULATIONS = ('count', 'sum_value')
+    CACHE_MAX_ROWS = 1000
+
+    def __init__(
+        self,
+        asset_data_source: IAssetDataSource,
+        async_asset_data_source: Optional[IAsyncAssetDataSource] = None,
+        result_cache: Optional[QueryResultCacheService] = None,
+        engine: Optional[IAssetQueryEngine] = None
+    ):
         self.asset_data_source = asset_data_source
+        self.async_asset_data_source = async_asset_data_source
+        self.result_cache = result_cache
+        self.normalizer = AssetFrameNormalizer()
+        self.index_service = AssetIndexService(self.normalizer)
+        self.planner = AssetQueryPlanner(self.normalizer)
+        # Engine eksekusi filter/agregasi/urutan; default pandas (perilaku bawaan)
+        self.engine = engine or PandasQueryEngine(self.planner)
+        self.cube_service = AssetCubeService(self.normalizer)
+        self.financial_rollup = FinancialRollupService(self.normalizer)
+        self.paginator = ResultPaginator()
+        self.columnar_encoder = ColumnarEncoder()
+
+    def resolve_target(self, source: str, sheet_name: Optional[str]) -> Tuple[Optional[str], str]:
+        """Menentukan ID spreadsheet dan nama sheet berdasarkan sumber (master/siklus)."""
+        if source == 'siklus':
+            return os.getenv("GOOGLE_SHEET_ID_SIKLUS"), sheet_name or 'CYCLE-1-YEAR-2026'
+        return os.getenv("GOOGLE_SHEET_ID_MASTER"), sheet_name or 'MASTER-SHEET'
+
+    async def execute_async(self, **params) -> Any:
+        """
+        Varian async dari execute untuk handler WebSocket: data diambil melalui data source
+        async tanpa memblokir event loop, lalu kalkulasi pandas dijalankan di worker thread.
+        """
+        if not self.async_asset_data_source:
+            return await asyncio.to_thread(self.execute, **params)
+
+        target_id, target_sheet = self.resolve_target(params.get('source', 'master'), params.get('sheet_name'))
+        snapshot = await self.async_asset_data_source.fetch_snapshot(target_sheet, spreadsheet_id=target_id)
+        return await asyncio.to_thread(self.execute, **params, snapshot=snapshot)
+
+    def execute(self, explain: bool = False, **params) -> Any:
+        """
+        Menjalankan query aset. Dengan explain=True, hasil dibungkus bersama rencana filter
+        yang dipilih planner: urutan predicate, strategi evaluasi, estimasi vs jumlah baris
+        aktual, dan waktu per langkah.
+        Query agregasi (tanpa explain) dilayani dari result cache bila versi sheet masih sama.
+        """
+        if explain:
+            plan_trace: Dict[str, Any] = {}
+            result = self._run_query(**params, plan_trace=plan_trace)
+            return {
+                "result": result,
+                "query_plan": plan_trace or {"steps": [], "message": "Tidak ada filter yang diterapkan."}
+            }
+
+        cache_key = self._result_cache_key(params) if self.result_cache else None
+        if cache_key is None:
+            return self._run_query(**params)
 
-    def execute(self,
+        # Snapshot diambil di sini karena versinya menjadi bagian dari kunci cache
+        if params.get('snapshot') is None:
+            target_id, target_sheet = self.resolve_target(params.get('source', 'master'), params.get('sheet_name'))
+            params['snapshot'] = self.asset_data_source.fetch_snapshot(target_sheet, spreadsheet_id=target_id)
+        snapshot = params['snapshot']
+        if snapshot.dataframe.empty:
+            return self._run_query(**params)
+
+        scope = (snapshot.spreadsheet_id, snapshot.sheet_name)
+        cached = self.result_cache.get(scope, snapshot.version, cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        result = self._run_query(**params)
+        if not (isinstance(result, list) and len(result) > self.CACHE_MAX_ROWS):
+            self.result_cache.put(scope, snapshot.version, cache_key, copy.deepcopy(result))
+        return result
+
+    def _result_cache_key(self, params: Dict[str, Any]) -> Optional[str]:
+        """
+        Bentuk kanonik parameter query agregasi sebagai kunci cache (versi sheet ditangani
+        oleh cache). None jika query bukan agregasi, sehingga hasilnya tidak di-cache.
+        """
+        task = params.get('task') or 'filter'
+        if task not in self.AGGREGATION_TASKS and params.get('calculation') not in self.CACHED_CALCULATIONS:
+            return None
+
+        canonical = {'task': task, 'source': 'master', 'sort_direction': 'ascending'}
+        for name, value in params.items():
+            # 'format' hanya memengaruhi bentuk hasil baris, yang tidak pernah di-cache
+            if value is None or name in ('snapshot', 'format', 'shared_rows'):
+                continue
+            if name in ('group_by_field', 'count_field', 'sort_by'):
+                value = str(value).strip().upper()
+                value = self.COLUMN_ALIASES.get(value, value)
+            canonical[name] = value
+        return json.dumps(canonical, sort_keys=True, default=str)
+
+    def _run_query(self,
                 task: str = 'filter',
                 source: str = 'master',
                 sheet_name: Optional[str] = None, 
@@ -42,22 +162,27 @@ class QueryAssetsUseCase:
                 count_field: Optional[str] = None,
                 limit: Optional[int] = None,
                 sort_by: Optional[str] = None,
-                sort_direction: Optional[str] = 'ascending'
+                sort_direction: Optional[str] = 'ascending',
+                page_size: Optional[int] = None,
+                cursor: Optional[str] = None,
+                format: Optional[str] = None,
+                snapshot: Optional[SheetSnapshot] = None,
+                shared_rows: Optional[Dict[FrozenSet[str], np.ndarray]] = None,
+                plan_trace: Optional[Dict[str, Any]] = None
                 ) -> Any:
-        
-        # 1. Penentuan ID Spreadsheet dan Nama Sheet Dinamis
-        if source == 'siklus':
-            target_id = os.getenv("GOOGLE_SHEET_ID_SIKLUS")
-            default_sheet = 'CYCLE-1-YEAR-2026'
-        else:
-            target_id = os.getenv("GOOGLE_SHEET_ID_MASTER")
-            default_sheet = 'MASTER-SHEET'
+        # Sidik jari query untuk cursor paginasi: seluruh parameter kecuali paginasi & internal
+        page_fingerprint = self.paginator.fingerprint({
+            name: value for name, value in locals().items()
+            if name not in ('self', 'page_size', 'cursor', 'format', 'snapshot', 'shared_rows', 'plan_trace')
+        })
 
-        target_sheet = sheet_name or default_sheet
+        # 1. Penentuan ID Spreadsheet dan Nama Sheet Dinamis
+        target_id, target_sheet = self.resolve_target(source, sheet_name)
         
-        # 2. Fetch Data
-        df = self.asset_data_source.fetch_data(target_sheet, spreadsheet_id=target_id)
-        if df.empty: 
+        # 2. Fetch Data (dilewati jika snapshot sudah diambil lebih dulu, mis. oleh execute_async)
+        if snapshot is None:
+            snapshot = self.asset_data_source.fetch_snapshot(target_sheet, spreadsheet_id=target_id)
+        if snapshot.dataframe.empty: 
             return [{
                 "status": "DATA_TIDAK_DITEMUKAN",
                 "requested_sheet": target_sheet,
@@ -65,81 +190,37 @@ class QueryAssetsUseCase:
                 "message": f"Sheet '{target_sheet}' tidak ditemukan atau kosong di link {source.upper()}."
             }]
 
-        # 3. Normalisasi Nama Kolom DataFrame menjadi UPPERCASE
-        df.columns = [str(col).strip().upper() for col in df.columns]
+        # Paginasi (opsional) untuk hasil baris; cursor divalidasi terhadap versi sheet saat ini
+        try:
+            page_request = self.paginator.resolve(page_size, cursor, snapshot.version, page_fingerprint)
+        except InvalidCursorError as e:
+            return [{"error": str(e)}]
 
-        # --- PERBAIKAN: Normalisasi Nama Kolom NILAI ASET ---
-        # Menyatukan variasi nama kolom menjadi satu standar 'NILAI ASET'
-        for col in df.columns:
-            if 'NILAI ASET' in col:
-                df.rename(columns={col: 'NILAI ASET'}, inplace=True)
-                break
+        # 3. Frame kanonik per versi sheet (kolom UPPERCASE, 'NILAI ASET' distandarkan,
+        #    _NILAI_NUMERIC dan kolom tanggal _*_DT sudah diparsing sekali di cache).
+        #    Frame ini dipakai bersama; filter di bawah hanya membentuk mask lalu memotongnya sekali.
+        df = self.normalizer.from_snapshot(snapshot)
 
         # 4. Normalisasi Parameter Input & Mapping Alias
         if group_by_field: group_by_field = str(group_by_field).strip().upper()
         if count_field: count_field = str(count_field).strip().upper()
         if sort_by: sort_by = str(sort_by).strip().upper()
 
-        column_aliases = {
-            'MANUFAKTUR': 'MANUFACTURE', 'BRAND': 'MANUFACTURE', 'PABRIKAN': 'MANUFACTURE',
-            'PIC': 'PIC TEAM FAV', 'PIC TEAM': 'PIC TEAM FAV', 'LOKASI': 'AREA',
-            'MODEL': 'MODEL/TYPE', 'TIPE': 'MODEL/TYPE', 'NO SERI': 'SERIAL NUMBER',
-            'NILAI': 'NILAI ASET', 'TANGGAL': 'TANGGAL INVENTORY',
-            'STATUS INVENTORY': 'HASIL INVENTORY', 
-            'STATUS': 'HASIL INVENTORY',  
-            'INVENTARIS': 'HASIL INVENTORY'        
-        }
+        column_aliases = self.COLUMN_ALIASES
 
         # Terapkan alias
         group_by_field = column_aliases.get(group_by_field, group_by_field)
         count_field = column_aliases.get(count_field, count_field)
         sort_by = column_aliases.get(sort_by, sort_by)
 
-        # 5. Pre-processing NILAI ASET (Internal numeric column)
-        # Regex [^\d] membuang titik (.) agar '2.980.700' menjadi 2980700 (Numeric)
-        if 'NILAI ASET' in df.columns:
-            df['_NILAI_NUMERIC'] = pd.to_numeric(
-                df['NILAI ASET'].astype(str).str.replace(r'[^\d]', '', regex=True), 
-                errors='coerce'
-            ).fillna(0)
-        
-        # 6. Pre-processing Tanggal
-        # Prioritas TANGGAL INVENTORY, fallback ke TANGGAL UPDATE
-        date_cols = ['TANGGAL INVENTORY', 'TANGGAL UPDATE']
-        for col in date_cols:
-            if col in df.columns:
-                # Menggunakan dayfirst=True agar format 03-Apr-2022 terbaca benar
-                df[f'_{col}_DT'] = pd.to_datetime(df[col], errors='coerce', dayfirst=True)
-                
         # === TAMBAHAN: Pastikan Sorting Tanggal Bekerja Sebelum Filter ===
         if not sort_by and (start_date or end_date):
             sort_by = 'TANGGAL INVENTORY' if '_TANGGAL INVENTORY_DT' in df.columns else 'TANGGAL UPDATE'
             sort_direction = 'ascending'
 
-        # 7. Filtering Logic
-        # --- Filter String Standar ---
-        def get_clean_filter(df_col):
-            return df_col.astype(str).str.strip().str.lower()
-        
-        if area: 
-            df = df[get_clean_filter(df['AREA']).str.contains(area.lower().strip(), na=False)]
-        
-        if hasil_inventory and 'HASIL INVENTORY' in df.columns:
-            target_hi = hasil_inventory.lower().strip()
-            df = df[get_clean_filter(df['HASIL INVENTORY']).str.contains(target_hi, na=False)]
-            
-        if nama_aset: df = df[df['NAMA ASET'].str.contains(nama_aset, case=False, na=False)]
-        if model_type and 'MODEL/TYPE' in df.columns: 
-            df = df[df['MODEL/TYPE'].str.contains(model_type, case=False, na=False)]
-        if serial_number and 'SERIAL NUMBER' in df.columns: 
-            df = df[df['SERIAL NUMBER'].str.contains(serial_number, case=False, na=False)]
-        if manufaktur and 'MANUFACTURE' in df.columns: 
-            df = df[df['MANUFACTURE'].str.contains(manufaktur, case=False, na=False)]
-            
-        if kode_lokasi_sap:
-            lokasi_list = [l.strip().lower() for l in kode_lokasi_sap.split(',')]
-            df = df[get_clean_filter(df.get('KODE LOKASI SAP', pd.Series())).isin(lokasi_list)]
-            
+        # 5. Filtering Logic
+        # Nilai kondisi yang tertukar ke hasil_inventory (dan sebaliknya) dirapikan lebih dulu,
+        # agar filter di bawah selalu memakai kolom yang benar.
         if hasil_inventory:
             hi_lower = hasil_inventory.lower().strip()
             kondisi_keywords = ["tidak ditemukan", "rusak", "rusak berat", "rusak ringan", "penghapusan", "baik"]
@@ -154,133 +235,430 @@ class QueryAssetsUseCase:
                 if not hasil_inventory:
                     hasil_inventory = kondisi
                     kondisi = None
-                    
-        if pic_team_fav and 'PIC TEAM FAV' in df.columns: 
-            df = df[df['PIC TEAM FAV'].str.contains(pic_team_fav, case=False, na=False)]
 
-        # --- Filter No Asset (Logika Robust) ---
-        if no_asset and 'NO ASSET' in df.columns: 
-            df['_TEMP_NO'] = df['NO ASSET'].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
-            target_no = str(no_asset).replace('.0', '').strip()
-            df = df[df['_TEMP_NO'] == target_no]
+        context_label = self._context_label(area, kode_lokasi_sap, kondisi, manufaktur, sheet_name)
 
-        # --- Filter Kondisi (Smart Parsing) ---
-        if kondisi and 'KONDISI' in df.columns:
-            kondisi_lower = kondisi.lower().strip()
-            if kondisi_lower == "rusak":
-                df = df[df['KONDISI'].str.contains('Rusak', case=False, na=False)]
-            else:
-                included = [c.strip().lower() for c in kondisi.split(',')]
-                df = df[df['KONDISI'].str.lower().isin(included)]
+        # Hitung/jumlah/distribusi yang hanya memfilter dimensi cube dijawab dari cube per versi
+        cube_result = self._answer_from_cube(
+            snapshot, df, task=task, calculation=calculation, group_by_field=group_by_field,
+            count_field=count_field, sort_by=sort_by, limit=limit, source=source, context_label=context_label,
+            area=area, hasil_inventory=hasil_inventory, manufaktur=manufaktur, kondisi=kondisi,
+            kondisi_not=kondisi_not, kode_lokasi_sap=kode_lokasi_sap,
+            row_filters=(no_asset, nama_aset, pic_team_fav, model_type, serial_number,
+                         nilai_aset_min, nilai_aset_max, start_date, end_date)
+        )
+        if cube_result is not None:
+            if plan_trace is not None:
+                plan_trace.update({"strategy": "cube", "steps": []})
+            return cube_result
 
-        if kondisi_not and 'KONDISI' in df.columns:
-            excluded = [c.strip().lower() for c in kondisi_not.split(',')]
-            df = df[~df['KONDISI'].str.lower().isin(excluded)]
+        target_date_col = '_TANGGAL INVENTORY_DT' if '_TANGGAL INVENTORY_DT' in df.columns else '_TANGGAL UPDATE_DT'
+        predicates = self._build_predicates(
+            snapshot, df,
+            no_asset=no_asset, nama_aset=nama_aset, area=area, kondisi=kondisi, kondisi_not=kondisi_not,
+            pic_team_fav=pic_team_fav, model_type=model_type, serial_number=serial_number,
+            manufaktur=manufaktur, kode_lokasi_sap=kode_lokasi_sap, hasil_inventory=hasil_inventory,
+            nilai_aset_min=nilai_aset_min, nilai_aset_max=nilai_aset_max,
+            start_date=start_date, end_date=end_date, target_date_col=target_date_col
+        )
+        rows = None
+        engine = self.engine
+        if predicates:
+            rows, explain = engine.select_rows(snapshot, df, predicates, shared_rows)
+            if plan_trace is not None:
+                plan_trace.update({"engine": engine.name, **explain})
 
-        # --- Filter Nilai Aset (Menggunakan kolom numeric internal yang sudah dibersihkan dari titik) ---
-        if nilai_aset_min is not None and '_NILAI_NUMERIC' in df.columns: 
-            df = df[df['_NILAI_NUMERIC'] >= nilai_aset_min]
-        if nilai_aset_max is not None and '_NILAI_NUMERIC' in df.columns: 
-            df = df[df['_NILAI_NUMERIC'] <= nilai_aset_max]
+        # 6. Task Execution (Agregasi) oleh query engine atas baris yang lolos filter
+        group_present = group_by_field in df.columns
+        if task == 'get_distribution_analysis' and group_present:
+            counts = engine.value_counts(snapshot, df, rows, group_by_field)
+            percentages = counts / counts.sum() * 100
+            return self._distribution_result(counts, percentages)
 
-        # --- Filter Tanggal ---
-        target_date_col = '_TANGGAL INVENTORY_DT' if '_TANGGAL INVENTORY_DT' in df.columns else '_TANGGAL UPDATE_DT'
-        if start_date and target_date_col in df.columns:
-            df = df[df[target_date_col] >= pd.to_datetime(start_date)]
-        if end_date and target_date_col in df.columns:
-            df = df[df[target_date_col] <= pd.to_datetime(end_date)]
-
-        # 8. Task Execution (Agregasi)
-        if task == 'get_distribution_analysis' and group_by_field in df.columns:
-            counts = df[group_by_field].value_counts()
-            percentages = df[group_by_field].value_counts(normalize=True) * 100
-            return [{"grup": v, "jumlah": c, "persentase": f"{percentages[v]:.2f}%"} for v, c in counts.items()]
-
-        if task == 'get_top_values' and group_by_field in df.columns:
-            top_values = df[group_by_field].value_counts().head(limit or 5)
-            return top_values.reset_index().rename(columns={group_by_field: 'grup', 'count': 'jumlah'}).to_dict(orient='records')
+        if task == 'get_top_values' and group_present:
+            return self._top_values_result(engine.value_counts(snapshot, df, rows, group_by_field), group_by_field, limit)
         
         if task == 'get_top_per_group':
             if not group_by_field or not count_field:
                 return [{"error": "Task 'get_top_per_group' membutuhkan group_by_field dan count_field."}]
             
-            if group_by_field not in df.columns or count_field not in df.columns:
+            if not group_present or count_field not in df.columns:
                 return [{"error": f"Kolom {group_by_field} atau {count_field} tidak ditemukan."}]
             
-            top_per_group = df.groupby(group_by_field)[count_field].value_counts().groupby(level=0).head(1)
-            return top_per_group.reset_index(name='count').to_dict(orient='records')
+            return engine.top_per_group(snapshot, df, rows, group_by_field, count_field).to_dict(orient='records')
 
         if task == 'breakdown':
             if not group_by_field or not count_field:
                 return [{"error": "Task 'breakdown' membutuhkan group_by_field dan count_field."}]
-            res = df.groupby(group_by_field)[count_field].value_counts().unstack(fill_value=0)
-            return json.loads(res.to_json(orient='index'))
+            return self._breakdown_result(engine.breakdown(snapshot, df, rows, group_by_field, count_field))
 
-        # 9. Sorting (Mendukung sort berdasarkan Tanggal atau Nilai)
-        if sort_by:
-            actual_sort_col = sort_by
-            if sort_by == 'NILAI ASET': 
-                actual_sort_col = '_NILAI_NUMERIC'
-            elif sort_by == 'TANGGAL INVENTORY': 
-                actual_sort_col = '_TANGGAL INVENTORY_DT'
-            
-            if actual_sort_col in df.columns:
-                is_asc = str(sort_direction).lower() == 'ascending'
-                df = df.dropna(subset=[actual_sort_col])
-                df = df.sort_values(by=actual_sort_col, ascending=is_asc)
-        
-        elif start_date or end_date:
-            if target_date_col in df.columns:
-                df = df.dropna(subset=[target_date_col])
-                df = df.sort_values(by=target_date_col, ascending=True)
-
-        if limit:
-            df = df.head(limit)
-
-        # 10. Calculation Logic
-        if calculation:
-            applied_filters = []
-            if area: applied_filters.append(f"Area: {area}")
-            if kode_lokasi_sap: applied_filters.append(f"Lokasi SAP: {kode_lokasi_sap}")
-            if kondisi: applied_filters.append(f"Kondisi: {kondisi}")
-            if manufaktur: applied_filters.append(f"Manufaktur: {manufaktur}")
-            if sheet_name: applied_filters.append(f"Sheet: {sheet_name}")
-            
-            # Jika tidak ada filter, beri label "Seluruh Data"
-            context_label = " | ".join(applied_filters) if applied_filters else "Seluruh Data Aset"
-
-            # A. Logika Hitung Jumlah Unit (COUNT)
-            if calculation == 'count': 
-                total_count = int(len(df)) # Pastikan integer murni untuk JSON
-                return {
-                    "calculation_result": {
-                        "metrik": "Jumlah Total Aset",
-                        "label": context_label,
-                        "count": total_count,
-                        "source": source.upper(),
-                        "details": f"Ditemukan sebanyak {total_count} unit aset berdasarkan filter yang diminta."
-                    }
-                }
-
-            # B. Logika Hitung Total Nilai Uang (SUM)
-            if calculation == 'sum_value' and '_NILAI_NUMERIC' in df.columns:
-                total_sum = float(df['_NILAI_NUMERIC'].sum()) # Pastikan float murni
-                return {
-                    "calculation_result": {
-                        "metrik": "TOTAL NILAI ASET (RUPIAH)",
-                        "label": context_label,
-                        "total_value": f"Rp {total_sum:,.0f}",
-                        "raw_value": total_sum,
-                        "source": source.upper(),
-                        "details": f"Total nilai uang dari aset tersebut adalah Rp {total_sum:,.0f}"
-                    }
-                }
-
-        # 11. Clean Up & Return
-        if df.empty: 
+        if task == 'get_financial_summary':
+            return self._financial_summary(snapshot, df, rows)
+
+        # 7. Satu kali fetch dari frame kanonik: hanya baris yang lolos dan kolom yang dipakai
+        #    tahap berikutnya, diurutkan (tanggal/nilai, baris tanpa nilai dibuang) dan dibatasi limit
+        sort_column = self._sort_column(sort_by, start_date, end_date, target_date_col)
+        output_columns = self._output_columns(df, task, calculation, group_by_field, count_field, sort_column)
+        df = engine.fetch(
+            snapshot, df, rows, output_columns,
+            sort_column=sort_column if sort_column in output_columns else None,
+            ascending=str(sort_direction).lower() == 'ascending' if sort_by else True,
+            limit=limit
+        )
+
+        # 8. Calculation Logic
+        if calculation == 'count':
+            return self._count_result(int(len(df)), context_label, source)
+        if calculation == 'sum_value' and '_NILAI_NUMERIC' in df.columns:
+            return self._sum_result(float(df['_NILAI_NUMERIC'].sum()), context_label, source)
+
+        # 9. Clean Up & Return
+        page_info = None
+        if page_request is not None:
+            # Hanya baris halaman ini yang dikonversi ke dict
+            page_info = self.paginator.page_info(page_request, len(df), snapshot.version, page_fingerprint)
+            df = df.iloc[page_request.offset:page_request.offset + page_request.page_size]
+
+        if df.empty and page_info is None:
             return [{"status": "Tidak ada data yang cocok dengan kriteria."}]
 
         cols_to_drop = [c for c in df.columns if c.startswith('_')]
         df_final = df.drop(columns=cols_to_drop)
         
-        return df_final.replace({pd.NaT: None, pd.NA: None}).where(pd.notna(df_final), None).to_dict(orient='records')
\ No newline at end of file
+        if ColumnarEncoder.wants_columnar(format):
+            records = self.columnar_encoder.encode(df_final)
+        else:
+            records = df_final.replace({pd.NaT: None, pd.NA: None}).where(pd.notna(df_final), None).to_dict(orient='records')
+        if page_info is not None:
+            return {"data": records, "page": page_info}
+        return records
+
+    @staticmethod
+    def _sort_column(sort_by: Optional[str], start_date: Optional[str], end_date: Optional[str], target_date_col: str) -> Optional[str]:
+        """Kolom yang benar-benar dipakai untuk sorting (kolom internal untuk nilai & tanggal)."""
+        if sort_by:
+            return {'NILAI ASET': '_NILAI_NUMERIC', 'TANGGAL INVENTORY': '_TANGGAL INVENTORY_DT'}.get(sort_by, sort_by)
+        if start_date or end_date:
+            return target_date_col
+        return None
+
+    def _output_columns(
+        self,
+        df: pd.DataFrame,
+        task: str,
+        calculation: Optional[str],
+        group_by_field: Optional[str],
+        count_field: Optional[str],
+        sort_column: Optional[str]
+    ) -> List[str]:
+        """
+        Kolom frame kanonik yang dibutuhkan setelah filter, agar take akhir tidak menyalin
+        seluruh kolom: agregasi cukup kolom grup/hitung, kalkulasi cukup kolom sort/nilai,
+        dan hasil baris memakai kolom tampilan.
+        """
+        if task in ('get_top_per_group', 'breakdown') or (
+            task in ('get_distribution_analysis', 'get_top_values') and group_by_field in df.columns
+        ):
+            needed = {group_by_field, count_field}
+        else:
+            needed = {sort_column}
+            if calculation == 'sum_value' and '_NILAI_NUMERIC' in df.columns:
+                needed.add('_NILAI_NUMERIC')
+            elif calculation != 'count':
+                needed.update(col for col in df.columns if not str(col).startswith('_'))
+        # Urutan kolom mengikuti frame kanonik
+        return [col for col in df.columns if col in needed]
+
+    def _build_predicates(
+        self,
+        snapshot: SheetSnapshot,
+        df: pd.DataFrame,
+        no_asset: Optional[str] = None,
+        nama_aset: Optional[str] = None,
+        area: Optional[str] = None,
+        kondisi: Optional[str] = None,
+        kondisi_not: Optional[str] = None,
+        pic_team_fav: Optional[str] = None,
+        model_type: Optional[str] = None,
+        serial_number: Optional[str] = None,
+        manufaktur: Optional[str] = None,
+        kode_lokasi_sap: Optional[str] = None,
+        hasil_inventory: Optional[str] = None,
+        nilai_aset_min: Optional[int] = None,
+        nilai_aset_max: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        target_date_col: str = '_TANGGAL INVENTORY_DT'
+    ) -> List[Predicate]:
+        """
+        Menerjemahkan parameter filter menjadi Predicate untuk planner. Semantik tiap filter
+        sama dengan filter scan sebelumnya; yang dipilih di sini hanya strategi evaluasinya:
+        indeks hash/trigram per versi, kode kategori (AREA/KONDISI/HASIL INVENTORY),
+        rentang pada kolom internal, atau scan teks sebagai cadangan.
+        """
+        planner = self.planner
+        stats = planner.stats_from_snapshot(snapshot)
+        indexes = self.index_service.from_snapshot(snapshot)
+        predicates: List[Predicate] = []
+
+        def column_filter(label, column, value_filter, sql=None):
+            # Kolom kategori cukup dievaluasi per nilai unik; kolom lain di-scan per baris
+            if self.normalizer.category_column(column) in df.columns:
+                return planner.category_predicate(label, column, df, stats, value_filter)
+            return planner.scan_predicate(label, column, value_filter, sql=sql)
+
+        def contains_filter(column, pattern):
+            # Pola 'contains' dilayani indeks trigram; pola pendek/regex tetap di-scan
+            label = f"{column} contains '{pattern}'"
+            hits = self.index_service.search_substring(snapshot, column, pattern)
+            if hits is not None:
+                return planner.index_predicate(label, column, hits, stats)
+            return column_filter(label, column, self._contains(pattern), sql=self._contains_sql(column, pattern))
+
+        # --- Lookup Titik (indeks hash) ---
+        if no_asset and indexes.has('NO ASSET'):
+            target_no = str(no_asset).replace('.0', '').strip()
+            predicates.append(planner.index_predicate(
+                f"NO ASSET = '{target_no}'", 'NO ASSET', indexes.lookup('NO ASSET', [target_no]), stats
+            ))
+
+        if serial_number and 'SERIAL NUMBER' in df.columns:
+            # Tetap pencarian 'contains' (serial yang cocok persis juga termasuk); dipercepat indeks trigram
+            predicates.append(contains_filter('SERIAL NUMBER', serial_number))
+
+        # --- Filter Dimensi: hash index untuk KODE LOKASI SAP, trigram untuk MANUFACTURE ---
+        for label, column, value_filter in self._dimension_filters(
+            df, area=area, hasil_inventory=hasil_inventory, manufaktur=manufaktur,
+            kondisi=kondisi, kondisi_not=kondisi_not, kode_lokasi_sap=kode_lokasi_sap
+        ):
+            if column == 'KODE LOKASI SAP':
+                positions = indexes.lookup(column, self._split_values(kode_lokasi_sap))
+                # Tanpa kolom KODE LOKASI SAP tidak ada baris yang bisa cocok
+                predicates.append(planner.index_predicate(
+                    label, column, positions if positions is not None else np.empty(0, dtype=np.intp), stats
+                ))
+            elif column == 'MANUFACTURE':
+                predicates.append(contains_filter(column, manufaktur))
+            else:
+                predicates.append(column_filter(label, column, value_filter))
+
+        # --- Filter String Standar ---
+        if nama_aset: predicates.append(contains_filter('NAMA ASET', nama_aset))
+        for pattern, column in ((model_type, 'MODEL/TYPE'), (pic_team_fav, 'PIC TEAM FAV')):
+            if pattern and column in df.columns:
+                predicates.append(contains_filter(column, pattern))
+
+        # --- Filter Nilai Aset (kolom numeric internal yang sudah dibersihkan dari titik) ---
+        if (nilai_aset_min is not None or nilai_aset_max is not None) and '_NILAI_NUMERIC' in df.columns:
+            predicates.append(planner.range_predicate(
+                f"NILAI ASET between {nilai_aset_min} and {nilai_aset_max}", '_NILAI_NUMERIC', stats,
+                lower=nilai_aset_min, upper=nilai_aset_max
+            ))
+
+        # --- Filter Tanggal ---
+        if (start_date or end_date) and target_date_col in df.columns:
+            predicates.append(planner.range_predicate(
+                f"{target_date_col.strip('_')} between {start_date} and {end_date}", target_date_col, stats,
+                lower=pd.to_datetime(start_date) if start_date else None,
+                upper=pd.to_datetime(end_date) if end_date else None
+            ))
+
+        return predicates
+
+    @staticmethod
+    def _clean_values(values: pd.Series) -> pd.Series:
+        return values.astype(str).str.strip().str.lower()
+
+    @staticmethod
+    def _split_values(text: str) -> List[str]:
+        return [value.strip().lower() for value in text.split(',')]
+
+    @staticmethod
+    def _contains(pattern: str) -> Callable[[pd.Series], pd.Series]:
+        return lambda values: values.str.contains(pattern, case=False, na=False)
+
+    @staticmethod
+    def _contains_sql(column: str, pattern: str) -> Tuple[str, List[Any]]:
+        """Padanan SQL _contains: regex tidak peka huruf besar, nilai kosong tidak lolos."""
+        return f"regexp_matches({AssetQueryPlanner.quote(column)}, ?, 'i')", [pattern]
+
+    def _dimension_filters(
+        self,
+        df: pd.DataFrame,
+        area: Optional[str] = None,
+        hasil_inventory: Optional[str] = None,
+        manufaktur: Optional[str] = None,
+        kondisi: Optional[str] = None,
+        kondisi_not: Optional[str] = None,
+        kode_lokasi_sap: Optional[str] = None
+    ) -> List[Tuple[str, str, Callable[[pd.Series], pd.Series]]]:
+        """
+        Filter yang hanya bergantung pada nilai satu kolom dimensi, sebagai (label, kolom, value_filter).
+        Dipakai bersama oleh planner (per baris) dan cube (per sel), sehingga semantiknya satu sumber.
+        """
+        filters = []
+        if area:
+            target_area = area.lower().strip()
+            filters.append((
+                f"AREA contains '{target_area}'", 'AREA',
+                lambda values: self._clean_values(values).str.contains(target_area, na=False)
+            ))
+
+        if hasil_inventory and 'HASIL INVENTORY' in df.columns:
+            target_hi = hasil_inventory.lower().strip()
+            filters.append((
+                f"HASIL INVENTORY contains '{target_hi}'", 'HASIL INVENTORY',
+                lambda values: self._clean_values(values).str.contains(target_hi, na=False)
+            ))
+
+        if manufaktur and 'MANUFACTURE' in df.columns:
+            filters.append((f"MANUFACTURE contains '{manufaktur}'", 'MANUFACTURE', self._contains(manufaktur)))
+
+        if kode_lokasi_sap:
+            lokasi_list = self._split_values(kode_lokasi_sap)
+            filters.append((
+                f"KODE LOKASI SAP in {lokasi_list}", 'KODE LOKASI SAP',
+                lambda values: self._clean_values(values).isin(lokasi_list)
+            ))
+
+        # --- Filter Kondisi (Smart Parsing) ---
+        if kondisi and 'KONDISI' in df.columns:
+            if kondisi.lower().strip() == "rusak":
+                filters.append(("KONDISI contains 'rusak'", 'KONDISI', self._contains('Rusak')))
+            else:
+                included = [c.strip().lower() for c in kondisi.split(',')]
+                filters.append((f"KONDISI in {included}", 'KONDISI', lambda values: values.str.lower().isin(included)))
+
+        if kondisi_not and 'KONDISI' in df.columns:
+            excluded = [c.strip().lower() for c in kondisi_not.split(',')]
+            filters.append((f"KONDISI not in {excluded}", 'KONDISI', lambda values: ~values.str.lower().isin(excluded)))
+
+        return filters
+
+    def _answer_from_cube(
+        self,
+        snapshot: SheetSnapshot,
+        df: pd.DataFrame,
+        task: str,
+        calculation: Optional[str],
+        group_by_field: Optional[str],
+        count_field: Optional[str],
+        sort_by: Optional[str],
+        limit: Optional[int],
+        source: str,
+        context_label: str,
+        row_filters: Tuple[Any, ...],
+        **dimension_params: Optional[str]
+    ) -> Optional[Any]:
+        """
+        Menjawab count/sum_value, get_distribution_analysis, get_top_values, dan breakdown
+        dari cube per versi bila semua filter hanya menyentuh dimensi cube. None berarti
+        query harus dijalankan lewat planner (scan baris) seperti biasa.
+        """
+        if any(value is not None and value != '' for value in row_filters):
+            return None
+
+        is_distribution = task in ('get_distribution_analysis', 'get_top_values') and group_by_field in df.columns
+        is_breakdown = task == 'breakdown' and group_by_field and count_field and group_by_field != count_field
+        is_calculation = (
+            task not in self.AGGREGATION_TASKS and not sort_by
+            and (calculation == 'count' or (calculation == 'sum_value' and '_NILAI_NUMERIC' in df.columns))
+        )
+        if not (is_distribution or is_breakdown or is_calculation):
+            return None
+
+        filters = self._dimension_filters(df, **dimension_params)
+        needed = [column for _, column, _ in filters]
+        if is_distribution: needed.append(group_by_field)
+        if is_breakdown: needed += [group_by_field, count_field]
+
+        cube = self.cube_service.from_snapshot(snapshot)
+        if not cube.covers(*needed):
+            return None
+        cells = cube.select([(column, value_filter) for _, column, value_filter in filters])
+
+        if is_distribution:
+            counts = cube.value_counts(cells, group_by_field)
+            if task == 'get_top_values':
+                return self._top_values_result(counts, group_by_field, limit)
+            return self._distribution_result(counts, counts / counts.sum() * 100)
+
+        if is_breakdown:
+            return self._breakdown_result(cube.crosstab(cells, group_by_field, count_field))
+
+        total_count = int(cells[cube.COUNT].sum())
+        if calculation == 'count':
+            return self._count_result(min(total_count, limit) if limit else total_count, context_label, source)
+        if limit and limit < total_count:
+            # Jumlah nilai dari 'limit' baris pertama bergantung pada urutan baris, bukan agregat
+            return None
+        return self._sum_result(float(cells[cube.SUM].sum()), context_label, source)
+
+    def _financial_summary(self, snapshot: SheetSnapshot, df: pd.DataFrame, rows: Optional[np.ndarray]) -> Any:
+        """
+        Rangkuman keuangan per AREA. Tanpa filter, hasilnya artifact rollup versi sheet ini
+        (sama dengan yang dipakai analisis dan dashboard); dengan filter, rollup dihitung
+        atas baris yang lolos saja.
+        """
+        if not self.financial_rollup.supports(df):
+            return [{"error": "Kolom AREA, NAMA ASET, atau NILAI ASET tidak ditemukan."}]
+        if rows is None:
+            return copy.deepcopy(self.financial_rollup.from_snapshot(snapshot))
+        if not len(rows):
+            return [{"status": "Tidak ada data yang cocok dengan kriteria."}]
+        columns = list(self.financial_rollup.REQUIRED_COLUMNS) + [
+            self.normalizer.category_column('AREA'), self.normalizer.COL_NILAI_NUMERIC
+        ]
+        return self.financial_rollup.build(self.planner.take(df, rows, columns))
+
+    # --- Format Hasil ---
+
+    @staticmethod
+    def _context_label(area, kode_lokasi_sap, kondisi, manufaktur, sheet_name) -> str:
+        applied_filters = []
+        if area: applied_filters.append(f"Area: {area}")
+        if kode_lokasi_sap: applied_filters.append(f"Lokasi SAP: {kode_lokasi_sap}")
+        if kondisi: applied_filters.append(f"Kondisi: {kondisi}")
+        if manufaktur: applied_filters.append(f"Manufaktur: {manufaktur}")
+        if sheet_name: applied_filters.append(f"Sheet: {sheet_name}")
+
+        # Jika tidak ada filter, beri label "Seluruh Data"
+        return " | ".join(applied_filters) if applied_filters else "Seluruh Data Aset"
+
+    @staticmethod
+    def _distribution_result(counts: pd.Series, percentages: pd.Series) -> List[Dict[str, Any]]:
+        return [{"grup": v, "jumlah": c, "persentase": f"{percentages[v]:.2f}%"} for v, c in counts.items()]
+
+    @staticmethod
+    def _top_values_result(counts: pd.Series, group_by_field: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+        top_values = counts.head(limit or 5)
+        return top_values.reset_index().rename(columns={group_by_field: 'grup', 'count': 'jumlah'}).to_dict(orient='records')
+
+    @staticmethod
+    def _breakdown_result(table: pd.DataFrame) -> Dict[str, Any]:
+        return json.loads(table.to_json(orient='index'))
+
+    @staticmethod
+    def _count_result(total_count: int, context_label: str, source: str) -> Dict[str, Any]:
+        return {
+            "calculation_result": {
+                "metrik": "Jumlah Total Aset",
+                "label": context_label,
+                "count": total_count,
+                "source": source.upper(),
+                "details": f"Ditemukan sebanyak {total_count} unit aset berdasarkan filter yang diminta."
+            }
+        }
+
+    @staticmethod
+    def _sum_result(total_sum: float, context_label: str, source: str) -> Dict[str, Any]:
+        return {
+            "calculation_result": {
+                "metrik": "TOTAL NILAI ASET (RUPIAH)",
+                "label": context_label,
+                "total_value": f"Rp {total_sum:,.0f}",
+                "raw_value": total_sum,
+                "source": source.upper(),
+                "details": f"Total nilai uang dari aset tersebut adalah Rp {total_sum:,.0f}"
+            }
+        }
@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+import logging
+import numpy as np
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.domain.use_cases.analysis.query_assets import QueryAssetsUseCase
+
+class QueryAssetsBatchUseCase:
+    """
+    Menjalankan beberapa query aset sekaligus terhadap satu sumber dan sheet.
+    Snapshot sheet diambil sekali dan frame kanoniknya dinormalisasi sekali; setiap spec
+    dijalankan oleh QueryAssetsUseCase dengan snapshot yang sama, dan hasil filter antar spec
+    (prefiks rencana planner, mis. area='duri' yang muncul di beberapa spec) dipakai bersama.
+    """
+    MAX_QUERIES = int(os.getenv("QUERY_BATCH_MAX_QUERIES", "20"))
+    # Parameter tingkat batch (berlaku untuk semua spec)
+    BATCH_PARAMS = ('source', 'sheet_name')
+    # Parameter query_assets yang boleh diisi per spec (sama dengan skema tool query_assets)
+    SPEC_PARAMS = frozenset({
+        'task', 'no_asset', 'nama_aset', 'area', 'kondisi', 'kondisi_not', 'pic_team_fav',
+        'model_type', 'serial_number', 'kategori', 'manufaktur', 'kode_lokasi_sap',
+        'hasil_inventory', 'nilai_aset_min', 'nilai_aset_max', 'start_date', 'end_date',
+        'calculation', 'group_by_field', 'count_field', 'limit', 'sort_by', 'sort_direction',
+        'page_size', 'cursor', 'format', 'explain',
+    })
+
+    def __init__(self, query_assets: QueryAssetsUseCase):
+        self.query_assets = query_assets
+
+    async def execute_async(
+        self,
+        queries: List[Dict[str, Any]],
+        source: str = 'master',
+        sheet_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Varian async: snapshot diambil tanpa memblokir event loop, seluruh spec dijalankan di worker thread."""
+        self._validate(queries)
+        data_source = self.query_assets.async_asset_data_source
+        if not data_source:
+            return await asyncio.to_thread(self.execute, queries, source=source, sheet_name=sheet_name)
+
+        target_id, target_sheet = self.query_assets.resolve_target(source, sheet_name)
+        snapshot = await data_source.fetch_snapshot(target_sheet, spreadsheet_id=target_id)
+        return await asyncio.to_thread(self.execute, queries, source=source, sheet_name=sheet_name, snapshot=snapshot)
+
+    def execute(
+        self,
+        queries: List[Dict[str, Any]],
+        source: str = 'master',
+        sheet_name: Optional[str] = None,
+        snapshot: Optional[SheetSnapshot] = None
+    ) -> Dict[str, Any]:
+        """
+        Mengembalikan {"source", "sheet_name", "results": [...]} dengan satu entri per spec
+        (urutan sama dengan 'queries'). Spec yang tidak valid menghasilkan entri error
+        tanpa menggagalkan spec lainnya.
+        """
+        self._validate(queries)
+        target_id, target_sheet = self.query_assets.resolve_target(source, sheet_name)
+        if snapshot is None:
+            snapshot = self.query_assets.asset_data_source.fetch_snapshot(target_sheet, spreadsheet_id=target_id)
+        if not snapshot.dataframe.empty:
+            # Normalisasi sekali di awal; spec berikutnya memakai artifact yang sama
+            self.query_assets.normalizer.from_snapshot(snapshot)
+
+        shared_rows: Dict[FrozenSet[str], np.ndarray] = {}
+        results = []
+        started = time.perf_counter()
+        for index, spec in enumerate(queries):
+            spec_started = time.perf_counter()
+            unknown = sorted(set(spec) - self.SPEC_PARAMS)
+            if unknown:
+                result = [{"error": f"Parameter tidak dikenal untuk query_assets: {', '.join(unknown)}."}]
+            else:
+                try:
+                    result = self.query_assets.execute(
+                        **spec, source=source, sheet_name=sheet_name, snapshot=snapshot, shared_rows=shared_rows
+                    )
+                except Exception as e:
+                    logging.error(f"[ERROR] Batch query_assets: spec #{index} gagal: {e}")
+                    result = [{"error": f"Query gagal dijalankan: {e}"}]
+            results.append({
+                "index": index,
+                "query": spec,
+                "result": result,
+                "elapsed_ms": round((time.perf_counter() - spec_started) * 1000, 3),
+            })
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+        logging.info(f"[INFO] Batch query_assets: {len(queries)} query pada sheet '{target_sheet}' selesai dalam {elapsed_ms} ms.")
+        return {
+            "source": source,
+            "sheet_name": target_sheet,
+            "query_count": len(queries),
+            "elapsed_ms": elapsed_ms,
+            "results": results,
+        }
+
+    def _validate(self, queries: Any):
+        if not isinstance(queries, list) or not queries:
+            raise ValueError("'queries' harus berupa list berisi minimal satu spec query.")
+        if len(queries) > self.MAX_QUERIES:
+            raise ValueError(f"Maksimal {self.MAX_QUERIES} query per batch.")
+        if not all(isinstance(spec, dict) for spec in queries):
+            raise ValueError("Setiap spec di 'queries' harus berupa object parameter query_assets.")
@@ -1,8 +1,9 @@
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from io import StringIO
 
 from app.domain.repositories.file_repository import IFileRepository
+from app.infrastructure.services.columnar_encoder import ColumnarEncoder
 
 class QueryResourceUseCase:
     """
@@ -11,16 +12,19 @@ class QueryResourceUseCase:
     """
     def __init__(self, file_repo: IFileRepository):
         self.file_repo = file_repo
+        self.columnar_encoder = ColumnarEncoder()
 
     def execute(self, 
                 resource_name: str, 
                 no_asset: Optional[str] = None,
                 nama_aset: Optional[str] = None,
                 kondisi: Optional[str] = None, 
-                area: Optional[str] = None
-                ) -> List[Dict[str, Any]]:
+                area: Optional[str] = None,
+                format: Optional[str] = None
+                ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Mencari file resource berdasarkan nama, memuatnya, dan memfilternya secara mendalam.
+        Dengan format='columnar', baris hasil dikembalikan dalam bentuk kolom.
         """
         file_entity = self.file_repo.find_by_filename(resource_name)
         if not file_entity or not file_entity.json_content:
@@ -52,6 +56,9 @@ class QueryResourceUseCase:
 
         if df.empty:
             return [{"status": "Tidak ada data yang cocok dengan kriteria di dalam resource ini."}]
+
+        if ColumnarEncoder.wants_columnar(format):
+            return self.columnar_encoder.encode(df.drop(columns=['TEMP_NO'], errors='ignore'))
             
         df_cleaned = df.replace({pd.NaT: None, pd.NA: None}).where(pd.notna(df), None)
         
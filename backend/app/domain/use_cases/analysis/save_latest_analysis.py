@@ -12,6 +12,7 @@ from app.domain.entities.file import File
 from app.domain.repositories.history_repository import IHistoryRepository
 from app.domain.repositories.file_repository import IFileRepository
 from app.infrastructure.services.preview_state_service import PreviewStateService
+from app.infrastructure.services.incremental_analysis_service import IncrementalAnalysisService
 
 class SaveLatestAnalysisUseCase:
     """
@@ -22,11 +23,13 @@ class SaveLatestAnalysisUseCase:
         self,
         history_repo: IHistoryRepository,
         file_repo: IFileRepository,
-        preview_state_service: PreviewStateService
+        preview_state_service: PreviewStateService,
+        incremental_analysis: Optional[IncrementalAnalysisService] = None
     ):
         self.history_repo = history_repo
         self.file_repo = file_repo
         self.preview_state_service = preview_state_service
+        self.incremental_analysis = incremental_analysis
 
     def execute(self, current_user: Optional[User] = None) -> History:
         """
@@ -91,7 +94,9 @@ class SaveLatestAnalysisUseCase:
             upload_date=analysis_time,
             cycle_assets=cleaned_cycle_assets, 
             user_email=user_email, 
-            sheet_name=sheet_name_for_file
+            sheet_name=sheet_name_for_file,
+            # Dashboard riwayat memakai rollup ini tanpa menghitung ulang dari file data
+            financial_summary=latest_result.get("financial_summary")
         )
         saved_history = self.history_repo.save(new_history_entity)
 
@@ -110,6 +115,11 @@ class SaveLatestAnalysisUseCase:
         self.file_repo.save(json_file_entity)
         
         print(f"[DB-SAVE] Berhasil menyimpan analisis {source_type} ke riwayat: {new_json_filename}")
+
+        # Riwayat tersimpan menjadi pembanding untuk analisis inkremental berikutnya pada sheet ini
+        baseline = latest_result.get("incremental_baseline")
+        if baseline is not None and self.incremental_analysis is not None:
+            self.incremental_analysis.save_baseline(baseline)
         
         self.preview_state_service.clear()
         print("[INFO] State pratinjau telah dibersihkan setelah penyimpanan.")
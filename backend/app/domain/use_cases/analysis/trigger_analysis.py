@@ -1,31 +1,76 @@
 import traceback
 import os
+import math
+import time
 from datetime import datetime
 import pytz
-from typing import Callable, Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
+import numpy as np
 import pandas as pd
 import logging
 import json
 
+from app.domain.entities.sheet_snapshot import SheetSnapshot
 from app.domain.repositories.asset_data_source import IAssetDataSource
 from app.infrastructure.services.document_analyzer import DocumentAnalyzer
 from app.infrastructure.services.preview_state_service import PreviewStateService
 from app.infrastructure.services.chart_service import ChartService
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+from app.infrastructure.services.financial_rollup_service import FinancialRollupService
+from app.infrastructure.services.document_encoder import IDocumentEncoder, create_document_encoder
+from app.infrastructure.services.analysis_stage_runner import AnalysisStage, AnalysisStageRunner
+from app.infrastructure.services.analysis_result_cache_service import AnalysisResultCacheService
+from app.infrastructure.services.incremental_analysis_service import AnalysisBaseline, AssetDelta, IncrementalAnalysisService
 from app.presentation.schemas import AnalysisOptions
 
 class TriggerAnalysisUseCase:
     """Use case untuk memicu proses analisis data aset."""
+    # Kategori kondisi untuk INSIGHT UTAMA: (kunci, kata kunci KONDISI, label laporan).
+    # Kategori dapat tumpang tindih, satu nilai KONDISI bisa masuk ke beberapa kategori.
+    CONDITION_CATEGORIES = [
+        ('baik', 'Baik', 'Kondisi Baik'),
+        ('digunakan', 'Digunakan', 'Digunakan'),
+        ('cadangan', 'Cadangan', 'Cadangan'),
+        ('rusak_ringan', 'Rusak Ringan', 'Rusak Ringan'),
+        ('rusak_berat', 'Rusak Berat', 'Rusak Berat'),
+        ('tidak_ditemukan', 'Tidak Ditemukan', 'Tidak Ditemukan'),
+        ('penghapusan', 'Penghapusan', 'Penghapusan'),
+    ]
+
+    # Mode ringkasan: 'auto' (map-reduce hanya jika dokumen tidak muat sebagai baris), 'single', 'map_reduce'
+    SUMMARY_MODE = os.getenv("SUMMARY_MODE", "auto")
+    SUMMARY_CHUNK_BY = os.getenv("SUMMARY_CHUNK_BY", "AREA")
+    SUMMARY_CHUNK_ROWS = int(os.getenv("SUMMARY_CHUNK_ROWS", "5000"))
+    SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", "16"))
+
+    # Urutan bagian laporan (nama tahap), tidak bergantung pada urutan selesainya tahap
+    REPORT_ORDER = ['overview', 'summary', 'insight', 'financial', 'duplicates']
+    # Bagian hasil analisis yang disimpan di cache hasil (dataframe selalu diambil dari snapshot)
+    CACHED_RESULT_KEYS = ['summary_text', 'chart_data', 'cycle_assets_table', 'financial_summary', 'stage_timings']
+
     def __init__(
         self,
         asset_data_source: IAssetDataSource,
         document_analyzer: DocumentAnalyzer,
         preview_state_service: PreviewStateService,
-        chart_service: ChartService
+        chart_service: ChartService,
+        document_encoder: Optional[IDocumentEncoder] = None,
+        analysis_cache: Optional[AnalysisResultCacheService] = None,
+        incremental_analysis: Optional[IncrementalAnalysisService] = None
     ):
         self.asset_data_source = asset_data_source
         self.document_analyzer = document_analyzer
         self.preview_state_service = preview_state_service
         self.chart_service = chart_service
+        self.normalizer = AssetFrameNormalizer()
+        # Serialisasi data untuk prompt ringkasan (default CSV ringkas, lihat DOCUMENT_ENCODER)
+        self.document_encoder = document_encoder or create_document_encoder(normalizer=self.normalizer)
+        # Tanpa cache hasil, setiap analisis dijalankan penuh
+        self.analysis_cache = analysis_cache
+        # Tanpa service inkremental, opsi 'incremental' diabaikan dan baseline tidak dibangun
+        self.incremental_analysis = incremental_analysis
+        self.financial_rollup = FinancialRollupService(self.normalizer)
+        self.stage_runner = AnalysisStageRunner()
         self.wib_timezone = pytz.timezone('Asia/Jakarta')
         self.REQUIRED_CYCLE_COLS = ['NO', 'NO ASSET', 'NAMA ASET', 'KONDISI', 'KETERANGAN', 'LOKASI SPESIFIK PER-INVENTORY', 'TANGGAL UPDATE', 'AREA']
 
@@ -61,9 +106,14 @@ class TriggerAnalysisUseCase:
         elif 'TANGGAL UPDATE' in df.columns:
             date_col = 'TANGGAL UPDATE'
 
+        unparsed_dates = 0
         if date_col:
-            temp_dates = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True)
+            # Tanggal sudah diparsing (dayfirst) sekali di frame kanonik
+            asset_frame = self.normalizer.ensure(df)
+            temp_dates = asset_frame[self.normalizer.date_column(date_col)]
             min_date_val, max_date_val = temp_dates.min(), temp_dates.max()
+            date_report = asset_frame.attrs.get(self.normalizer.DATE_REPORT_ATTR, {})
+            unparsed_dates = date_report.get(date_col, {}).get("unparsed", 0)
             
             if pd.notna(min_date_val) and pd.notna(max_date_val):
                 min_date = min_date_val.strftime('%d-%b-%Y')
@@ -81,43 +131,13 @@ class TriggerAnalysisUseCase:
             f"- Jumlah Area Unik: {num_areas}",
             f"- Rentang Waktu Data (berdasarkan {date_col if date_col else 'Tanggal'}): {date_range}"
         ]
+        if unparsed_dates:
+            overview_parts.append(f"- Tanggal Tidak Terbaca: {unparsed_dates} baris")
         return "\n".join(overview_parts)
 
     def _calculate_financial_summary(self, df: pd.DataFrame) -> List[Dict]:
-        if 'AREA' not in df.columns or 'NILAI ASET' not in df.columns or 'NAMA ASET' not in df.columns: 
-            return []
-        
-        df_copy = df.copy()
-        
-        df_copy['NILAI_NUMERIC'] = pd.to_numeric(
-            df_copy['NILAI ASET'].astype(str).str.replace(r'[^\d]', '', regex=True), 
-            errors='coerce'
-        ).fillna(0)
-        
-        summary = []
-        for area, group in df_copy.groupby('AREA'):
-            if group.empty or pd.isna(area): 
-                continue
-            
-            total_value = group['NILAI_NUMERIC'].sum()
-            max_row = group.loc[group['NILAI_NUMERIC'].idxmax()]
-            asset_termahal = {"nama": max_row.get('NAMA ASET', 'N/A'), "nilai": max_row['NILAI_NUMERIC']}
-            
-            non_zero_assets = group[group['NILAI_NUMERIC'] > 0]
-            if not non_zero_assets.empty:
-                min_row = non_zero_assets.loc[non_zero_assets['NILAI_NUMERIC'].idxmin()]
-                asset_termurah = {"nama": min_row.get('NAMA ASET', 'N/A'), "nilai": min_row['NILAI_NUMERIC']}
-            else: 
-                asset_termurah = {"nama": "N/A", "nilai": 0}
-            
-            summary.append({
-                "area": area, 
-                "total_value": total_value, 
-                "asset_termahal": asset_termahal, 
-                "asset_termurah": asset_termurah
-            })
-        
-        return summary
+        # Agregasi vektor (sum/idxmax/idxmin per AREA) di FinancialRollupService
+        return self.financial_rollup.build(df)
     
     def _format_financial_summary_to_text(self, summary_data: List[Dict]) -> str:
         if not summary_data: 
@@ -135,41 +155,272 @@ class TriggerAnalysisUseCase:
         
         return "\n".join(text_parts)
 
+    def _condition_counts(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Jumlah aset per AREA untuk setiap kategori kondisi (kolom 'total_assets' + kunci kategori,
+        indeks AREA terurut). KONDISI diklasifikasikan sekali pada nilai uniknya, lalu satu
+        tabel silang AREA x KONDISI (bincount kode faktor) dikalikan matriks keanggotaan kategori.
+        """
+        area_codes, areas = pd.factorize(df['AREA'], sort=True)
+        # Sama seperti astype(str) sebelumnya: nilai kosong ikut dihitung sebagai teks 'nan'/'None'
+        kondisi_codes, kondisi_values = pd.factorize(df['KONDISI'], use_na_sentinel=False)
+        kondisi_text = pd.Series(np.asarray(kondisi_values, dtype=object)).astype(str)
+
+        membership = np.column_stack([
+            kondisi_text.str.contains(keyword, case=False, na=False).to_numpy(dtype=np.int64)
+            for _, keyword, _ in self.CONDITION_CATEGORIES
+        ]) if len(kondisi_text) else np.zeros((0, len(self.CONDITION_CATEGORIES)), dtype=np.int64)
+
+        # Baris dengan AREA kosong tidak ikut (sama seperti groupby)
+        valid = area_codes >= 0
+        crosstab = np.bincount(
+            area_codes[valid] * len(kondisi_text) + kondisi_codes[valid],
+            minlength=len(areas) * len(kondisi_text)
+        ).reshape(len(areas), len(kondisi_text))
+
+        counts = pd.DataFrame(
+            crosstab @ membership,
+            index=pd.Index(areas, name='AREA'),
+            columns=[key for key, _, _ in self.CONDITION_CATEGORIES]
+        )
+        counts.insert(0, 'total_assets', crosstab.sum(axis=1))
+        return counts
+
     def _calculate_asset_condition_summary(self, df: pd.DataFrame) -> str:
         if 'AREA' not in df.columns or 'KONDISI' not in df.columns: 
             return ""
-        
+        return self._format_condition_summary(self._condition_counts(df))
+
+    def _format_condition_summary(self, counts: pd.DataFrame) -> str:
         text_parts = ["INSIGHT UTAMA"]
-        df_copy = df.copy()
-        df_copy['KONDISI'] = df_copy['KONDISI'].astype(str)
-        
-        summary = df_copy.groupby('AREA').agg(
-            total_assets=('AREA', 'size'),
-            baik=('KONDISI', lambda x: x.str.contains('Baik', case=False, na=False).sum()),
-            digunakan=('KONDISI', lambda x: x.str.contains('Digunakan', case=False, na=False).sum()),
-            cadangan=('KONDISI', lambda x: x.str.contains('Cadangan', case=False, na=False).sum()),
-            rusak_ringan=('KONDISI', lambda x: x.str.contains('Rusak Ringan', case=False, na=False).sum()),
-            rusak_berat=('KONDISI', lambda x: x.str.contains('Rusak Berat', case=False, na=False).sum()),
-            tidak_ditemukan=('KONDISI', lambda x: x.str.contains('Tidak Ditemukan', case=False, na=False).sum()),
-            penghapusan=('KONDISI', lambda x: x.str.contains('Penghapusan', case=False, na=False).sum())
-        ).reset_index()
-        
-        for _, row in summary.iterrows():
-            area_text = (
-                f"\nArea {row['AREA']}:\n"
-                f"- Total Aset: {row['total_assets']}\n"
-                f"- Kondisi Baik: {int(row['baik'])}\n"
-                f"- Digunakan: {int(row['digunakan'])}\n"
-                f"- Cadangan: {int(row['cadangan'])}\n"
-                f"- Rusak Ringan: {int(row['rusak_ringan'])}\n"
-                f"- Rusak Berat: {int(row['rusak_berat'])}\n"
-                f"- Tidak Ditemukan: {int(row['tidak_ditemukan'])}\n"
-                f"- Penghapusan: {int(row['penghapusan'])}"
-            )
-            text_parts.append(area_text)
+        for area, row in zip(counts.index, counts.itertuples(index=False)):
+            lines = [f"\nArea {area}:", f"- Total Aset: {row.total_assets}"]
+            lines += [f"- {label}: {int(getattr(row, key))}" for key, _, label in self.CONDITION_CATEGORIES]
+            text_parts.append("\n".join(lines))
         
         return "\n".join(text_parts)
 
+    def _generate_summary(self, asset_frame: pd.DataFrame, send_progress: Callable[[str, str], None]) -> str:
+        """
+        Ringkasan eksekutif dari dokumen ringkas (kolom relevan, kamus nilai). Pada mode 'auto',
+        sheet yang tidak muat sebagai baris dalam anggaran token diringkas secara map-reduce:
+        dipotong per SUMMARY_CHUNK_BY / SUMMARY_CHUNK_ROWS, diringkas paralel, lalu digabung.
+        """
+        mode = self.SUMMARY_MODE.strip().lower()
+        if mode != 'map_reduce':
+            document = self.document_encoder.encode(asset_frame)
+            logging.info(f"[ENCODER] Dokumen ringkasan: {document.describe()}")
+            if mode == 'single' or document.mode != 'aggregates':
+                send_progress("progress", f"Dokumen data disiapkan (~{document.token_estimate:,} token). Menghubungi AI untuk membuat Ringkasan Eksekutif...")
+                return self.document_analyzer.generate_summary(document.text)
+
+        # Potongan dibatasi jumlahnya agar panggilan LLM tahap map tidak melebihi SUMMARY_MAX_CHUNKS (+ jumlah grup)
+        chunk_rows = max(self.SUMMARY_CHUNK_ROWS, math.ceil(len(asset_frame) / max(self.SUMMARY_MAX_CHUNKS, 1)))
+        chunks = self.document_encoder.encode_chunks(asset_frame, chunk_rows, by=self.SUMMARY_CHUNK_BY or None)
+        for chunk in chunks:
+            logging.info(f"[ENCODER] Potongan ringkasan: {chunk.describe()}")
+        if len(chunks) == 1:
+            send_progress("progress", f"Dokumen data disiapkan (~{chunks[0].token_estimate:,} token). Menghubungi AI untuk membuat Ringkasan Eksekutif...")
+            return self.document_analyzer.generate_summary(chunks[0].text)
+
+        total_tokens = sum(chunk.token_estimate for chunk in chunks)
+        send_progress(
+            "progress",
+            f"Data besar diringkas per bagian ({len(chunks)} bagian, ~{total_tokens:,} token). Menghubungi AI untuk membuat Ringkasan Eksekutif..."
+        )
+        result = self.document_analyzer.generate_summary_map_reduce(
+            [chunk.text for chunk in chunks], labels=[chunk.label for chunk in chunks]
+        )
+        stages = result["stages"]
+        send_progress(
+            "progress",
+            f"Ringkasan {result['chunk_count']} bagian selesai dalam {stages['map_ms'] / 1000:.1f} detik "
+            f"(konkurensi {result['concurrency']}), penggabungan {stages['reduce_ms'] / 1000:.1f} detik."
+        )
+        return result["summary"]
+
+    def _analysis_cache_key(
+        self,
+        snapshot: SheetSnapshot,
+        final_options: Dict[str, Any],
+        baseline: Optional[AnalysisBaseline] = None
+    ) -> str:
+        """
+        Kunci cache hasil: versi konten sheet (hash isi), opsi analisis (tanpa force_refresh),
+        cara data diserialisasi untuk prompt, serta versi prompt dan model LLM. Pada mode
+        inkremental, ringkasan bergantung pada versi konten baseline sehingga versi itu ikut dalam
+        kunci; waktu pembuatan baseline tidak, karena baseline ditulis ulang setiap hasil disimpan.
+        Baseline dengan versi yang sama dengan sheet (delta kosong) tidak mengubah kunci.
+        """
+        key_options = {k: v for k, v in final_options.items() if k != 'force_refresh'}
+        key_options['document_encoder'] = getattr(self.document_encoder, 'name', type(self.document_encoder).__name__)
+        key_options['summary_mode'] = self.SUMMARY_MODE.strip().lower()
+        if baseline is not None and baseline.content_version != snapshot.version:
+            key_options['baseline'] = baseline.content_version
+        identity = self.document_analyzer.get_cache_identity()
+        return AnalysisResultCacheService.compute_key(
+            snapshot.version, key_options, identity["prompt_version"], identity["model"]
+        )
+
+    def _load_incremental_baseline(
+        self,
+        options: AnalysisOptions,
+        source: str,
+        sheet_name: str,
+        asset_frame: pd.DataFrame,
+        send_progress: Callable[[str, str], None]
+    ) -> Optional[AnalysisBaseline]:
+        """Baseline analisis tersimpan untuk mode inkremental, atau None jika harus analisis penuh."""
+        if not getattr(options, 'incremental', False) or self.incremental_analysis is None:
+            return None
+        if not self.incremental_analysis.supports(asset_frame):
+            send_progress("progress", f"Kolom '{self.incremental_analysis.KEY_COLUMN}' tidak ditemukan, analisis penuh dijalankan.")
+            return None
+        baseline = self.incremental_analysis.load_baseline(source, sheet_name)
+        if baseline is None:
+            send_progress("progress", "Belum ada analisis tersimpan untuk sheet ini, analisis penuh dijalankan.")
+            return None
+        if not self.incremental_analysis.is_compatible(baseline, asset_frame):
+            send_progress("progress", "Susunan kolom berubah sejak analisis tersimpan, analisis penuh dijalankan.")
+            return None
+        return baseline
+
+    def _compute_delta(
+        self,
+        baseline: AnalysisBaseline,
+        rows: pd.DataFrame,
+        send_progress: Callable[[str, str], None]
+    ) -> Optional[AssetDelta]:
+        """Selisih terhadap baseline; None (analisis penuh) jika terlalu banyak baris berubah."""
+        delta = self.incremental_analysis.diff(baseline, rows)
+        stats = delta.describe()
+        logging.info(f"[INCREMENTAL] Selisih terhadap baseline {baseline.created_at}: {stats}")
+        if delta.change_ratio > self.incremental_analysis.MAX_CHANGE_RATIO:
+            send_progress("progress", f"{delta.size} dari {stats['total']} baris berubah ({delta.change_ratio:.0%}), analisis penuh dijalankan.")
+            return None
+        send_progress(
+            "progress",
+            f"Mode inkremental: {stats['added']} baru, {stats['removed']} dihapus, {stats['changed']} berubah "
+            f"dari {stats['total']} aset. Hanya perubahan yang diproses."
+        )
+        return delta
+
+    def _build_stages(
+        self,
+        options: AnalysisOptions,
+        snapshot: SheetSnapshot,
+        asset_frame: pd.DataFrame,
+        df: pd.DataFrame,
+        sheet_name: str,
+        source_label: str,
+        has_area: bool,
+        send_progress: Callable[[str, str], None],
+        baseline: Optional[AnalysisBaseline] = None
+    ) -> List[AnalysisStage]:
+        """
+        Tahap analisis sesuai opsi. Tahap LLM didaftarkan pertama agar langsung dimulai.
+        Dengan opsi 'incremental', indeks baris dan agregat dasar (jumlah kondisi, NO ASSET ganda)
+        ikut dihitung untuk baseline berikutnya; analisis biasa tidak menanggung biaya ini. Dengan 'baseline', tahap agregat dan
+        ringkasan bergantung pada tahap 'delta' dan hanya memproses baris yang berubah; 'delta'
+        bernilai None jika perubahan terlalu besar sehingga semua tahap kembali ke hitungan penuh.
+        """
+        incremental = self.incremental_analysis
+        has_condition = has_area and 'KONDISI' in df.columns
+        track_rows = incremental is not None and getattr(options, 'incremental', False) and incremental.supports(df)
+        delta_dep = ('delta',) if baseline is not None else ()
+
+        def summary_stage(inputs):
+            print("\n" + "="*80)
+            print(f">>> DASHBOARD ANALYSIS ({source_label}) - LLM CALL #1: GENERATING SUMMARY")
+            print("="*80)
+            delta = inputs.get('delta')
+            if delta is not None and baseline.summary_text:
+                if delta.is_empty:
+                    send_progress("progress", "Tidak ada baris yang berubah, Ringkasan Eksekutif tersimpan digunakan kembali.")
+                    return baseline.summary_text
+                # LLM Call #1 (inkremental): ringkasan tersimpan diperbarui dari digest perubahan
+                digest = incremental.build_digest(
+                    baseline, delta, inputs.get('condition_counts'), self.CONDITION_CATEGORIES, inputs.get('financial_rollup')
+                )
+                send_progress(
+                    "progress",
+                    f"Ringkasan perubahan disiapkan (~{self.document_encoder.estimate_tokens(len(digest)):,} token). "
+                    "Menghubungi AI untuk memperbarui Ringkasan Eksekutif..."
+                )
+                summary_text = self.document_analyzer.generate_summary_update(baseline.summary_text, digest)
+            else:
+                # LLM Call #1: Generate Summary (satu prompt, atau map-reduce untuk sheet besar)
+                summary_text = self._generate_summary(asset_frame, send_progress)
+            print(f">>> Summary created: {len(summary_text)} characters")
+            return summary_text
+
+        def condition_counts_stage(inputs):
+            delta = inputs.get('delta')
+            if delta is not None and baseline.condition_counts is not None:
+                return incremental.update_condition_counts(baseline.condition_counts, delta, self._condition_counts)
+            return self._condition_counts(df)
+
+        def financial_rollup_stage(inputs):
+            delta = inputs.get('delta')
+            if delta is not None:
+                return incremental.update_financial_rollup(baseline.financial_rollup, delta, inputs['row_index'], asset_frame)
+            return self.financial_rollup.from_snapshot(snapshot)
+
+        def duplicate_keys_stage(inputs):
+            delta = inputs.get('delta')
+            if delta is not None and baseline.duplicate_keys is not None:
+                return incremental.update_duplicate_keys(baseline.duplicate_keys, delta, inputs['row_index'])
+            return incremental.duplicate_keys(df)
+
+        stages = []
+        if options.summarize:
+            summary_deps = delta_dep
+            if baseline is not None:
+                # Digest perubahan memuat selisih jumlah kondisi dan total nilai per AREA
+                summary_deps += ('financial_rollup',) + (('condition_counts',) if has_condition else ())
+            stages.append(AnalysisStage('summary', 'Ringkasan Eksekutif (AI)', summary_stage, depends_on=summary_deps, io_bound=True))
+        if track_rows:
+            stages.append(AnalysisStage('row_index', 'Indeks Baris', lambda _: incremental.from_snapshot(snapshot)))
+            stages.append(AnalysisStage(
+                'duplicate_keys', 'NO ASSET Ganda', duplicate_keys_stage,
+                depends_on=delta_dep + (('row_index',) if baseline is not None else ())
+            ))
+        if baseline is not None:
+            stages.append(AnalysisStage(
+                'delta', 'Selisih Data',
+                lambda inputs: self._compute_delta(baseline, inputs['row_index'], send_progress),
+                depends_on=('row_index',)
+            ))
+        if options.data_overview:
+            stages.append(AnalysisStage('overview', 'Data Overview', lambda _: self._create_data_overview(asset_frame, options, sheet_name)))
+        if has_condition and (options.insight or track_rows):
+            stages.append(AnalysisStage('condition_counts', 'Jumlah Kondisi per Area', condition_counts_stage, depends_on=delta_dep))
+        if has_area and options.insight:
+            stages.append(AnalysisStage(
+                'insight', 'Insight Kondisi Aset',
+                lambda inputs: self._format_condition_summary(inputs['condition_counts']) if has_condition else "",
+                depends_on=('condition_counts',) if has_condition else ()
+            ))
+        stages.append(AnalysisStage(
+            'financial_rollup', 'Rollup Keuangan', financial_rollup_stage,
+            depends_on=delta_dep + (('row_index',) if baseline is not None else ())
+        ))
+        if has_area and options.financial_analysis:
+            stages.append(AnalysisStage(
+                'financial', 'Analisa Keuangan',
+                lambda inputs: self._format_financial_summary_to_text(inputs['financial_rollup']),
+                depends_on=('financial_rollup',)
+            ))
+        if options.check_duplicates:
+            stages.append(AnalysisStage(
+                'duplicates', 'Pengecekan Duplikasi',
+                lambda inputs: self.document_analyzer.generate_duplicate_report(df, inputs.get('duplicate_keys')),
+                depends_on=('duplicate_keys',) if track_rows else ()
+            ))
+        stages.append(AnalysisStage('charts', 'Data Grafik', lambda _: self.chart_service.create_chart_data(asset_frame)))
+        stages.append(AnalysisStage('cycle_assets', 'Tabel Siklus Aset', lambda _: self._get_cycle_assets_table(df)))
+        return stages
+
     def execute(self, options: AnalysisOptions, progress_callback: Callable[[Dict], None]):
         """Menjalankan seluruh alur analisis dan melaporkan progres melalui callback."""
         try:
@@ -193,11 +444,18 @@ class TriggerAnalysisUseCase:
 
             logging.info(f">>> STARTING ANALYSIS: Source={source_label} | Sheet={options.sheet_name} | ID={target_id}")
 
-            # Ambil daftar sheet yang tersedia di link yang dipilih
-            available_sheets = self.asset_data_source.get_sheet_names(spreadsheet_id=target_id)
+            # Analisis selalu membaca data segar: sheet diunduh ulang tanpa membuang entri cache
+            # lebih dulu, sehingga artifacts (frame kanonik, indeks, cube, tabel DuckDB) tetap dipakai
+            # jika isinya tidak berubah. Pengecekan keberadaan sheet digabung dengan pengambilan data
+            # (satu round trip batchGet), sheet yang tidak ada tidak muncul di hasil fetch_many.
             requested_sheet = options.sheet_name
-            
-            if requested_sheet and requested_sheet in available_sheets:
+            fetched_sheets = {}
+            if requested_sheet:
+                fetched_sheets = self.asset_data_source.fetch_many(
+                    [requested_sheet], spreadsheet_id=target_id, force_refresh=True
+                )
+
+            if requested_sheet in fetched_sheets:
                 sheet_to_analyze = requested_sheet
             else:
                 sheet_to_analyze = default_sheet_name
@@ -206,104 +464,101 @@ class TriggerAnalysisUseCase:
 
             send_progress("starting", f"Analisis untuk data {source_label} pada sheet '{sheet_to_analyze}' telah dimulai...")
             
-            # Fetch data dengan Spreadsheet ID yang dinamis
-            df = self.asset_data_source.fetch_data(sheet_to_analyze, spreadsheet_id=target_id)
+            # Fetch data dengan Spreadsheet ID yang dinamis. Sheet yang dianalisis sudah dimuat ulang
+            # oleh fetch_many, sehingga snapshot di bawah cukup dibaca dari cache.
+            if sheet_to_analyze not in fetched_sheets:
+                self.asset_data_source.fetch_many([sheet_to_analyze], spreadsheet_id=target_id, force_refresh=True)
+            snapshot = self.asset_data_source.fetch_snapshot(sheet_to_analyze, spreadsheet_id=target_id)
 
-            if df.empty:
+            if snapshot.dataframe.empty:
                 raise ValueError(f"Tidak ada data di sheet '{sheet_to_analyze}' pada link {source_label}.")
 
-            df.columns = [str(col).strip().upper() for col in df.columns]
-
-            for col in df.columns:
-                if 'NILAI ASET' in col:
-                    df.rename(columns={col: 'NILAI ASET'}, inplace=True)
-                    break
+            # Frame kanonik (kolom bertipe) dibangun sekali per versi sheet dan dipakai untuk
+            # kalkulasi; 'df' adalah versi tampilannya (tanpa kolom internal).
+            asset_frame = self.normalizer.from_snapshot(snapshot)
+            df = self.normalizer.display_frame(asset_frame)
             
             send_progress("progress", f"Data {source_label} berhasil dimuat. Memproses kalkulasi...")
             
-            report_parts = []
-            
-            if options.data_overview:
-                report_parts.append(self._create_data_overview(df, options, sheet_to_analyze))
+            has_area = 'AREA' in df.columns
+            if not has_area and (options.insight or options.financial_analysis):
+                send_progress("progress", "Peringatan: Kolom 'AREA' tidak ditemukan, beberapa analisis dilewati.")
 
-            cycle_assets_table = self._get_cycle_assets_table(df)
-            document_text = df.to_string()
-            
-            # ========================================
-            # PERBAIKAN UTAMA: Evaluasi Summary
-            # ========================================
-            if options.summarize:
-                send_progress("progress", "Menghubungi AI untuk membuat Ringkasan Eksekutif...")
-                
-                print("\n" + "="*80)
-                print(f">>> DASHBOARD ANALYSIS ({source_label}) - LLM CALL #1: GENERATING SUMMARY")
-                print("="*80)
-                
-                # LLM Call #1: Generate Summary
-                summary_text = self.document_analyzer.generate_summary(document_text)
-                
-                print(f">>> Summary created: {len(summary_text)} characters")
-                report_parts.append(summary_text)
-
-                # --- EVALUASI DASHBOARD DINONAKTIFKAN UNTUK PRODUKSI ---
-                # print("-"*80)
-                # print(">>> DASHBOARD ANALYSIS - LLM CALL #2: EVALUATING SUMMARY")
-                # print("-"*80)
-
-                # LLM Call #2: Evaluate Summary
-                # evaluation_result = self.document_analyzer.evaluate_summary_factualness(
-                #     source_document=document_text,
-                #     summary_to_evaluate=summary_text,
-                #     user_prompt="Ringkasan eksekutif dari keseluruhan data untuk dashboard."
-                # )
-                
-                # print("\n" + "="*80)
-                # print(">>> DASHBOARD EVALUATION RESULT:")
-                # print("="*80)
-                # is_correct = evaluation_result.get('factual_accuracy', {}).get('is_correct')
-                # print(f"Factual Accuracy: {'CORRECT ✓' if is_correct else 'INCORRECT ✗'}")
-                # print(f"Completeness: {evaluation_result.get('completeness_score', 'N/A')}/5")
-                # print(f"Relevance: {evaluation_result.get('relevance_score', 'N/A')}/5")
-                # print(f"Final Score: {evaluation_result.get('final_score', 'N/A')}")
-                # print(f"Reasoning: {evaluation_result.get('reasoning', 'N/A')}")
-                # notes = evaluation_result.get('factual_accuracy', {}).get('notes', [])
-                # if notes:
-                #     print(f"Notes: {', '.join(notes)}")
-                # print("="*80 + "\n")
-
-            if 'AREA' in df.columns:
-                if options.insight:
-                    insight_text = self._calculate_asset_condition_summary(df)
-                    if insight_text: 
-                        report_parts.append(insight_text)
-                
-                if options.financial_analysis:
-                    financial_summary_data = self._calculate_financial_summary(df)
-                    financial_summary_text = self._format_financial_summary_to_text(financial_summary_data)
-                    if financial_summary_text: 
-                        report_parts.append(financial_summary_text)
-            else:
-                if options.insight or options.financial_analysis:
-                    send_progress("progress", "Peringatan: Kolom 'AREA' tidak ditemukan, beberapa analisis dilewati.")
-
-            if options.check_duplicates:
-                report_parts.append(self.document_analyzer.generate_duplicate_report(df))
-            
-            final_html = self.document_analyzer.format_summary_to_html("\n\n".join(filter(None, report_parts)).strip())
-            
             final_options = options.dict()
             final_options['sheet_name'] = sheet_to_analyze
             final_options['source'] = source
+            baseline = self._load_incremental_baseline(options, source, sheet_to_analyze, asset_frame, send_progress)
+
+            # Data dan opsi yang sama dengan analisis sebelumnya: pakai hasil tersimpan tanpa memanggil LLM
+            cache_key = self._analysis_cache_key(snapshot, final_options, baseline) if self.analysis_cache else None
+            if cache_key and not getattr(options, 'force_refresh', False):
+                lookup_started = time.perf_counter()
+                cached = self.analysis_cache.get(cache_key)
+                if cached is not None:
+                    analysis_result = {
+                        "data_available": True,
+                        "dataframe": df,
+                        **{k: cached.get(k) for k in self.CACHED_RESULT_KEYS},
+                        "options": final_options,
+                        "analysis_time": datetime.now(self.wib_timezone),
+                        "analysis_cache": {"hit": True, "key": cache_key[:16], "cached_at": cached.get("cached_at")},
+                    }
+                    if cached.get("incremental_baseline") is not None and self.incremental_analysis is not None:
+                        # Hasil tersimpan tetap menjadi baseline saat disimpan ke riwayat; indeks baris diambil dari snapshot
+                        analysis_result["incremental_baseline"] = self.incremental_analysis.restore_baseline(
+                            cached["incremental_baseline"], snapshot
+                        )
+                    self.preview_state_service.set(analysis_result)
+                    logging.info(
+                        f"[ANALYSIS-CACHE] Hit {cache_key[:12]} untuk sheet '{sheet_to_analyze}' "
+                        f"({(time.perf_counter() - lookup_started) * 1000:.1f} ms), analisis tidak dijalankan ulang."
+                    )
+                    send_progress("completed", f"Data {source_label} ({sheet_to_analyze}) tidak berubah sejak analisis sebelumnya, hasil tersimpan digunakan.")
+                    return
+
+            # Tahap analisis sebagai DAG: panggilan LLM berjalan di pool I/O sementara kalkulasi
+            # pandas berjalan paralel di worker pool; laporan disusun berurutan setelah semua selesai.
+            stages = self._build_stages(
+                options, snapshot, asset_frame, df, sheet_to_analyze, source_label, has_area, send_progress, baseline
+            )
+            results, stage_timings = self.stage_runner.run(stages, on_event=progress_callback)
+            delta = results.get('delta')
+
+            report_parts = [results.get(name) for name in self.REPORT_ORDER]
+            final_html = self.document_analyzer.format_summary_to_html("\n\n".join(filter(None, report_parts)).strip())
 
             analysis_result = {
                 "data_available": True, 
                 "dataframe": df, 
                 "summary_text": final_html,
-                "chart_data": self.chart_service.create_chart_data(df), # ChartService akan melihat kolom 'NILAI ASET' yang bersih
-                "cycle_assets_table": cycle_assets_table,
+                "chart_data": results["charts"],
+                "cycle_assets_table": results["cycle_assets"],
+                "financial_summary": results["financial_rollup"],
                 "options": final_options,
                 "analysis_time": datetime.now(self.wib_timezone),
+                "stage_timings": stage_timings,
+                "analysis_cache": {"hit": False, "key": cache_key[:16] if cache_key else None},
+                "incremental": {
+                    "mode": "incremental" if delta is not None else "full",
+                    "baseline_created_at": baseline.created_at if baseline is not None else None,
+                    **(delta.describe() if delta is not None else {}),
+                },
             }
+            if 'row_index' in results:
+                # Disimpan sebagai baseline analisis inkremental berikutnya saat hasil ini disimpan ke riwayat
+                analysis_result["incremental_baseline"] = self.incremental_analysis.build_baseline(
+                    source, sheet_to_analyze, snapshot.version, asset_frame, results['row_index'],
+                    results.get('condition_counts'), results['financial_rollup'], results.get('duplicate_keys'),
+                    results.get('summary')
+                )
+            if cache_key:
+                cached_payload = {k: analysis_result[k] for k in self.CACHED_RESULT_KEYS}
+                if "incremental_baseline" in analysis_result:
+                    # Agregat baseline ikut disimpan tanpa indeks baris (dibangun ulang dari snapshot saat hit)
+                    cached_payload["incremental_baseline"] = self.incremental_analysis.compact_baseline(
+                        analysis_result["incremental_baseline"]
+                    )
+                self.analysis_cache.put(cache_key, cached_payload)
             
             self.preview_state_service.set(analysis_result)
             send_progress("completed", f"Analisis berhasil diselesaikan menggunakan sumber {source_label} ({sheet_to_analyze}).")
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
 
@@ -8,6 +8,17 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# create_all tidak menambah kolom pada tabel yang sudah ada; kolom baru didaftarkan di sini
+ADDED_COLUMNS = [
+    ("history", "financial_summary", "JSON"),
+]
+
+def add_missing_columns():
+    """Menambahkan kolom baru (ADDED_COLUMNS) ke tabel lama. Aman dipanggil berulang kali."""
+    with engine.begin() as connection:
+        for table, column, column_type in ADDED_COLUMNS:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+
 def get_db():
     """
     Dependency function untuk FastAPI yang menyediakan sesi database per request.
@@ -24,6 +24,7 @@ class History(Base):
     cycle_assets = Column(JSON, nullable=True)
     user_email = Column(String, nullable=True)
     sheet_name = Column(String, nullable=True) 
+    financial_summary = Column(JSON, nullable=True)
 
 class File(Base):
     """Model ORM SQLAlchemy untuk tabel 'files'."""
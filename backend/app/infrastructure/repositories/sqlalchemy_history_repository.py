@@ -53,5 +53,6 @@ class SqlalchemyHistoryRepository(IHistoryRepository):
             upload_date=model.upload_date,
             cycle_assets=model.cycle_assets,
             user_email=model.user_email,
-            sheet_name=model.sheet_name 
+            sheet_name=model.sheet_name,
+            financial_summary=model.financial_summary
         )
\ No newline at end of file
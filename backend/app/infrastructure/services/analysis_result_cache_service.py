@@ -0,0 +1,156 @@
+import os
+import pickle
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+class AnalysisResultCacheService:
+    """
+    Cache hasil analisis lengkap (ringkasan HTML, data grafik, tabel) yang dialamatkan oleh isi:
+    kuncinya hash dari (versi konten sheet, opsi analisis, versi prompt, model). Analisis ulang
+    atas data yang tidak berubah langsung memakai hasil tersimpan tanpa memanggil LLM.
+    Entri disimpan sebagai file pickle di ANALYSIS_CACHE_PATH sehingga tetap ada setelah restart,
+    dengan salinan LRU kecil (bytes yang sama) di memori. Setiap get mengembalikan salinan baru,
+    sehingga pemanggil bebas mengubah hasilnya. File terlama dihapus jika melebihi MAX_ENTRIES.
+    """
+    # Di Azure, set ENV 'ANALYSIS_CACHE_PATH' ke direktori yang di-mount (mis. '/app/persisted/analysis_cache')
+    BASE_DIR = Path(os.getenv("ANALYSIS_CACHE_PATH", "analysis_cache"))
+    ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").strip().lower() not in ("0", "false", "no")
+    MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "64"))
+    MEMORY_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MEMORY_ENTRIES", "8"))
+    FILE_SUFFIX = ".pkl"
+
+    def __init__(self, base_dir: Optional[Path] = None, enabled: Optional[bool] = None, max_entries: Optional[int] = None):
+        self.base_dir = Path(base_dir) if base_dir is not None else self.BASE_DIR
+        self.enabled = self.ENABLED if enabled is None else enabled
+        self.max_entries = self.MAX_ENTRIES if max_entries is None else max_entries
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        if self.enabled and not self.base_dir.exists():
+            try:
+                self.base_dir.mkdir(parents=True, exist_ok=True)
+            except Exception as e:
+                logging.error(f"[ANALYSIS-CACHE] Gagal membuat direktori cache analisis: {e}")
+
+    @staticmethod
+    def compute_key(content_version: str, options: Dict[str, Any], prompt_version: str, model: str) -> str:
+        """Hash SHA-256 dari identitas analisis. Urutan kunci opsi tidak berpengaruh."""
+        identity = {
+            "content": content_version,
+            "options": options,
+            "prompt_version": prompt_version,
+            "model": model,
+        }
+        payload = json.dumps(identity, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Salinan payload tersimpan untuk kunci ini, atau None. Memori diperiksa dulu, lalu disk."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+        if blob is not None:
+            return pickle.loads(blob)
+
+        path = self._path(key)
+        if not path.exists():
+            self._stats["misses"] += 1
+            return None
+        try:
+            blob = path.read_bytes()
+            payload = pickle.loads(blob)
+            # mtime menandai pemakaian terakhir untuk eviksi file
+            os.utime(path, None)
+        except Exception as e:
+            logging.warning(f"[ANALYSIS-CACHE] Entri {key[:12]} tidak terbaca, dibuang: {e}")
+            self._remove(path)
+            self._stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self._remember(key, blob)
+            self._stats["disk_hits"] += 1
+        return payload
+
+    def put(self, key: str, payload: Dict[str, Any]):
+        """
+        Menyimpan salinan payload (harus bisa di-pickle); perubahan payload setelahnya tidak
+        memengaruhi cache. Penulisan atomik: file sementara lalu replace.
+        """
+        if not self.enabled:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            blob = pickle.dumps(
+                {**payload, "cached_at": datetime.now(timezone.utc).isoformat()},
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+            tmp_path.write_bytes(blob)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.error(f"[ANALYSIS-CACHE] Gagal menyimpan hasil analisis {key[:12]}: {e}")
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            self._remember(key, blob)
+            self._stats["writes"] += 1
+        self._evict_files()
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """Menghapus satu entri (atau semuanya). Mengembalikan jumlah file terhapus."""
+        with self._lock:
+            if key is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(key, None)
+        paths = [self._path(key)] if key is not None else list(self.base_dir.glob(f"*{self.FILE_SUFFIX}"))
+        return sum(1 for path in paths if self._remove(path))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "memory_entries": len(self._memory), "enabled": self.enabled, "path": str(self.base_dir)}
+
+    def _path(self, key: str) -> Path:
+        return self.base_dir / f"{key}{self.FILE_SUFFIX}"
+
+    def _remember(self, key: str, blob: bytes):
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > max(self.MEMORY_ENTRIES, 0):
+            self._memory.popitem(last=False)
+
+    def _evict_files(self):
+        try:
+            files = sorted(self.base_dir.glob(f"*{self.FILE_SUFFIX}"), key=lambda p: p.stat().st_mtime)
+        except Exception as e:
+            logging.warning(f"[ANALYSIS-CACHE] Gagal membaca direktori cache: {e}")
+            return
+        for path in files[:max(len(files) - self.max_entries, 0)]:
+            if self._remove(path):
+                with self._lock:
+                    self._memory.pop(path.stem, None)
+                    self._stats["evictions"] += 1
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logging.warning(f"[ANALYSIS-CACHE] Gagal menghapus {path.name}: {e}")
+            return False
@@ -0,0 +1,101 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+@dataclass
+class AnalysisStage:
+    """
+    Satu tahap analisis. 'func' menerima hasil tahap yang menjadi dependensinya
+    ({nama_tahap: hasil}). Tahap io_bound (panggilan LLM) dijalankan di pool I/O terpisah
+    agar tidak menunggu atau menahan worker kalkulasi pandas.
+    """
+    name: str
+    label: str
+    func: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = ()
+    io_bound: bool = False
+
+class AnalysisStageRunner:
+    """
+    Menjalankan DAG kecil tahap analisis: setiap tahap dimulai segera setelah semua
+    dependensinya selesai, tahap yang saling bebas berjalan bersamaan. Awal dan akhir
+    setiap tahap dilaporkan lewat on_event. Jika satu tahap gagal, tahap yang belum
+    dimulai dibatalkan dan error-nya diteruskan ke pemanggil.
+    """
+    CPU_WORKERS = int(os.getenv("ANALYSIS_CPU_WORKERS", "4"))
+    IO_WORKERS = int(os.getenv("ANALYSIS_IO_WORKERS", "2"))
+
+    def run(
+        self,
+        stages: List[AnalysisStage],
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """Mengembalikan (hasil per tahap, waktu per tahap: started_at, finished_at, elapsed_ms)."""
+        pending = {stage.name: stage for stage in stages}
+        if len(pending) != len(stages):
+            raise ValueError("Nama tahap analisis harus unik.")
+        unknown = {dep for stage in stages for dep in stage.depends_on} - set(pending)
+        if unknown:
+            raise ValueError(f"Dependensi tahap tidak dikenal: {', '.join(sorted(unknown))}.")
+
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        running: Dict[Future, AnalysisStage] = {}
+        # Setelah ada tahap gagal, event tahap lain yang masih berjalan tidak dilaporkan lagi
+        failed = threading.Event()
+        cpu_pool = ThreadPoolExecutor(max_workers=max(self.CPU_WORKERS, 1), thread_name_prefix="analysis-cpu")
+        io_pool = ThreadPoolExecutor(max_workers=max(self.IO_WORKERS, 1), thread_name_prefix="analysis-io")
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(dep in results for dep in stage.depends_on):
+                        del pending[name]
+                        pool = io_pool if stage.io_bound else cpu_pool
+                        inputs = {dep: results[dep] for dep in stage.depends_on}
+                        running[pool.submit(self._run_stage, stage, inputs, timings, on_event, failed)] = stage
+                if not running:
+                    raise ValueError(f"Dependensi tahap analisis siklik: {', '.join(sorted(pending))}.")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    results[stage.name] = future.result()
+        finally:
+            # Saat error, tahap yang belum berjalan dibatalkan tanpa menunggu tahap yang sedang berjalan
+            for pool in (cpu_pool, io_pool):
+                pool.shutdown(wait=not running, cancel_futures=True)
+        return results, timings
+
+    @staticmethod
+    def _run_stage(
+        stage: AnalysisStage,
+        inputs: Dict[str, Any],
+        timings: Dict[str, Dict[str, Any]],
+        on_event: Optional[Callable[[Dict[str, Any]], None]],
+        failed: threading.Event
+    ) -> Any:
+        def emit(state: str, message: str):
+            if on_event and not failed.is_set():
+                on_event({"status": "progress", "message": message, "stage": {"name": stage.name, **timing, "state": state}})
+
+        timing: Dict[str, Any] = {"started_at": datetime.now(timezone.utc).isoformat()}
+        timings[stage.name] = timing
+        emit("started", f"Tahap '{stage.label}' dimulai...")
+        started = time.perf_counter()
+        try:
+            result = stage.func(inputs)
+        except Exception as e:
+            timing.update(finished_at=datetime.now(timezone.utc).isoformat(), elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+            logging.error(f"[STAGE] Tahap '{stage.name}' gagal setelah {timing['elapsed_ms']} ms: {e}")
+            emit("failed", f"Tahap '{stage.label}' gagal.")
+            failed.set()
+            raise
+        timing.update(finished_at=datetime.now(timezone.utc).isoformat(), elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+        logging.info(f"[STAGE] Tahap '{stage.name}' selesai dalam {timing['elapsed_ms']} ms.")
+        emit("finished", f"Tahap '{stage.label}' selesai ({timing['elapsed_ms'] / 1000:.1f} detik).")
+        return result
@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+
+DimensionFilter = Tuple[str, Callable[[pd.Series], pd.Series]]
+
+@dataclass
+class AssetCube:
+    """
+    Cube agregasi per versi sheet: satu baris per kombinasi nilai dimensi yang muncul,
+    dengan jumlah baris (COUNT) dan total NILAI ASET (SUM). Urutan baris mengikuti
+    kemunculan pertama kombinasi di sheet, dan nilai kosong disimpan sebagai None,
+    sehingga filter dan value_counts pada cube menghasilkan urutan yang sama dengan
+    operasi serupa pada baris aslinya.
+    """
+    COUNT = '_COUNT'
+    SUM = '_SUM_NILAI'
+
+    dimensions: List[str]
+    cells: pd.DataFrame = field(repr=False)
+    # Per dimensi: kode factorize tiap sel dan nilai uniknya (+ None di posisi terakhir)
+    codes: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    uniques: Dict[str, pd.Series] = field(default_factory=dict, repr=False)
+
+    def covers(self, *columns: str) -> bool:
+        return all(col in self.dimensions for col in columns)
+
+    def select(self, filters: List[DimensionFilter]) -> pd.DataFrame:
+        """
+        Sel cube yang lolos semua filter dimensi. value_filter cukup dievaluasi pada nilai
+        unik dimensi, lalu dipetakan ke sel lewat kode factorize (kode -1 -> None).
+        """
+        mask = np.ones(len(self.cells), dtype=bool)
+        for column, value_filter in filters:
+            lookup = np.asarray(value_filter(self.uniques[column]).fillna(False), dtype=bool)
+            mask &= lookup[self.codes[column]]
+        return self.cells[mask]
+
+    def value_counts(self, cells: pd.DataFrame, column: str) -> pd.Series:
+        """Setara df[column].value_counts() pada baris yang diwakili 'cells'."""
+        present = cells[cells[column].notna()]
+        counts = present.groupby(column, sort=False)[self.COUNT].sum()
+        counts.name = 'count'
+        return counts.sort_values(ascending=False)
+
+    def crosstab(self, cells: pd.DataFrame, row: str, column: str) -> pd.DataFrame:
+        """Setara df.groupby(row)[column].value_counts().unstack(fill_value=0)."""
+        present = cells[cells[row].notna() & cells[column].notna()]
+        if present.empty:
+            return pd.DataFrame()
+        return present.groupby([row, column])[self.COUNT].sum().unstack(fill_value=0)
+
+class AssetCubeService:
+    """
+    Membangun cube count/sum NILAI ASET atas dimensi berkardinalitas rendah sekali per
+    versi sheet (disimpan sebagai artifact snapshot), agar pertanyaan hitung/jumlah/distribusi
+    yang hanya memfilter dimensi tersebut tidak perlu memindai seluruh baris.
+    """
+    ARTIFACT_NAME = 'asset_cube'
+    DIMENSIONS = ['AREA', 'KONDISI', 'HASIL INVENTORY', 'MANUFACTURE', 'KODE LOKASI SAP']
+
+    def __init__(self, normalizer: Optional[AssetFrameNormalizer] = None):
+        self.normalizer = normalizer or AssetFrameNormalizer()
+
+    def from_snapshot(self, snapshot: SheetSnapshot) -> AssetCube:
+        return snapshot.get_artifact(
+            self.ARTIFACT_NAME,
+            lambda: self.build(self.normalizer.from_snapshot(snapshot))
+        )
+
+    def build(self, frame: pd.DataFrame) -> AssetCube:
+        dimensions = [col for col in self.DIMENSIONS if col in frame.columns]
+        if not dimensions:
+            return AssetCube(dimensions, pd.DataFrame(columns=[AssetCube.COUNT, AssetCube.SUM]))
+
+        source = frame[dimensions].copy()
+        source[AssetCube.COUNT] = 1
+        nilai_col = self.normalizer.COL_NILAI_NUMERIC
+        source[AssetCube.SUM] = frame[nilai_col] if nilai_col in frame.columns else 0
+
+        cells = (
+            source.groupby(dimensions, sort=False, dropna=False)[[AssetCube.COUNT, AssetCube.SUM]]
+            .sum()
+            .reset_index()
+        )
+        # groupby mengubah kunci kosong menjadi NaN; dikembalikan ke None seperti di sheet
+        cells[dimensions] = cells[dimensions].astype(object).where(cells[dimensions].notna(), None)
+        cells.attrs = {}
+
+        cube = AssetCube(dimensions, cells)
+        for column in dimensions:
+            codes, uniques = pd.factorize(cells[column])
+            cube.codes[column] = codes
+            cube.uniques[column] = pd.Series(list(uniques) + [None], dtype=object)
+        return cube
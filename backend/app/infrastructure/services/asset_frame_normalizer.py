@@ -0,0 +1,102 @@
+import logging
+import pandas as pd
+from typing import List, Optional
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.infrastructure.services.date_column_parser import DateColumnParser
+
+class AssetFrameNormalizer:
+    """
+    Tahap normalisasi tunggal untuk DataFrame aset, dijalankan sekali per versi sheet.
+    Menghasilkan frame kanonik: nama kolom UPPERCASE, variasi kolom 'NILAI ASET' disatukan,
+    dan kolom internal bertipe (berawalan '_'):
+      - _NILAI_NUMERIC        : NILAI ASET sebagai int64 ('2.980.700' -> 2980700)
+      - _<KOLOM TANGGAL>_DT   : TANGGAL INVENTORY / TANGGAL UPDATE sebagai datetime
+      - _<KOLOM>_CAT          : AREA / KONDISI / HASIL INVENTORY sebagai categorical
+    Kolom asli tetap berupa string agar tampilan, unduhan, dan riwayat tidak berubah.
+    Ringkasan parsing tanggal (format terdeteksi & jumlah baris gagal) disimpan di
+    frame.attrs['date_parse_report'].
+    """
+    ARTIFACT_NAME = 'asset_frame'
+    DATE_REPORT_ATTR = 'date_parse_report'
+
+    COL_NILAI_ASET = 'NILAI ASET'
+    COL_NILAI_NUMERIC = '_NILAI_NUMERIC'
+    DATE_COLUMNS = ['TANGGAL INVENTORY', 'TANGGAL UPDATE']
+    CATEGORICAL_COLUMNS = ['AREA', 'KONDISI', 'HASIL INVENTORY']
+
+    # Dipakai bersama agar cache format tanggal bertahan antar versi sheet dan antar use case
+    _shared_date_parser = DateColumnParser()
+
+    def __init__(self, date_parser: Optional[DateColumnParser] = None):
+        self.date_parser = date_parser or self._shared_date_parser
+
+    @staticmethod
+    def date_column(col: str) -> str:
+        return f'_{col}_DT'
+
+    @staticmethod
+    def category_column(col: str) -> str:
+        return f'_{col}_CAT'
+
+    @staticmethod
+    def internal_columns(df: pd.DataFrame) -> List[str]:
+        return [col for col in df.columns if str(col).startswith('_')]
+
+    def from_snapshot(self, snapshot: SheetSnapshot) -> pd.DataFrame:
+        """Frame kanonik untuk versi sheet ini; dibangun sekali lalu dipakai ulang dari cache."""
+        return snapshot.get_artifact(self.ARTIFACT_NAME, lambda: self.normalize(snapshot.dataframe))
+
+    def ensure(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Mengembalikan df apa adanya jika sudah kanonik, selain itu dinormalisasi."""
+        return df if self.internal_columns(df) else self.normalize(df)
+
+    def normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Salinan dangkal dengan nama kolom UPPERCASE dan kolom 'NILAI ASET' yang distandarkan."""
+        columns = [str(col).strip().upper() for col in df.columns]
+        for idx, col in enumerate(columns):
+            if self.COL_NILAI_ASET in col:
+                columns[idx] = self.COL_NILAI_ASET
+                break
+
+        renamed = df.copy(deep=False)
+        renamed.columns = columns
+        return renamed
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Membangun frame kanonik. Frame asal tidak diubah."""
+        frame = self.normalize_columns(df)
+        if frame.empty:
+            return frame
+
+        if self.COL_NILAI_ASET in frame.columns:
+            frame[self.COL_NILAI_NUMERIC] = self.parse_currency(frame[self.COL_NILAI_ASET])
+
+        # Format day-first (03-Apr-2022 / 03/04/2022) dideteksi sekali lalu diparsing per format
+        date_report = {}
+        for col in self.DATE_COLUMNS:
+            if col in frame.columns:
+                result = self.date_parser.parse(frame[col], cache_key=col)
+                frame[self.date_column(col)] = result.values
+                date_report[col] = {"formats": result.formats, "unparsed": result.unparsed_count}
+                if result.unparsed_count:
+                    logging.info(f"[DATE] {result.unparsed_count} baris pada kolom '{col}' tidak dapat diparsing.")
+        frame.attrs[self.DATE_REPORT_ATTR] = date_report
+
+        for col in self.CATEGORICAL_COLUMNS:
+            if col in frame.columns:
+                frame[self.category_column(col)] = frame[col].astype('category')
+
+        return frame
+
+    def display_frame(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Frame tanpa kolom internal, untuk ditampilkan, diunduh, atau disimpan ke riwayat."""
+        return frame.drop(columns=self.internal_columns(frame))
+
+    @staticmethod
+    def parse_currency(values: pd.Series) -> pd.Series:
+        """Regex [^\\d] membuang titik/simbol sehingga 'Rp 2.980.700' menjadi 2980700."""
+        return pd.to_numeric(
+            values.astype(str).str.replace(r'[^\d]', '', regex=True),
+            errors='coerce'
+        ).fillna(0).astype('int64')
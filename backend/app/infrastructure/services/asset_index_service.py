@@ -0,0 +1,143 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+
+@dataclass
+class AssetIndexes:
+    """
+    Indeks hash per versi sheet: nilai kunci ternormalisasi -> posisi baris (iloc)
+    pada frame kanonik. Posisi selalu terurut sehingga urutan baris asli terjaga.
+    """
+    maps: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+
+    def has(self, column: str) -> bool:
+        return column in self.maps
+
+    def lookup(self, column: str, keys: Iterable[str]) -> Optional[np.ndarray]:
+        """Posisi baris untuk satu/lebih kunci; None jika kolom tidak diindeks."""
+        index = self.maps.get(column)
+        if index is None:
+            return None
+        hits = [index[key] for key in keys if key in index]
+        if not hits:
+            return np.empty(0, dtype=np.intp)
+        return hits[0] if len(hits) == 1 else np.unique(np.concatenate(hits))
+
+class TrigramIndex:
+    """
+    Indeks terbalik trigram untuk filter 'contains' (tidak peka huruf besar) pada satu kolom.
+    Trigram dibangun dari nilai unik saja; pencarian memotong posting list trigram pola
+    untuk mendapatkan kandidat, lalu kandidat diverifikasi dengan pencocokan substring.
+    """
+    GRAM_SIZE = 3
+    # Pola yang mengandung karakter regex tidak bisa dijawab sebagai substring literal
+    REGEX_CHARS = frozenset('.^$*+?{}[]\\|()')
+
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values)
+        self._texts: List[Optional[str]] = [value.lower() if isinstance(value, str) else None for value in uniques]
+        self._rows: Dict[int, np.ndarray] = pd.Series(codes).groupby(codes, sort=False).indices
+
+        postings = defaultdict(list)
+        for uid, text in enumerate(self._texts):
+            if text is None:
+                continue
+            for gram in {text[i:i + self.GRAM_SIZE] for i in range(len(text) - self.GRAM_SIZE + 1)}:
+                postings[gram].append(uid)
+        self._postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def search(self, pattern: str) -> Optional[np.ndarray]:
+        """
+        Posisi baris yang mengandung 'pattern' (terurut). None berarti pola terlalu pendek
+        atau berupa regex, sehingga pemanggil harus kembali ke scan biasa.
+        """
+        if len(pattern) < self.GRAM_SIZE or self.REGEX_CHARS.intersection(pattern):
+            return None
+
+        needle = pattern.lower()
+        posting_lists = []
+        for gram in {needle[i:i + self.GRAM_SIZE] for i in range(len(needle) - self.GRAM_SIZE + 1)}:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return np.empty(0, dtype=np.intp)
+            posting_lists.append(posting)
+
+        posting_lists.sort(key=len)
+        candidates = posting_lists[0]
+        for posting in posting_lists[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                return np.empty(0, dtype=np.intp)
+
+        matched = [self._rows[uid] for uid in candidates if needle in self._texts[uid]]
+        if not matched:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(matched))
+
+class AssetIndexService:
+    """
+    Membangun indeks lookup titik (NO ASSET, KODE LOKASI SAP) dan indeks
+    trigram untuk filter 'contains' sekali per versi sheet, lalu menyimpannya sebagai
+    artifact snapshot, sehingga pencarian tidak lagi memindai/regex seluruh frame
+    pada setiap panggilan. Normalisasi kunci sama dengan filter di QueryAssetsUseCase.
+    """
+    ARTIFACT_NAME = 'asset_indexes'
+
+    @staticmethod
+    def normalize_no_asset(values: pd.Series) -> pd.Series:
+        """'12345.0 ' -> '12345' (nomor aset yang terbaca sebagai float)."""
+        return values.astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+
+    @staticmethod
+    def normalize_text(values: pd.Series) -> pd.Series:
+        return values.astype(str).str.strip().str.lower()
+
+    INDEXED_COLUMNS: Dict[str, Callable[[pd.Series], pd.Series]] = {
+        'NO ASSET': normalize_no_asset,
+        'KODE LOKASI SAP': normalize_text,
+    }
+
+    # Kolom yang difilter dengan 'contains' dan dilayani indeks trigram (dibangun saat pertama dipakai)
+    SUBSTRING_COLUMNS = ['NAMA ASET', 'MODEL/TYPE', 'SERIAL NUMBER', 'MANUFACTURE', 'PIC TEAM FAV']
+    SUBSTRING_ARTIFACT_PREFIX = 'trigram_index:'
+
+    def __init__(self, normalizer: Optional[AssetFrameNormalizer] = None):
+        self.normalizer = normalizer or AssetFrameNormalizer()
+
+    def from_snapshot(self, snapshot: SheetSnapshot) -> AssetIndexes:
+        """Indeks untuk versi sheet ini, dibangun dari frame kanonik lalu dipakai ulang."""
+        return snapshot.get_artifact(
+            self.ARTIFACT_NAME,
+            lambda: self.build(self.normalizer.from_snapshot(snapshot))
+        )
+
+    def search_substring(self, snapshot: SheetSnapshot, column: str, pattern: str) -> Optional[np.ndarray]:
+        """
+        Posisi baris frame kanonik yang kolomnya mengandung 'pattern' (case-insensitive).
+        None jika kolom tidak diindeks / tidak ada, atau pola harus ditangani scan biasa.
+        """
+        if column not in self.SUBSTRING_COLUMNS:
+            return None
+        frame = self.normalizer.from_snapshot(snapshot)
+        if column not in frame.columns:
+            return None
+        index = snapshot.get_artifact(
+            self.SUBSTRING_ARTIFACT_PREFIX + column,
+            lambda: TrigramIndex(frame[column])
+        )
+        return index.search(pattern)
+
+    def build(self, frame: pd.DataFrame) -> AssetIndexes:
+        indexes = AssetIndexes()
+        for column, normalize in self.INDEXED_COLUMNS.items():
+            if column not in frame.columns:
+                continue
+            keys = normalize(frame[column]).to_numpy()
+            # groupby(...).indices mengelompokkan posisi per kunci dalam satu pass hash
+            indexes.maps[column] = pd.Series(keys).groupby(keys, sort=False).indices
+        return indexes
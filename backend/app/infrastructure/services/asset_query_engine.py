@@ -0,0 +1,119 @@
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.infrastructure.services.asset_query_planner import AssetQueryPlanner, Predicate
+
+class IAssetQueryEngine(ABC):
+    """
+    Mesin eksekusi QueryAssetsUseCase atas frame kanonik satu versi sheet.
+    Use case menerjemahkan parameter tool menjadi Predicate serta parameter agregasi dan
+    urutan yang sama untuk semua engine; engine hanya menentukan cara mengeksekusinya.
+    'rows' adalah posisi baris frame kanonik yang lolos filter (None = semua baris).
+    """
+    name = ''
+
+    @abstractmethod
+    def select_rows(
+        self,
+        snapshot: SheetSnapshot,
+        frame: pd.DataFrame,
+        predicates: List[Predicate],
+        shared_rows: Optional[Dict[FrozenSet[str], np.ndarray]] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Posisi baris (terurut) yang lolos semua predicate, beserta trace eksekusinya."""
+        pass
+
+    @abstractmethod
+    def fetch(
+        self,
+        snapshot: SheetSnapshot,
+        frame: pd.DataFrame,
+        rows: Optional[np.ndarray],
+        columns: List[str],
+        sort_column: Optional[str] = None,
+        ascending: bool = True,
+        limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Baris terpilih (kolom 'columns'); jika diurutkan, baris dengan nilai kosong dibuang."""
+        pass
+
+    @abstractmethod
+    def value_counts(self, snapshot: SheetSnapshot, frame: pd.DataFrame, rows: Optional[np.ndarray], column: str) -> pd.Series:
+        """Setara value_counts(): terbanyak dulu, seri mengikuti urutan kemunculan pertama."""
+        pass
+
+    @abstractmethod
+    def top_per_group(
+        self,
+        snapshot: SheetSnapshot,
+        frame: pd.DataFrame,
+        rows: Optional[np.ndarray],
+        group_field: str,
+        count_field: str
+    ) -> pd.DataFrame:
+        """Nilai 'count_field' terbanyak per grup: kolom [group_field, count_field, 'count']."""
+        pass
+
+    @abstractmethod
+    def breakdown(
+        self,
+        snapshot: SheetSnapshot,
+        frame: pd.DataFrame,
+        rows: Optional[np.ndarray],
+        group_field: str,
+        count_field: str
+    ) -> pd.DataFrame:
+        """Tabel silang jumlah baris: indeks group_field, kolom nilai count_field (terurut)."""
+        pass
+
+class PandasQueryEngine(IAssetQueryEngine):
+    """Engine bawaan: planner NumPy untuk filter, lalu operasi pandas pada hasil take."""
+    name = 'pandas'
+
+    def __init__(self, planner: Optional[AssetQueryPlanner] = None):
+        self.planner = planner or AssetQueryPlanner()
+
+    def select_rows(self, snapshot, frame, predicates, shared_rows=None):
+        return self.planner.execute(frame, predicates, shared_rows)
+
+    def fetch(self, snapshot, frame, rows, columns, sort_column=None, ascending=True, limit=None):
+        df = self.planner.take(frame, rows, columns)
+        if sort_column and sort_column in df.columns:
+            df = df.dropna(subset=[sort_column])
+            df = df.sort_values(by=sort_column, ascending=ascending)
+        if limit:
+            df = df.head(limit)
+        return df
+
+    def value_counts(self, snapshot, frame, rows, column):
+        return self.planner.take(frame, rows, [column])[column].value_counts()
+
+    def top_per_group(self, snapshot, frame, rows, group_field, count_field):
+        df = self.planner.take(frame, rows, list(dict.fromkeys([group_field, count_field])))
+        top_per_group = df.groupby(group_field)[count_field].value_counts().groupby(level=0).head(1)
+        return top_per_group.reset_index(name='count')
+
+    def breakdown(self, snapshot, frame, rows, group_field, count_field):
+        df = self.planner.take(frame, rows, list(dict.fromkeys([group_field, count_field])))
+        return df.groupby(group_field)[count_field].value_counts().unstack(fill_value=0)
+
+def create_query_engine(name: Optional[str] = None, planner: Optional[AssetQueryPlanner] = None) -> IAssetQueryEngine:
+    """
+    Engine sesuai konfigurasi QUERY_ENGINE ('pandas' atau 'duckdb'). DuckDB bersifat opsional:
+    jika paketnya tidak terpasang, engine pandas dipakai dan peringatan dicatat.
+    """
+    engine_name = (name or os.getenv("QUERY_ENGINE", "pandas")).strip().lower()
+    if engine_name == 'duckdb':
+        try:
+            from app.infrastructure.services.duckdb_query_engine import DuckDBQueryEngine
+            return DuckDBQueryEngine(planner)
+        except ImportError as e:
+            logging.warning(f"[ENGINE] DuckDB tidak tersedia ({e}), memakai engine pandas.")
+    elif engine_name != 'pandas':
+        logging.warning(f"[ENGINE] QUERY_ENGINE '{engine_name}' tidak dikenal, memakai engine pandas.")
+    return PandasQueryEngine(planner)
@@ -0,0 +1,298 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+
+@dataclass
+class ColumnStats:
+    """
+    Statistik kolom per versi sheet untuk memperkirakan selektivitas predikat.
+    - category_counts: jumlah baris per kategori (urutan sama dengan categories, baris kosong di posisi terakhir)
+    - sorted_values: nilai numerik/tanggal terurut tanpa NaN/NaT, untuk estimasi rentang via searchsorted
+    """
+    row_count: int
+    category_counts: Dict[str, np.ndarray] = field(default_factory=dict)
+    sorted_values: Dict[str, np.ndarray] = field(default_factory=dict)
+
+@dataclass
+class Predicate:
+    """
+    Satu syarat filter dalam rencana query. 'evaluate(frame, rows)' hanya memeriksa posisi
+    baris yang masih terpilih ('rows', terurut) dan mengembalikan mask boolean sepanjang 'rows';
+    'selectivity' adalah perkiraan fraksi baris yang lolos.
+    'sql' (opsional) adalah terjemahan syarat yang sama sebagai ekspresi SQL berparameter
+    (ekspresi, parameter) untuk query engine berbasis SQL; None berarti hanya bisa dievaluasi di sini.
+    """
+    label: str
+    column: str
+    strategy: str
+    cost: float
+    selectivity: float
+    evaluate: Callable[[pd.DataFrame, np.ndarray], np.ndarray]
+    sql: Optional[Tuple[str, List[Any]]] = None
+
+    @property
+    def rank(self) -> float:
+        # Urutan klasik filter konjungtif: murah dan paling menyaring lebih dulu
+        return self.cost / max(1.0 - self.selectivity, 1e-6)
+
+class AssetQueryPlanner:
+    """
+    Perencana filter untuk frame aset kanonik. Setiap filter direpresentasikan sebagai
+    Predicate dengan strategi evaluasi (indeks, kode kategori, rentang, atau scan teks),
+    diurutkan berdasarkan perkiraan selektivitas dan biaya dari statistik kolom per versi.
+    Frame kanonik tidak pernah disalin selama filter: tiap predicate hanya mengevaluasi
+    baris yang masih terpilih, dan hasil akhirnya berupa posisi baris untuk satu kali take.
+    """
+    ARTIFACT_NAME = 'column_stats'
+
+    # Perkiraan biaya relatif per baris untuk tiap strategi
+    COST_INDEX = 0.01
+    COST_CATEGORY = 0.05
+    COST_RANGE = 1.0
+    COST_SCAN = 20.0
+    # Tanpa statistik teks, filter scan diasumsikan menyisakan 10% baris
+    DEFAULT_SCAN_SELECTIVITY = 0.1
+
+    def __init__(self, normalizer: Optional[AssetFrameNormalizer] = None):
+        self.normalizer = normalizer or AssetFrameNormalizer()
+
+    def stats_from_snapshot(self, snapshot: SheetSnapshot) -> ColumnStats:
+        """Statistik kolom untuk versi sheet ini, dihitung sekali lalu dipakai ulang."""
+        return snapshot.get_artifact(
+            self.ARTIFACT_NAME,
+            lambda: self.build_stats(self.normalizer.from_snapshot(snapshot))
+        )
+
+    def build_stats(self, frame: pd.DataFrame) -> ColumnStats:
+        stats = ColumnStats(row_count=len(frame))
+        for column in self.normalizer.CATEGORICAL_COLUMNS:
+            cat_col = self.normalizer.category_column(column)
+            if cat_col not in frame.columns:
+                continue
+            categorical = frame[cat_col]
+            counts = np.bincount(categorical.cat.codes.to_numpy() + 1, minlength=len(categorical.cat.categories) + 1)
+            # Kode -1 (kosong) dipindah ke posisi terakhir agar selaras dengan lookup[codes]
+            stats.category_counts[cat_col] = np.append(counts[1:], counts[0])
+
+        numeric_columns = [self.normalizer.COL_NILAI_NUMERIC] + [
+            self.normalizer.date_column(col) for col in self.normalizer.DATE_COLUMNS
+        ]
+        for column in numeric_columns:
+            if column in frame.columns:
+                stats.sorted_values[column] = np.sort(frame[column].dropna().to_numpy())
+        return stats
+
+    # --- Pembuat Predicate ---
+
+    def index_predicate(self, label: str, column: str, positions: np.ndarray, stats: ColumnStats) -> Predicate:
+        """Predicate dari posisi baris hasil lookup indeks (hash/trigram)."""
+        def evaluate(frame: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+            # Kedua array terurut dan unik, jadi cukup pencarian biner posisi di 'positions'
+            found = np.searchsorted(positions, rows)
+            found[found == len(positions)] = 0
+            return positions[found] == rows if len(positions) else np.zeros(len(rows), dtype=bool)
+
+        return Predicate(label, column, 'index', self.COST_INDEX, self._fraction(len(positions), stats), evaluate)
+
+    def category_predicate(
+        self,
+        label: str,
+        column: str,
+        frame: pd.DataFrame,
+        stats: ColumnStats,
+        value_filter: Callable[[pd.Series], pd.Series]
+    ) -> Predicate:
+        """
+        Predicate pada kolom kategori: 'value_filter' (ekspresi yang sama dengan filter scan)
+        hanya dijalankan pada nilai unik + satu nilai kosong (None), lalu hasilnya dipetakan
+        ke seluruh baris lewat kode kategori. Selektivitasnya eksak dari jumlah per kategori.
+        """
+        cat_col = self.normalizer.category_column(column)
+        categorical = frame[cat_col]
+        candidates = pd.Series(list(categorical.cat.categories) + [None], dtype=object)
+        lookup = np.asarray(value_filter(candidates).fillna(False), dtype=bool)
+        codes = categorical.cat.codes.to_numpy()
+        counts = stats.category_counts.get(cat_col)
+        matched = int(counts[lookup].sum()) if counts is not None else int(lookup[codes].sum())
+
+        # Kode -1 (kosong) otomatis mengambil elemen terakhir lookup, yaitu hasil untuk None
+        return Predicate(
+            label, column, 'category', self.COST_CATEGORY, self._fraction(matched, stats),
+            lambda _frame, rows: lookup[self._gather(codes, rows)]
+        )
+
+    def range_predicate(
+        self,
+        label: str,
+        column: str,
+        stats: ColumnStats,
+        lower: Any = None,
+        upper: Any = None
+    ) -> Predicate:
+        """Predicate rentang inklusif pada kolom numerik/tanggal internal (NaN/NaT tidak lolos)."""
+        sorted_values = stats.sorted_values.get(column)
+        if sorted_values is not None:
+            lo = 0 if lower is None else np.searchsorted(sorted_values, self._search_key(lower, sorted_values), side='left')
+            hi = len(sorted_values) if upper is None else np.searchsorted(sorted_values, self._search_key(upper, sorted_values), side='right')
+            selectivity = self._fraction(max(int(hi - lo), 0), stats)
+        else:
+            selectivity = 0.5
+
+        conditions, params = [], []
+        for operator, bound in (('>=', lower), ('<=', upper)):
+            if bound is not None:
+                conditions.append(f"{self.quote(column)} {operator} ?")
+                params.append(pd.Timestamp(bound).to_pydatetime() if isinstance(bound, (pd.Timestamp, np.datetime64)) else bound)
+
+        def evaluate(frame: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+            values = self._gather(frame[column].to_numpy(), rows)
+            mask = np.ones(len(values), dtype=bool)
+            # Perbandingan dengan NaN/NaT selalu False, sama seperti filter pandas
+            if lower is not None:
+                mask &= values >= self._search_key(lower, values)
+            if upper is not None:
+                mask &= values <= self._search_key(upper, values)
+            return mask
+
+        return Predicate(
+            label, column, 'range', self.COST_RANGE, selectivity, evaluate,
+            sql=(" AND ".join(conditions), params) if conditions else None
+        )
+
+    def scan_predicate(
+        self,
+        label: str,
+        column: str,
+        value_filter: Callable[[pd.Series], pd.Series],
+        selectivity: Optional[float] = None,
+        sql: Optional[Tuple[str, List[Any]]] = None
+    ) -> Predicate:
+        """Predicate yang harus memindai kolom teks (regex/contains) pada baris yang masih terpilih."""
+        def evaluate(frame: pd.DataFrame, rows: np.ndarray) -> np.ndarray:
+            values = frame[column]
+            if len(rows) != len(values):
+                values = values.iloc[rows]
+            return np.asarray(value_filter(values), dtype=bool)
+
+        return Predicate(
+            label, column, 'scan', self.COST_SCAN,
+            self.DEFAULT_SCAN_SELECTIVITY if selectivity is None else selectivity,
+            evaluate, sql
+        )
+
+    # --- Eksekusi ---
+
+    def plan(self, predicates: List[Predicate]) -> List[Predicate]:
+        """Mengurutkan predicate (stabil) dari rank terkecil."""
+        return sorted(predicates, key=lambda predicate: predicate.rank)
+
+    def execute(
+        self,
+        frame: pd.DataFrame,
+        predicates: List[Predicate],
+        shared_rows: Optional[Dict[FrozenSet[str], np.ndarray]] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Menjalankan rencana dan mengembalikan (rows, explain): 'rows' adalah posisi baris
+        (terurut) yang lolos semua predicate. Setiap langkah hanya mengevaluasi baris yang
+        lolos langkah sebelumnya; begitu kosong, predicate sisanya tidak dievaluasi lagi.
+
+        'shared_rows' (opsional, dipakai bersama oleh beberapa query atas frame yang sama)
+        menyimpan baris hasil tiap prefiks rencana, dikunci himpunan label predicate-nya.
+        Prefiks terpanjang yang sudah pernah dihitung dipakai ulang tanpa evaluasi.
+        """
+        plan = self.plan(predicates)
+        rows = np.arange(len(frame))
+        reused = 0
+        if shared_rows is not None:
+            for length in range(len(plan), 0, -1):
+                cached = shared_rows.get(self._prefix_key(plan, length))
+                if cached is not None:
+                    rows, reused = cached, length
+                    break
+
+        steps = []
+        started = time.perf_counter()
+        for order, predicate in enumerate(plan, start=1):
+            step_started = time.perf_counter()
+            if order <= reused:
+                # Prefiks dipakai ulang; jumlah baris antaranya hanya diketahui bila tersimpan juga
+                prefix_rows = shared_rows.get(self._prefix_key(plan, order))
+                rows_evaluated, rows_after, executed = 0, None if prefix_rows is None else len(prefix_rows), False
+            else:
+                rows_evaluated = len(rows)
+                executed = rows_evaluated > 0
+                if executed:
+                    rows = rows[predicate.evaluate(frame, rows)]
+                if shared_rows is not None:
+                    shared_rows[self._prefix_key(plan, order)] = rows
+                rows_after = len(rows)
+            step = {
+                "step": order,
+                "filter": predicate.label,
+                "column": predicate.column,
+                "strategy": predicate.strategy,
+                "estimated_selectivity": round(predicate.selectivity, 4),
+                "estimated_rows": int(round(predicate.selectivity * len(frame))),
+                "rows_evaluated": int(rows_evaluated),
+                "rows_after": None if rows_after is None else int(rows_after),
+                "executed": executed,
+                "elapsed_ms": round((time.perf_counter() - step_started) * 1000, 3),
+            }
+            if shared_rows is not None:
+                step["shared"] = order <= reused
+            steps.append(step)
+
+        explain = {
+            "total_rows": int(len(frame)),
+            "matched_rows": int(len(rows)),
+            "filter_ms": round((time.perf_counter() - started) * 1000, 3),
+            "steps": steps,
+        }
+        return rows, explain
+
+    @staticmethod
+    def take(frame: pd.DataFrame, rows: Optional[np.ndarray], columns: List[str]) -> pd.DataFrame:
+        """
+        Satu kali take dari frame kanonik: hanya 'columns' pada posisi 'rows' (None = semua baris).
+        Diambil per kolom dari array-nya, sehingga kolom lain tidak ikut tersalin dan
+        attrs frame kanonik (header sheet, laporan tanggal) tidak ikut terbawa.
+        """
+        index = frame.index if rows is None else frame.index.take(rows)
+        data = {
+            # Indeks fancy, bukan .take(): kolom di blok 2D pandas tidak kontigu dan
+            # ndarray.take menyalin seluruh kolom lebih dulu
+            col: frame[col].array if rows is None else frame[col].array[rows]
+            for col in columns
+        }
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    @staticmethod
+    def quote(column: str) -> str:
+        """Nama kolom sebagai identifier SQL (kolom sheet mengandung spasi dan '/')."""
+        return '"' + str(column).replace('"', '""') + '"'
+
+    @staticmethod
+    def _prefix_key(plan: List[Predicate], length: int) -> FrozenSet[str]:
+        # Konjungsi bersifat komutatif: prefiks dikunci himpunan label, bukan urutannya
+        return frozenset(predicate.label for predicate in plan[:length])
+
+    @staticmethod
+    def _fraction(count: int, stats: ColumnStats) -> float:
+        return count / stats.row_count if stats.row_count else 0.0
+
+    @staticmethod
+    def _gather(values: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Nilai pada posisi 'rows'; tanpa salinan jika semua baris masih terpilih."""
+        return values if len(rows) == len(values) else values[rows]
+
+    @staticmethod
+    def _search_key(value: Any, sorted_values: np.ndarray) -> Any:
+        if np.issubdtype(sorted_values.dtype, np.datetime64):
+            return pd.Timestamp(value).to_datetime64()
+        return value
@@ -0,0 +1,329 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+import httpx
+import pandas as pd
+from google.auth.transport.requests import Request
+
+from app.config import settings
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.domain.repositories.async_asset_data_source import IAsyncAssetDataSource
+from app.infrastructure.services.sheet_cache_service import SheetCacheService
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
+from app.infrastructure.services.google_credentials import load_service_account_credentials
+
+class AsyncGoogleSheetsAssetDataSource(IAsyncAssetDataSource):
+    """
+    Implementasi IAsyncAssetDataSource yang memanggil Google Sheets REST API langsung
+    melalui satu httpx.AsyncClient (koneksi keep-alive di-pool), tanpa discovery client
+    yang blocking. Cache dan parser dipakai bersama dengan GoogleSheetsAssetDataSource.
+    """
+    SCOPES = [
+        'https://www.googleapis.com/auth/spreadsheets.readonly',
+        'https://www.googleapis.com/auth/drive.metadata.readonly'
+    ]
+    SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+    DRIVE_API_URL = "https://www.googleapis.com/drive/v3/files"
+    PROBE_INTERVAL_SECONDS = float(os.getenv("SHEET_PROBE_INTERVAL_SECONDS", "5"))
+    HTTP_TIMEOUT_SECONDS = float(os.getenv("SHEETS_HTTP_TIMEOUT_SECONDS", "30"))
+    HTTP_MAX_CONNECTIONS = int(os.getenv("SHEETS_HTTP_MAX_CONNECTIONS", "20"))
+
+    def __init__(self, cache_service: Optional[SheetCacheService] = None):
+        self.credentials = load_service_account_credentials(self.SCOPES)
+        self.cache_service = cache_service or SheetCacheService()
+        self.parser = SheetValuesParser()
+        self.master_spreadsheet_id = os.getenv("GOOGLE_SHEET_ID_MASTER") or settings.GOOGLE_SHEET_ID
+        self.siklus_spreadsheet_id = os.getenv("GOOGLE_SHEET_ID_SIKLUS")
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token_lock = asyncio.Lock()
+        self._revision_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._probe_enabled = True
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Membuat AsyncClient bersama secara lazy agar koneksi dipakai ulang antar request."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=60
+                )
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+    async def _get_auth_headers(self) -> Dict[str, str]:
+        """Memastikan access token masih berlaku; refresh dijalankan di thread agar tidak memblokir loop."""
+        async with self._token_lock:
+            if not self.credentials.valid:
+                await asyncio.to_thread(self.credentials.refresh, Request())
+        return {"Authorization": f"Bearer {self.credentials.token}"}
+
+    async def _get_json(self, url: str, params: Any = None, retries: int = 1) -> Dict[str, Any]:
+        """GET ke Google API dengan retry untuk error jaringan/5xx."""
+        for attempt in range(retries):
+            try:
+                response = await self._get_client().get(url, params=params, headers=await self._get_auth_headers())
+                response.raise_for_status()
+                return response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                is_client_error = isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500
+                if is_client_error or attempt >= retries - 1:
+                    raise
+                logging.error(f"[API-ERROR] Percobaan {attempt + 1} gagal: {e}")
+                await asyncio.sleep(2)
+        return {}
+
+    async def _probe_revision(self, spreadsheet_id: str) -> Optional[str]:
+        """Probe murah 'version' + 'modifiedTime' dari Drive API, sama seperti versi sinkron."""
+        if not self._probe_enabled:
+            return None
+
+        now = time.monotonic()
+        cached = self._revision_cache.get(spreadsheet_id)
+        if cached and now - cached[0] < self.PROBE_INTERVAL_SECONDS:
+            return cached[1]
+
+        try:
+            metadata = await self._get_json(
+                f"{self.DRIVE_API_URL}/{spreadsheet_id}",
+                params={"fields": "version,modifiedTime", "supportsAllDrives": "true"}
+            )
+            revision = f"{metadata.get('version')}:{metadata.get('modifiedTime')}"
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 403:
+                logging.warning(f"[INFO] Akses Drive metadata ditolak, probe revisi dinonaktifkan: {e}")
+                self._probe_enabled = False
+            else:
+                logging.warning(f"[API-ERROR] Probe revisi untuk ID {spreadsheet_id} gagal: {e}")
+            return None
+        except httpx.TransportError as e:
+            logging.warning(f"[API-ERROR] Probe revisi untuk ID {spreadsheet_id} gagal: {e}")
+            return None
+
+        self._revision_cache[spreadsheet_id] = (now, revision)
+        return revision
+
+    async def get_sheet_names(self, spreadsheet_id: Optional[str] = None) -> List[str]:
+        """Mengambil semua nama sheet dari ID spreadsheet tertentu."""
+        target_id = spreadsheet_id or self.master_spreadsheet_id
+        try:
+            metadata = await self._get_json(
+                f"{self.SHEETS_API_URL}/{target_id}",
+                params={"fields": "sheets(properties(title))"},
+                retries=3
+            )
+        except httpx.HTTPError as e:
+            logging.error(f"[API-ERROR] Gagal mengambil nama sheet: {e}")
+            raise ConnectionError(f"Gagal mengambil nama sheet dari ID {target_id}")
+        return [sheet.get('properties', {}).get('title', '') for sheet in metadata.get('sheets', [])]
+
+    async def fetch_data(
+        self,
+        sheet_name: Optional[str],
+        spreadsheet_id: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Mengambil data dari Google Sheets (melalui cache bersama).
+        Jika sheet tidak ada, kembalikan DataFrame kosong tanpa melempar error teknis.
+        Jika 'columns' diisi, hanya kolom tersebut yang dikembalikan (lihat _download_columns).
+        """
+        target_sheet = sheet_name or 'MASTER-SHEET'
+        target_id = spreadsheet_id or self.master_spreadsheet_id
+        key = (target_id, target_sheet)
+        revision = await self._probe_revision(target_id)
+
+        if columns:
+            projected = await self._download_columns(key, columns, revision)
+            if projected is not None:
+                return projected
+
+        entry = await self.cache_service.get_or_load_async(
+            key,
+            lambda: self._download_sheet(target_sheet, target_id),
+            revision=revision
+        )
+        if columns:
+            return self.parser.project(entry.dataframe, columns)
+        return entry.dataframe.copy()
+
+    async def fetch_snapshot(self, sheet_name: Optional[str], spreadsheet_id: Optional[str] = None) -> SheetSnapshot:
+        """Seperti fetch_data, tetapi mengembalikan entri cache tanpa salinan beserta versi dan artifacts-nya."""
+        target_sheet = sheet_name or 'MASTER-SHEET'
+        target_id = spreadsheet_id or self.master_spreadsheet_id
+        entry = await self.cache_service.get_or_load_async(
+            (target_id, target_sheet),
+            lambda: self._download_sheet(target_sheet, target_id),
+            revision=await self._probe_revision(target_id)
+        )
+        return SheetSnapshot(target_id, target_sheet, entry.version, entry.dataframe, entry.artifacts)
+
+    async def _download_columns(self, key: Tuple[str, str], columns: List[str], revision: Optional[str]) -> Optional[pd.DataFrame]:
+        """
+        Mengunduh hanya kolom yang diminta lewat values:batchGet berdasarkan header yang
+        tersimpan, dengan aturan yang sama seperti versi sinkron. None berarti baca sheet penuh.
+        """
+        entry = self.cache_service.get(key)
+        if entry is not None and self.cache_service.is_current(entry, revision):
+            return None
+        header = self.cache_service.get_header(key)
+        if header is None:
+            return None
+        indexes = self.parser.resolve_columns(header.columns, columns)
+        if not indexes:
+            return None
+        projected = self.cache_service.get_projection(key, indexes, revision)
+        if projected is not None:
+            return projected.dataframe.copy()
+
+        target_id, target_sheet = key
+        header_row = header.row_index + 1
+        ranges = [f"'{target_sheet}'!A{header_row}:Z{header_row}"]
+        ranges += [f"'{target_sheet}'!{self.parser.column_letter(i)}:{self.parser.column_letter(i)}" for i in indexes]
+        try:
+            result = await self._get_json(
+                f"{self.SHEETS_API_URL}/{target_id}/values:batchGet",
+                params=[("ranges", range_name) for range_name in ranges]
+            )
+        except httpx.HTTPError as e:
+            logging.warning(f"[INFO] Pembacaan sebagian kolom sheet '{target_sheet}' gagal, membaca sheet penuh: {e}")
+            return None
+
+        value_ranges = result.get('valueRanges', [])
+        header_values = value_ranges[0].get('values', [[]]) if value_ranges else [[]]
+        if self.parser.clean_header_cells(header_values[0] if header_values else []) != header.cells:
+            logging.info(f"[INFO] Header sheet '{target_sheet}' berubah, membaca sheet penuh.")
+            return None
+
+        df = await asyncio.to_thread(
+            self.parser.columns_to_dataframe,
+            [value_range.get('values', []) for value_range in value_ranges[1:]], header, indexes
+        )
+        return self.cache_service.put_projection(key, indexes, df, revision=revision).dataframe.copy()
+
+    async def fetch_many(
+        self,
+        sheet_names: Optional[List[str]] = None,
+        spreadsheet_id: Optional[str] = None,
+        force_refresh: bool = False
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Mengambil banyak sheet sekaligus lewat values:batchGet (atau satu panggilan
+        spreadsheets.get jika 'sheet_names' None dan belum ada sheet segar di cache).
+        Sheet yang masih segar di cache tidak diunduh ulang, kecuali dengan force_refresh=True
+        (entri lama tetap ada sampai diganti, sehingga artifacts dipakai ulang jika isinya sama).
+        Sheet yang tidak ada tidak disertakan.
+        """
+        target_id = spreadsheet_id or self.master_spreadsheet_id
+        if force_refresh:
+            self._revision_cache.pop(target_id, None)
+        revision = await self._probe_revision(target_id)
+
+        if sheet_names is None:
+            if force_refresh or not self.cache_service.current_sheet_names(target_id, revision):
+                frames = await self._download_all_sheets(target_id)
+                for name, df in frames.items():
+                    await asyncio.to_thread(self.cache_service.put, (target_id, name), df, revision)
+                return {name: df.copy() for name, df in frames.items()}
+            sheet_names = await self.get_sheet_names(spreadsheet_id=target_id)
+
+        results: Dict[str, pd.DataFrame] = {}
+        missing = []
+        for name in dict.fromkeys(sheet_names):
+            entry = None if force_refresh else self.cache_service.get((target_id, name))
+            # Entri kosong bisa berarti sheet tidak ada, jadi keberadaannya dicek ulang lewat batchGet
+            if entry is not None and not entry.dataframe.empty and self.cache_service.is_current(entry, revision):
+                results[name] = entry.dataframe.copy()
+            else:
+                missing.append(name)
+
+        if missing:
+            for name, df in (await self._batch_download_sheets(missing, target_id)).items():
+                entry = await asyncio.to_thread(self.cache_service.put, (target_id, name), df, revision)
+                results[name] = entry.dataframe.copy()
+
+        return {name: results[name] for name in dict.fromkeys(sheet_names) if name in results}
+
+    def invalidate_cache(self, sheet_name: Optional[str] = None, spreadsheet_id: Optional[str] = None) -> None:
+        """Menghapus cache sheet agar pembacaan berikutnya mengambil data terbaru dari API."""
+        self.cache_service.invalidate(spreadsheet_id=spreadsheet_id, sheet_name=sheet_name)
+        if spreadsheet_id:
+            self._revision_cache.pop(spreadsheet_id, None)
+        else:
+            self._revision_cache.clear()
+
+    async def _download_sheet(self, target_sheet: str, target_id: str) -> pd.DataFrame:
+        """Mengunduh satu sheet lewat REST API lalu mem-parsing di worker thread."""
+        range_name = quote(f"'{target_sheet}'!A:Z", safe='')
+        try:
+            result = await self._get_json(f"{self.SHEETS_API_URL}/{target_id}/values/{range_name}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 400:
+                logging.warning(f"[INFO] Sheet '{target_sheet}' tidak ditemukan di ID: {target_id}. Mengembalikan data kosong.")
+                return pd.DataFrame()
+            raise RuntimeError(f"Gagal akses Google API: {e}")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Gagal akses Google API: {e}")
+
+        return await asyncio.to_thread(self.parser.to_dataframe, result.get('values', []))
+
+    async def _batch_download_sheets(self, sheet_names: List[str], target_id: str) -> Dict[str, pd.DataFrame]:
+        """Mengunduh beberapa sheet dalam satu panggilan values:batchGet."""
+        try:
+            result = await self._get_json(
+                f"{self.SHEETS_API_URL}/{target_id}/values:batchGet",
+                params=[("ranges", f"'{name}'!A:Z") for name in sheet_names]
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 400:
+                raise RuntimeError(f"Gagal akses Google API: {e}")
+
+            available = set(await self.get_sheet_names(spreadsheet_id=target_id))
+            existing = [name for name in sheet_names if name in available]
+            skipped = [name for name in sheet_names if name not in available]
+            logging.warning(f"[INFO] Sheet {skipped} tidak ditemukan di ID: {target_id}. Dilewati.")
+            if len(existing) == len(sheet_names):
+                raise RuntimeError(f"Gagal akses Google API: {e}")
+            return await self._batch_download_sheets(existing, target_id) if existing else {}
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Gagal akses Google API: {e}")
+
+        def parse_all() -> Dict[str, pd.DataFrame]:
+            value_ranges = result.get('valueRanges', [])
+            return {
+                name: self.parser.to_dataframe(value_range.get('values', []))
+                for name, value_range in zip(sheet_names, value_ranges)
+            }
+
+        return await asyncio.to_thread(parse_all)
+
+    async def _download_all_sheets(self, target_id: str) -> Dict[str, pd.DataFrame]:
+        """Mengambil nama dan isi seluruh sheet dalam satu panggilan spreadsheets.get (includeGridData)."""
+        try:
+            result = await self._get_json(
+                f"{self.SHEETS_API_URL}/{target_id}",
+                params={
+                    "includeGridData": "true",
+                    "fields": "sheets(properties(title),data(rowData(values(formattedValue))))"
+                }
+            )
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Gagal akses Google API: {e}")
+
+        def parse_all() -> Dict[str, pd.DataFrame]:
+            frames = {}
+            for sheet in result.get('sheets', []):
+                title, values = self.parser.grid_to_values(sheet)
+                frames[title] = self.parser.to_dataframe(values)
+            return frames
+
+        return await asyncio.to_thread(parse_all)
@@ -1,6 +1,8 @@
 import pandas as pd
 from typing import Dict, Any
 
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+
 class ChartService:
     """Service yang bertanggung jawab untuk membuat data visualisasi (chart)."""
     
@@ -10,15 +12,19 @@ class ChartService:
     COL_LOKASI = 'LOKASI SPESIFIK PER-INVENTORY'
     COL_TANGGAL_INV = 'TANGGAL INVENTORY'
 
+    def __init__(self):
+        self.normalizer = AssetFrameNormalizer()
+
     def create_chart_data(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Mengonversi DataFrame menjadi struktur data yang siap digunakan oleh library chart di frontend.
+        Frame kanonik (AssetFrameNormalizer) dipakai langsung; frame lain dinormalisasi dulu.
         """
         chart_data = {}
         if df.empty:
             return chart_data
         
-        df.columns = [str(col).strip().upper() for col in df.columns]
+        df = self.normalizer.ensure(df)
         
         # Chart Kondisi
         if self.COL_KONDISI in df.columns:
@@ -34,23 +40,16 @@ class ChartService:
 
         # Chart Nilai Aset
         if self.COL_NILAI_ASET in df.columns and self.COL_LOKASI in df.columns:
-            asset_df = df.copy()
-            asset_df[self.COL_NILAI_ASET] = pd.to_numeric(
-                asset_df[self.COL_NILAI_ASET].astype(str).str.replace(r'[^\d]', '', regex=True), 
-                errors='coerce'
-            ).fillna(0)
-            asset_value = asset_df.groupby(self.COL_LOKASI)[self.COL_NILAI_ASET].sum().reset_index()
+            asset_value = df.groupby(self.COL_LOKASI)[self.normalizer.COL_NILAI_NUMERIC].sum().reset_index()
             asset_value.columns = ['x', 'y']
             chart_data['assetValue'] = asset_value.nlargest(10, 'y').to_dict(orient='records')
 
         # Chart Tren Inventory
         if self.COL_TANGGAL_INV in df.columns:
-            date_df = df.copy()
-            date_df['parsed_date'] = pd.to_datetime(date_df[self.COL_TANGGAL_INV], errors='coerce')
-            date_df.dropna(subset=['parsed_date'], inplace=True)
-            if not date_df.empty:
-                date_df['bulan_inv'] = date_df['parsed_date'].dt.strftime('%Y-%m')
-                monthly_counts = date_df.groupby('bulan_inv').size().reset_index(name='y')
+            parsed_date = df[self.normalizer.date_column(self.COL_TANGGAL_INV)].dropna()
+            if not parsed_date.empty:
+                bulan_inv = parsed_date.dt.strftime('%Y-%m').rename('bulan_inv')
+                monthly_counts = bulan_inv.groupby(bulan_inv).size().reset_index(name='y')
                 monthly_counts.rename(columns={'bulan_inv': 'x'}, inplace=True)
                 chart_data['trenInventory'] = monthly_counts.sort_values('x').to_dict(orient='records')
         
@@ -0,0 +1,63 @@
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+import orjson
+import pandas as pd
+
+class ColumnarEncoder:
+    """
+    Mode hasil kolumnar (opt-in lewat parameter format='columnar') untuk hasil berbentuk tabel.
+    Alih-alih list of dict yang mengulang nama kolom di setiap baris, hasil berbentuk
+    {"format": "columnar", "columns": [...], "data": [...], "row_count": n} dengan data[i]
+    berisi seluruh nilai kolom columns[i]. Array kolom diambil langsung dari NumPy dan
+    diserialisasi dengan orjson (numerik tanpa konversi per elemen, NaN/NaT menjadi null).
+    """
+    FORMAT_RECORDS = 'records'
+    FORMAT_COLUMNAR = 'columnar'
+    FORMATS = [FORMAT_RECORDS, FORMAT_COLUMNAR]
+
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    @classmethod
+    def wants_columnar(cls, result_format: Optional[str]) -> bool:
+        return str(result_format or cls.FORMAT_RECORDS).strip().lower() == cls.FORMAT_COLUMNAR
+
+    def encode(self, df: pd.DataFrame) -> Dict[str, Any]:
+        return {
+            "format": self.FORMAT_COLUMNAR,
+            "columns": [str(col) for col in df.columns],
+            "data": [self._column_values(df.iloc[:, position]) for position in range(df.shape[1])],
+            "row_count": int(len(df)),
+        }
+
+    @classmethod
+    def dumps(cls, result: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        """Serialisasi hasil (termasuk array NumPy di dalamnya) ke JSON bytes dengan orjson."""
+        return orjson.dumps(result, default=default, option=cls.ORJSON_OPTIONS)
+
+    @staticmethod
+    def _column_values(series: pd.Series) -> Any:
+        """
+        Nilai satu kolom siap serialisasi. Kolom numerik/boolean dikembalikan sebagai ndarray
+        apa adanya (orjson menulis NaN sebagai null); tanggal menjadi string ISO; kolom lain
+        menjadi list dengan nilai kosong sebagai None.
+        """
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+            dtype = series.dtype
+
+        if pd.api.types.is_bool_dtype(dtype) or (
+            isinstance(dtype, np.dtype) and dtype.kind in 'iuf'
+        ):
+            return np.ascontiguousarray(series.to_numpy())
+
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            iso = series.map(lambda value: value.isoformat(), na_action='ignore')
+            return iso.astype(object).where(series.notna(), None).tolist()
+
+        values = series.to_numpy(dtype=object)
+        missing = pd.isna(values)
+        if missing.any():
+            values = values.copy()
+            values[missing] = None
+        return values.tolist()
@@ -0,0 +1,109 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import pandas as pd
+
+@dataclass
+class DateParseResult:
+    """Hasil parsing satu kolom tanggal: nilai datetime, format yang dipakai, dan jumlah gagal."""
+    values: pd.Series
+    formats: List[str] = field(default_factory=list)
+    unparsed_count: int = 0
+
+class DateColumnParser:
+    """
+    Parser kolom tanggal (TANGGAL INVENTORY / TANGGAL UPDATE) yang cepat untuk input campuran.
+    - Hanya nilai unik yang diparsing, lalu dipetakan kembali ke seluruh baris.
+    - Format dominan dideteksi dari sampel, lalu tiap format diparsing dalam satu pass vektor.
+    - Format yang terdeteksi di-cache per kolom, sehingga versi sheet berikutnya
+      langsung mencoba format tersebut tanpa deteksi ulang.
+    - Sisa nilai yang tidak cocok dengan format mana pun diparsing per elemen (dayfirst),
+      sama seperti perilaku lama, dan yang tetap gagal dihitung sebagai 'unparsed'.
+    """
+    # Urutan menentukan prioritas saat jumlah kecocokan sama; semuanya day-first
+    CANDIDATE_FORMATS = [
+        '%d-%b-%Y', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d %b %Y', '%d %B %Y',
+        '%d-%B-%Y', '%d-%b-%y', '%d/%m/%y', '%d.%m.%Y', '%Y/%m/%d'
+    ]
+    FALLBACK_FORMAT = 'mixed'
+    SAMPLE_SIZE = 200
+
+    def __init__(self):
+        self._format_cache: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def parse(self, values: pd.Series, cache_key: Optional[str] = None) -> DateParseResult:
+        """Mem-parsing satu kolom. 'cache_key' (mis. nama kolom) mengaktifkan cache format."""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return DateParseResult(values)
+
+        text = values.where(values.notna(), '').astype(str).str.strip()
+        filled = text != ''
+        uniques = pd.Index(pd.unique(text[filled].to_numpy()))
+        if uniques.empty:
+            return DateParseResult(pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]'))
+
+        parsed_uniques, formats = self._parse_uniques(uniques, cache_key)
+        parsed = text.map(parsed_uniques).astype('datetime64[ns]')
+        unparsed_count = int((filled & parsed.isna()).sum())
+        return DateParseResult(parsed, formats, unparsed_count)
+
+    def _parse_uniques(self, uniques: pd.Index, cache_key: Optional[str]):
+        result = pd.Series(pd.NaT, index=uniques, dtype='datetime64[ns]')
+        remaining = uniques
+        used_formats: List[str] = []
+
+        with self._lock:
+            cached_formats = list(self._format_cache.get(cache_key, [])) if cache_key else []
+
+        # 1. Format dari versi sebelumnya dulu; jika semua sudah terbaca, deteksi dilewati
+        for fmt in cached_formats:
+            remaining = self._apply_format(result, remaining, fmt, used_formats)
+            if remaining.empty:
+                break
+
+        # 2. Deteksi format dominan dari sampel nilai yang tersisa
+        if not remaining.empty:
+            for fmt in self._rank_formats(remaining[:self.SAMPLE_SIZE], exclude=cached_formats):
+                remaining = self._apply_format(result, remaining, fmt, used_formats)
+                if remaining.empty:
+                    break
+
+        # 3. Sisa nilai yang formatnya tidak umum: parsing per elemen (hanya nilai unik)
+        if not remaining.empty:
+            fallback = pd.to_datetime(remaining, errors='coerce', dayfirst=True, format=self.FALLBACK_FORMAT)
+            matched = fallback.notna()
+            if matched.any():
+                result[remaining[matched]] = fallback[matched]
+                used_formats.append(self.FALLBACK_FORMAT)
+
+        if cache_key:
+            with self._lock:
+                self._format_cache[cache_key] = [fmt for fmt in used_formats if fmt != self.FALLBACK_FORMAT]
+        return result, used_formats
+
+    def _rank_formats(self, sample: pd.Index, exclude: List[str]) -> List[str]:
+        """Mengurutkan kandidat format berdasarkan jumlah nilai sampel yang cocok."""
+        hits = {}
+        for fmt in self.CANDIDATE_FORMATS:
+            if fmt in exclude:
+                continue
+            count = int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+            if count:
+                hits[fmt] = count
+        return sorted(hits, key=hits.get, reverse=True)
+
+    @staticmethod
+    def _apply_format(result: pd.Series, remaining: pd.Index, fmt: str, used_formats: List[str]) -> pd.Index:
+        """Mem-parsing nilai tersisa dengan satu format; mengembalikan nilai yang masih gagal."""
+        try:
+            parsed = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        except ValueError as e:
+            logging.warning(f"[DATE] Format '{fmt}' tidak dapat dipakai: {e}")
+            return remaining
+        matched = parsed.notna()
+        if matched.any():
+            result[remaining[matched]] = parsed[matched]
+            used_formats.append(fmt)
+        return remaining[~matched]
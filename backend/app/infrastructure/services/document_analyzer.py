@@ -1,6 +1,10 @@
+import os
 import json
+import time
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional
 import pandas as pd
 
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -64,12 +68,57 @@ FORMAT JSON OUTPUT:
 }}
 """
 
+SUMMARY_MAP_PROMPT_TEMPLATE = """
+ANDA ADALAH: Seorang Analis Aset senior di Pertamina Hulu Rokan.
+TUGAS: Data di bawah adalah SATU BAGIAN ({label}, bagian {index} dari {total}) dari data aset yang lebih besar.
+Tuliskan temuan faktual bagian ini secara ringkas sebagai daftar poin (awali dengan "- "): jumlah aset,
+distribusi kondisi, aset/lokasi dengan kondisi kritis, nilai aset yang menonjol, dan potensi risiko.
+Sertakan angka apa adanya agar dapat digabungkan dengan bagian lain. JANGAN berikan rekomendasi. JANGAN gunakan markdown.
+DATA:
+---
+{document}
+---
+"""
+
+SUMMARY_REDUCE_PROMPT_TEMPLATE = """
+ANDA ADALAH: Seorang Analis Aset senior di Pertamina Hulu Rokan.
+TUJUAN ANDA: Membuat ringkasan eksekutif singkat untuk manajemen.
+TUGAS: Di bawah ini adalah temuan dari {total} bagian data aset (setiap bagian mencakup baris yang berbeda).
+Gabungkan menjadi bagian 'RINGKASAN EKSEKUTIF' untuk keseluruhan data. Jumlahkan angka antar bagian bila relevan.
+Fokus pada metrik kunci: distribusi aset, kondisi kritis, dan potensi risiko. Sajikan dalam daftar bernomor (1., 2., dst.). JANGAN berikan rekomendasi. JANGAN gunakan markdown.
+TEMUAN PER BAGIAN:
+---
+{partials}
+---
+"""
+
+SUMMARY_UPDATE_PROMPT_TEMPLATE = """
+ANDA ADALAH: Seorang Analis Aset senior di Pertamina Hulu Rokan.
+TUJUAN ANDA: Memperbarui ringkasan eksekutif untuk manajemen berdasarkan perubahan data terbaru.
+TUGAS: Di bawah ini adalah 'RINGKASAN EKSEKUTIF' dari analisis tersimpan sebelumnya dan daftar perubahan data sejak saat itu.
+Tulis ulang bagian 'RINGKASAN EKSEKUTIF' agar sesuai dengan data terbaru: perbarui angka yang berubah, pertahankan poin yang tidak terdampak,
+dan tambahkan poin mengenai perubahan kondisi yang paling penting. Sajikan dalam daftar bernomor (1., 2., dst.). JANGAN berikan rekomendasi. JANGAN gunakan markdown.
+RINGKASAN SEBELUMNYA:
+---
+{previous_summary}
+---
+PERUBAHAN DATA:
+---
+{digest}
+---
+"""
+
 class DocumentAnalyzer:
     """
     Service yang bertanggung jawab untuk interaksi dengan LLM,
     dengan rotasi otomatis model dan API key untuk mengatasi quota limits.
     """
     COL_NO_ASET = 'NO ASSET'
+    # Jumlah ringkasan parsial (tahap map) yang dijalankan bersamaan pada mode map-reduce
+    SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+    # Versi prompt laporan analisis; naikkan setiap kali prompt ringkasan/duplikasi diubah
+    # agar hasil analisis yang tersimpan di cache tidak dipakai lagi.
+    PROMPT_VERSION = "2026.10-1"
 
     def __init__(self):
         """Menginisialisasi model rotation service."""
@@ -244,6 +293,9 @@ class DocumentAnalyzer:
             - Task: 'get_top_per_group'
             - group_by_field: '[Y]' (misal: AREA)
             - count_field: '[X]' (misal: NAMA ASET)
+        2. Jika user bertanya tentang nilai/keuangan aset per area (total nilai aset, aset termahal, aset termurah):
+            - Gunakan tool: 'query_assets'
+            - Task: 'get_financial_summary' (boleh ditambah filter seperti area atau kondisi)
 
         CONTOH ALUR BERPIKIR:
 
@@ -453,6 +505,87 @@ class DocumentAnalyzer:
         
         return summary
 
+    def generate_summary_update(self, previous_summary: str, digest: str) -> str:
+        """
+        Ringkasan eksekutif untuk analisis inkremental: ringkasan tersimpan sebelumnya diperbarui
+        dari digest perubahan data, sehingga prompt jauh lebih kecil daripada seluruh data.
+        """
+        chain = ChatPromptTemplate.from_template(SUMMARY_UPDATE_PROMPT_TEMPLATE) | self.model | StrOutputParser()
+        logging.info(f"LLM CALL #1 (Incremental): Memperbarui Ringkasan Eksekutif dari digest {len(digest)} karakter...")
+        summary = self._execute_with_rotation(chain, {"previous_summary": previous_summary, "digest": digest})
+        logging.info(f"Executive Summary Updated (length: {len(summary)} chars)")
+        return summary
+
+    def generate_summary_map_reduce(
+        self,
+        chunks: List[str],
+        labels: Optional[List[str]] = None,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Ringkasan eksekutif untuk data yang terlalu besar bagi satu prompt.
+        Map: setiap potongan diringkas secara paralel (maksimal 'concurrency' sekaligus), dengan
+        potongan ke-i memakai API key ke-(i mod jumlah key) sehingga beban kuota tersebar.
+        Setiap panggilan map yang berhasil dicatat di rotation service seperti panggilan lainnya.
+        Reduce: ringkasan parsial digabung menjadi satu ringkasan dalam satu panggilan (dengan rotasi).
+        Mengembalikan {"summary", "chunk_count", "concurrency", "stages": {latensi per tahap (ms)}}.
+        """
+        labels = labels or [f"Potongan {index + 1}" for index in range(len(chunks))]
+        workers = max(1, min(concurrency or self.SUMMARY_MAP_CONCURRENCY, len(chunks)))
+        model_name, _ = self.rotation_service.get_current_config()
+        api_keys = self.rotation_service.API_KEYS
+        if not api_keys:
+            raise ValueError("GEMINI_API_KEY tidak ditemukan di environment variables.")
+        # Satu model per API key, dipakai bersama oleh worker tahap map
+        models = [
+            ChatGoogleGenerativeAI(model=model_name, google_api_key=api_key, temperature=0.1)
+            for api_key in api_keys
+        ]
+        prompt = ChatPromptTemplate.from_template(SUMMARY_MAP_PROMPT_TEMPLATE)
+        # State rotasi (counter + file) tidak thread-safe, pencatatan dari worker map diserialkan
+        usage_lock = threading.Lock()
+
+        def summarize_chunk(index: int) -> Dict[str, Any]:
+            started = time.perf_counter()
+            params = {"label": labels[index], "index": index + 1, "total": len(chunks), "document": chunks[index]}
+            # Mulai dari key milik potongan ini; pindah ke key berikutnya jika kuotanya habis
+            for attempt in range(len(models)):
+                key_index = (index + attempt) % len(models)
+                try:
+                    text = (prompt | models[key_index] | StrOutputParser()).invoke(params)
+                    with usage_lock:
+                        self.rotation_service.increment_and_rotate()
+                    return {"text": text, "key_index": key_index, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+                except ResourceExhausted:
+                    logging.warning(f"[SUMMARY] Kuota API key #{key_index + 1} habis untuk potongan {index + 1}, mencoba key berikutnya.")
+            raise ValueError("Semua API key telah mencapai batas quota.")
+
+        logging.info(f"[SUMMARY] Map-reduce: {len(chunks)} potongan, konkurensi {workers}, model {model_name}.")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary-map") as pool:
+            partials = list(pool.map(summarize_chunk, range(len(chunks))))
+        map_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        reduce_started = time.perf_counter()
+        partials_text = "\n\n".join(
+            f"[{labels[index]}]\n{partial['text'].strip()}" for index, partial in enumerate(partials)
+        )
+        reduce_chain = ChatPromptTemplate.from_template(SUMMARY_REDUCE_PROMPT_TEMPLATE) | self.model | StrOutputParser()
+        summary = self._execute_with_rotation(reduce_chain, {"total": len(chunks), "partials": partials_text})
+        reduce_ms = round((time.perf_counter() - reduce_started) * 1000, 1)
+
+        stages = {
+            "map_ms": map_ms,
+            "map_chunk_ms": [partial["elapsed_ms"] for partial in partials],
+            "reduce_ms": reduce_ms,
+            "total_ms": round(map_ms + reduce_ms, 1),
+        }
+        logging.info(
+            f"[SUMMARY] Map-reduce selesai: map {map_ms} ms (terlama {max(stages['map_chunk_ms'])} ms), "
+            f"reduce {reduce_ms} ms, total {stages['total_ms']} ms."
+        )
+        return {"summary": summary, "chunk_count": len(chunks), "concurrency": workers, "stages": stages}
+
     # def evaluate_summary_factualness(
     #     self, 
     #     source_document: str, 
@@ -576,13 +709,21 @@ class DocumentAnalyzer:
     #     logging.info("╚" + "="*78 + "╝")
     #     logging.info("")  # Empty line untuk spacing
 
-    def generate_duplicate_report(self, df: pd.DataFrame) -> str:
-        """Membuat laporan teks mengenai data aset yang terduplikasi."""
+    def generate_duplicate_report(self, df: pd.DataFrame, duplicate_keys: Optional[Iterable] = None) -> str:
+        """
+        Membuat laporan teks mengenai data aset yang terduplikasi.
+        'duplicate_keys' (opsional) adalah NO ASSET yang sudah diketahui muncul lebih dari sekali,
+        mis. dari jumlah per NO ASSET yang diperbarui secara inkremental.
+        """
         duplicate_report = "HASIL PENGECEKAN DUPLIKASI\n\n"
         if self.COL_NO_ASET not in df.columns:
             return duplicate_report + f"Kolom '{self.COL_NO_ASET}' tidak ditemukan."
         
-        duplicates = df[df.duplicated(subset=[self.COL_NO_ASET], keep=False)]
+        if duplicate_keys is None:
+            duplicates = df[df.duplicated(subset=[self.COL_NO_ASET], keep=False)]
+        else:
+            duplicate_keys = list(duplicate_keys)
+            duplicates = df[df[self.COL_NO_ASET].isin(duplicate_keys)] if duplicate_keys else df.iloc[0:0]
         if duplicates.empty:
             return duplicate_report + "Tidak ada data duplikat ditemukan."
         
@@ -625,6 +766,13 @@ class DocumentAnalyzer:
         html_content = ''.join(processed_parts)
         return re.sub(r'(<br\s*/?>\s*){3,}', '<br><br>', html_content)
     
+    def get_cache_identity(self) -> Dict[str, str]:
+        """
+        Identitas prompt dan model untuk kunci cache hasil analisis. Model yang dipakai berotasi
+        per permintaan, sehingga identitasnya adalah daftar model rotasi, bukan model saat ini.
+        """
+        return {"prompt_version": self.PROMPT_VERSION, "model": ",".join(self.rotation_service.MODELS)}
+
     def get_rotation_stats(self) -> Dict:
         """Dapatkan statistik rotasi untuk monitoring."""
         return self.rotation_service.get_stats()
\ No newline at end of file
@@ -0,0 +1,274 @@
+import os
+import math
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+from app.infrastructure.services.financial_rollup_service import FinancialRollupService
+
+@dataclass
+class EncodedDocument:
+    """Dokumen data aset siap dikirim ke LLM, beserta estimasi token dan mode encoding-nya."""
+    text: str
+    encoder: str
+    # 'rows' = baris data (ringkas), 'aggregates' = agregat pengganti baris karena melebihi anggaran
+    mode: str
+    row_count: int
+    token_estimate: int
+    columns: List[str] = field(default_factory=list)
+    # Label potongan untuk ringkasan map-reduce, mis. "AREA DURI (bagian 1/2)"
+    label: str = ''
+
+    def describe(self) -> str:
+        return (
+            f"{self.label + ': ' if self.label else ''}"
+            f"{self.row_count} baris, encoder '{self.encoder}' mode '{self.mode}', "
+            f"{len(self.text):,} karakter (~{self.token_estimate:,} token)"
+        )
+
+class IDocumentEncoder(ABC):
+    """
+    Serialisasi frame aset menjadi teks input LLM (mis. untuk ringkasan eksekutif).
+    Menerima frame kanonik maupun frame tampilan.
+    """
+    name = ''
+    # Estimasi kasar tokenizer: rata-rata karakter per token untuk teks tabel
+    CHARS_PER_TOKEN = float(os.getenv("DOCUMENT_CHARS_PER_TOKEN", "4"))
+
+    @abstractmethod
+    def encode(self, frame: pd.DataFrame) -> EncodedDocument:
+        pass
+
+    @classmethod
+    def estimate_tokens(cls, text_length: int) -> int:
+        return int(math.ceil(text_length / cls.CHARS_PER_TOKEN))
+
+    def encode_chunks(self, frame: pd.DataFrame, chunk_rows: int, by: Optional[str] = None) -> List[EncodedDocument]:
+        """
+        Dokumen per potongan untuk ringkasan map-reduce: baris dikelompokkan per nilai kolom 'by'
+        (mis. AREA, terurut; nilai kosong di akhir) bila kolomnya ada, lalu setiap kelompok
+        dipotong maksimal chunk_rows baris. Urutan baris di dalam potongan tidak berubah.
+        """
+        chunk_rows = max(int(chunk_rows), 1)
+        if by and by in frame.columns:
+            codes, uniques = pd.factorize(frame[by], sort=True)
+            groups = [(f"{by} {value}", np.flatnonzero(codes == code)) for code, value in enumerate(uniques)]
+            if (codes < 0).any():
+                groups.append((f"{by} (kosong)", np.flatnonzero(codes < 0)))
+        else:
+            groups = [("Baris", np.arange(len(frame)))]
+
+        chunks = []
+        for label, positions in groups:
+            parts = max(int(math.ceil(len(positions) / chunk_rows)), 1)
+            for part in range(parts):
+                document = self.encode(frame.iloc[positions[part * chunk_rows:(part + 1) * chunk_rows]])
+                document.label = label if parts == 1 else f"{label} (bagian {part + 1}/{parts})"
+                chunks.append(document)
+        return chunks
+
+class TextDocumentEncoder(IDocumentEncoder):
+    """Encoder lama: df.to_string() (lebar tetap, seluruh kolom dan baris)."""
+    name = 'text'
+
+    def __init__(self, normalizer: Optional[AssetFrameNormalizer] = None):
+        self.normalizer = normalizer or AssetFrameNormalizer()
+
+    def encode(self, frame: pd.DataFrame) -> EncodedDocument:
+        df = self.normalizer.display_frame(frame)
+        text = df.to_string()
+        return EncodedDocument(text, self.name, 'rows', len(df), self.estimate_tokens(len(text)), [str(col) for col in df.columns])
+
+class CompactDocumentEncoder(IDocumentEncoder):
+    """
+    Encoder ringkas: CSV/TSV berisi kolom yang relevan untuk ringkasan saja, NILAI ASET sebagai
+    angka, tanggal ISO, dan kolom berulang (AREA, KONDISI, ...) dikodekan dengan kamus nilai
+    bila lebih hemat. Jika estimasi token melebihi anggaran, baris mentah diganti agregat
+    (distribusi per AREA, kondisi, keuangan, rentang tanggal) dan contoh aset berkondisi kritis
+    sebanyak sisa anggaran.
+    """
+    RELEVANT_COLUMNS = [
+        'NO ASSET', 'NAMA ASET', 'KONDISI', 'AREA', 'MANUFACTURE', 'MODEL/TYPE', 'KODE LOKASI SAP',
+        'NILAI ASET', 'TANGGAL INVENTORY', 'HASIL INVENTORY', 'KETERANGAN'
+    ]
+    TOKEN_BUDGET = int(os.getenv("DOCUMENT_TOKEN_BUDGET", "100000"))
+    # Kolom dengan nilai unik sebanyak ini atau kurang menjadi kandidat kamus nilai
+    DICTIONARY_MAX_VALUES = int(os.getenv("DOCUMENT_DICTIONARY_MAX_VALUES", "64"))
+    TOP_VALUES = 10
+    CRITICAL_KEYWORDS = ['Rusak', 'Tidak Ditemukan', 'Penghapusan']
+
+    def __init__(
+        self,
+        delimiter: str = ',',
+        token_budget: Optional[int] = None,
+        normalizer: Optional[AssetFrameNormalizer] = None
+    ):
+        self.delimiter = delimiter
+        self.name = 'tsv' if delimiter == '\t' else 'csv'
+        self.token_budget = self.TOKEN_BUDGET if token_budget is None else token_budget
+        self.normalizer = normalizer or AssetFrameNormalizer()
+        self.financial_rollup = FinancialRollupService(self.normalizer)
+
+    def encode(self, frame: pd.DataFrame) -> EncodedDocument:
+        frame = self.normalizer.ensure(frame)
+        if frame.empty:
+            return EncodedDocument("", self.name, 'rows', 0, 0)
+
+        table = self.value_table(frame)
+        encoded, legend = self._dictionary_encode(table)
+        # Estimasi dari panjang nilai sebelum menulis CSV, agar sheet besar tidak diserialisasi sia-sia
+        row_chars = int(self._row_lengths(encoded).sum())
+        legend_text = "\n".join(legend)
+        if self.estimate_tokens(row_chars + len(legend_text)) <= self.token_budget:
+            parts = [self._format_note(len(table), legend)]
+            if legend:
+                parts += ["KAMUS NILAI", legend_text]
+            parts += ["DATA", self.to_text(encoded)]
+            text = "\n".join(parts)
+            return EncodedDocument(text, self.name, 'rows', len(table), self.estimate_tokens(len(text)), list(table.columns))
+
+        text = self._aggregates_text(frame, table)
+        logging.info(f"[ENCODER] {len(table)} baris melebihi anggaran {self.token_budget:,} token, memakai agregat.")
+        return EncodedDocument(text, self.name, 'aggregates', len(table), self.estimate_tokens(len(text)), list(table.columns))
+
+    def value_table(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Kolom relevan sebagai string ringkas (nilai kosong = '')."""
+        columns = [col for col in self.RELEVANT_COLUMNS if col in frame.columns]
+        data = {}
+        for col in columns:
+            if col == self.normalizer.COL_NILAI_ASET and self.normalizer.COL_NILAI_NUMERIC in frame.columns:
+                values = frame[self.normalizer.COL_NILAI_NUMERIC].astype(str)
+            elif self.normalizer.date_column(col) in frame.columns:
+                dates = frame[self.normalizer.date_column(col)]
+                codes, uniques = pd.factorize(dates)
+                iso = np.array([value.strftime('%Y-%m-%d') for value in uniques] + [''], dtype=object)
+                # Tanggal yang tidak terbaca tetap ditulis apa adanya
+                values = pd.Series(iso[codes], index=frame.index).where(dates.notna(), self._text(frame[col]))
+            else:
+                values = self._text(frame[col])
+            data[col] = values.to_numpy(dtype=object)
+        return pd.DataFrame(data, columns=columns)
+
+    def to_text(self, table: pd.DataFrame) -> str:
+        return table.to_csv(index=False, sep=self.delimiter, lineterminator='\n').rstrip('\n')
+
+    @staticmethod
+    def _text(values: pd.Series) -> pd.Series:
+        """Nilai sebagai teks satu baris tanpa spasi berlebih; dibersihkan per nilai unik."""
+        codes, uniques = pd.factorize(values)
+        cleaned = np.array([' '.join(str(value).split()) for value in uniques] + [''], dtype=object)
+        return pd.Series(cleaned[codes], index=values.index)
+
+    @staticmethod
+    def _row_lengths(table: pd.DataFrame) -> np.ndarray:
+        """Perkiraan panjang setiap baris teks (nilai + pemisah), dihitung per nilai unik."""
+        lengths = np.full(len(table), len(table.columns), dtype=np.int64)
+        for col in table.columns:
+            codes, uniques = pd.factorize(table[col])
+            lengths += np.fromiter((len(value) for value in uniques), dtype=np.int64, count=len(uniques))[codes]
+        return lengths
+
+    def _dictionary_encode(self, table: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Mengganti nilai kolom berulang dengan kode pendek (A1, A2, ... per kolom, nilai tersering
+        mendapat kode terpendek) hanya jika total karakter setelah ditambah kamusnya lebih kecil.
+        """
+        encoded = table.copy()
+        legend = []
+        prefixes = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        for col in table.columns:
+            if len(legend) == len(prefixes):
+                break
+            counts = table[col].value_counts()
+            counts = counts[counts.index != '']
+            if counts.empty or len(counts) > self.DICTIONARY_MAX_VALUES or counts.max() < 2:
+                continue
+            prefix = prefixes[len(legend)]
+            codes = {value: f"{prefix}{position + 1}" for position, value in enumerate(counts.index)}
+            entry = f"{col}: " + "; ".join(f"{code}={value}" for value, code in codes.items())
+            lengths = counts.index.str.len().to_numpy()
+            code_lengths = pd.Index(codes.values()).str.len().to_numpy()
+            if int(((lengths - code_lengths) * counts.to_numpy()).sum()) <= len(entry):
+                continue
+            encoded[col] = table[col].map(codes).fillna('').to_numpy(dtype=object)
+            legend.append(entry)
+        return encoded, legend
+
+    def _format_note(self, row_count: int, legend: List[str]) -> str:
+        separator = 'tab' if self.delimiter == '\t' else f"'{self.delimiter}'"
+        note = f"FORMAT: {self.name.upper()} (pemisah {separator}), {row_count} baris aset, NILAI ASET dalam Rupiah, tanggal YYYY-MM-DD."
+        if legend:
+            note += " Kolom berkode diterjemahkan lewat KAMUS NILAI."
+        return note
+
+    # --- Mode agregat ---
+
+    def _aggregates_text(self, frame: pd.DataFrame, table: pd.DataFrame) -> str:
+        parts = [
+            f"FORMAT: AGREGAT. Data {len(table)} baris aset melebihi anggaran ~{self.token_budget:,} token, "
+            "sehingga baris mentah diganti ringkasan statistik berikut (tabel dalam "
+            f"{self.name.upper()}, NILAI ASET dalam Rupiah)."
+        ]
+        if 'AREA' in table.columns:
+            parts += ["JUMLAH ASET PER AREA", self.to_text(self._counts(table, 'AREA'))]
+            for col in ('KONDISI', 'HASIL INVENTORY'):
+                if col in table.columns:
+                    crosstab = pd.crosstab(table['AREA'].replace('', '(kosong)'), table[col].replace('', '(kosong)'))
+                    parts += [f"{col} PER AREA", self.to_text(crosstab.reset_index())]
+        for col in ('KONDISI', 'NAMA ASET', 'MANUFACTURE', 'MODEL/TYPE', 'KODE LOKASI SAP'):
+            if col in table.columns and not (col == 'KONDISI' and 'AREA' in table.columns):
+                parts += [f"{self.TOP_VALUES} {col} TERBANYAK", self.to_text(self._counts(table, col).head(self.TOP_VALUES))]
+
+        rollup = self.financial_rollup.build(frame)
+        if rollup:
+            finance = pd.DataFrame([{
+                "AREA": item["area"],
+                "total_nilai": item["total_value"],
+                "termahal": f"{item['asset_termahal']['nama']} ({item['asset_termahal']['nilai']})",
+                "termurah": f"{item['asset_termurah']['nama']} ({item['asset_termurah']['nilai']})",
+            } for item in rollup])
+            parts += ["NILAI ASET PER AREA", self.to_text(finance)]
+
+        date_col = self.normalizer.date_column('TANGGAL INVENTORY')
+        if date_col in frame.columns and frame[date_col].notna().any():
+            parts.append(
+                f"RENTANG TANGGAL INVENTORY: {frame[date_col].min():%Y-%m-%d} s.d. {frame[date_col].max():%Y-%m-%d}"
+            )
+
+        text = "\n".join(parts)
+        return text + self._critical_rows_text(table, len(text))
+
+    def _critical_rows_text(self, table: pd.DataFrame, used_chars: int) -> str:
+        """Contoh aset berkondisi kritis sebanyak sisa anggaran karakter."""
+        if 'KONDISI' not in table.columns:
+            return ""
+        critical = table[table['KONDISI'].str.contains('|'.join(self.CRITICAL_KEYWORDS), case=False, na=False)]
+        if critical.empty:
+            return ""
+        remaining = int(self.token_budget * self.CHARS_PER_TOKEN) - used_chars
+        row_chars = self._row_lengths(critical)
+        fits = int((row_chars.cumsum() <= remaining - 200).sum())
+        if fits <= 0:
+            return ""
+        header = f"\nASET KONDISI KRITIS ({fits} dari {len(critical)} baris)\n"
+        return header + self.to_text(critical.head(fits))
+
+    @staticmethod
+    def _counts(table: pd.DataFrame, col: str) -> pd.DataFrame:
+        counts = table[col].replace('', '(kosong)').value_counts()
+        return pd.DataFrame({col: counts.index, "jumlah": counts.to_numpy()})
+
+def create_document_encoder(name: Optional[str] = None, normalizer: Optional[AssetFrameNormalizer] = None) -> IDocumentEncoder:
+    """Encoder dokumen sesuai konfigurasi DOCUMENT_ENCODER ('csv', 'tsv', atau 'text' = df.to_string lama)."""
+    encoder_name = (name or os.getenv("DOCUMENT_ENCODER", "csv")).strip().lower()
+    if encoder_name == 'text':
+        return TextDocumentEncoder(normalizer)
+    if encoder_name == 'tsv':
+        return CompactDocumentEncoder('\t', normalizer=normalizer)
+    if encoder_name != 'csv':
+        logging.warning(f"[ENCODER] DOCUMENT_ENCODER '{encoder_name}' tidak dikenal, memakai 'csv'.")
+    return CompactDocumentEncoder(',', normalizer=normalizer)
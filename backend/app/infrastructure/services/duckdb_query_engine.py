@@ -0,0 +1,241 @@
+import os
+import time
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import duckdb
+import numpy as np
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.infrastructure.services.asset_query_planner import AssetQueryPlanner, Predicate
+from app.infrastructure.services.asset_query_engine import IAssetQueryEngine, PandasQueryEngine
+
+class DuckDBQueryEngine(IAssetQueryEngine):
+    """
+    Engine kolumnar berbasis DuckDB (in-process). Frame kanonik dimuat sekali per versi sheet
+    ke tabel DuckDB (artifact snapshot); filter scan/rentang, agregasi, dan pengurutan
+    diterjemahkan ke SQL yang dieksekusi vektor dan multi-thread oleh DuckDB.
+    Predicate tanpa terjemahan SQL (lookup indeks, kode kategori) tetap dievaluasi planner,
+    lalu posisi barisnya dipakai sebagai semi-join. Urutan hasil disamakan dengan engine
+    pandas: seri value_counts mengikuti kemunculan pertama, pengurutan baris memakai
+    posisi baris sebagai penentu urutan nilai yang sama.
+    Seleksi kecil (di bawah MIN_ROWS baris) dikerjakan engine pandas karena overhead
+    query SQL lebih besar daripada pekerjaannya.
+    """
+    name = 'duckdb'
+    ARTIFACT_NAME = 'duckdb_table'
+    TABLE = 'assets'
+    ROW_COLUMN = '_ROW'
+    # 0 = jumlah thread bawaan DuckDB (semua core)
+    THREADS = int(os.getenv("DUCKDB_THREADS", "0"))
+    MIN_ROWS = int(os.getenv("DUCKDB_MIN_ROWS", "20000"))
+
+    def __init__(self, planner: Optional[AssetQueryPlanner] = None, min_rows: Optional[int] = None):
+        self.planner = planner or AssetQueryPlanner()
+        self.min_rows = self.MIN_ROWS if min_rows is None else min_rows
+        # Untuk seleksi kecil dan kasus tanpa padanan SQL yang setara (grup dan kolom hitung sama)
+        self.fallback = PandasQueryEngine(self.planner)
+
+    # --- Tabel per versi sheet ---
+
+    def _cursor(self, snapshot: SheetSnapshot, frame: pd.DataFrame) -> duckdb.DuckDBPyConnection:
+        """
+        Cursor baru (aman antar thread) ke tabel DuckDB untuk versi sheet ini. Koneksi ditutup
+        saat entri cache pemiliknya dibuang; jika itu terjadi tepat sebelum cursor dibuat,
+        tabel dibangun ulang untuk query ini saja.
+        """
+        connection = snapshot.get_artifact(
+            self.ARTIFACT_NAME, lambda: self.build_table(frame),
+            size_of=self.table_size, dispose=lambda conn: conn.close()
+        )
+        try:
+            return connection.cursor()
+        except duckdb.ConnectionException:
+            return self.build_table(frame).cursor()
+
+    @staticmethod
+    def table_size(connection: duckdb.DuckDBPyConnection) -> int:
+        """Memori yang dipakai database DuckDB in-memory (dihitung dalam batas memori cache sheet)."""
+        try:
+            return int(connection.execute("SELECT COALESCE(SUM(memory_usage_bytes), 0) FROM duckdb_memory()").fetchone()[0])
+        except duckdb.Error as e:
+            logging.warning(f"[ENGINE] Ukuran tabel DuckDB tidak terbaca: {e}")
+            return 0
+
+    def build_table(self, frame: pd.DataFrame) -> duckdb.DuckDBPyConnection:
+        """
+        Memuat kolom tampilan, _NILAI_NUMERIC, dan kolom tanggal internal ke tabel DuckDB
+        beserta posisi baris (_ROW). Kolom kategori internal tidak dimuat karena filter
+        kategori dievaluasi planner.
+        """
+        started = time.perf_counter()
+        columns = [
+            col for col in frame.columns
+            if not str(col).startswith('_') or col == self.planner.normalizer.COL_NILAI_NUMERIC
+            or str(col).endswith('_DT')
+        ]
+        source = self.planner.take(frame, None, columns)
+        source[self.ROW_COLUMN] = np.arange(len(frame), dtype=np.int64)
+
+        connection = duckdb.connect(database=':memory:')
+        if self.THREADS:
+            connection.execute(f"SET threads TO {self.THREADS}")
+        connection.register('source_frame', source)
+        connection.execute(f"CREATE TABLE {self.TABLE} AS SELECT * FROM source_frame")
+        connection.unregister('source_frame')
+        logging.info(f"[ENGINE] Tabel DuckDB {len(frame)} baris dimuat dalam {(time.perf_counter() - started) * 1000:.1f} ms.")
+        return connection
+
+    def _source(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        frame: pd.DataFrame,
+        rows: Optional[np.ndarray]
+    ) -> Tuple[str, List[str]]:
+        """Klausa FROM dan syarat WHERE awal untuk baris terpilih (semi-join ke posisi 'rows')."""
+        if rows is None or len(rows) == len(frame):
+            return self.TABLE, []
+        cursor.register('selected_rows', pd.DataFrame({self.ROW_COLUMN: rows}))
+        return self.TABLE, [f"{self.ROW_COLUMN} IN (SELECT {self.ROW_COLUMN} FROM selected_rows)"]
+
+    def _use_fallback(self, frame: pd.DataFrame, rows: Optional[np.ndarray]) -> bool:
+        return (len(frame) if rows is None else len(rows)) < self.min_rows
+
+    @staticmethod
+    def _where(conditions: List[str]) -> str:
+        return f"WHERE {' AND '.join(f'({condition})' for condition in conditions)}" if conditions else ""
+
+    # --- IAssetQueryEngine ---
+
+    def select_rows(
+        self,
+        snapshot: SheetSnapshot,
+        frame: pd.DataFrame,
+        predicates: List[Predicate],
+        shared_rows: Optional[Dict[FrozenSet[str], np.ndarray]] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        pushdown = [predicate for predicate in predicates if predicate.sql]
+        if not pushdown or len(frame) < self.min_rows:
+            return self.planner.execute(frame, predicates, shared_rows)
+
+        local = [predicate for predicate in predicates if not predicate.sql]
+        rows, explain = self.planner.execute(frame, local, shared_rows)
+
+        started = time.perf_counter()
+        rows_evaluated = len(rows)
+        strategy = 'sql'
+        if self._use_fallback(frame, rows):
+            strategy = 'scan'
+            for predicate in pushdown:
+                if len(rows):
+                    rows = rows[predicate.evaluate(frame, rows)]
+        elif rows_evaluated:
+            cursor = self._cursor(snapshot, frame)
+            table, conditions = self._source(cursor, frame, rows)
+            params: List[Any] = []
+            for predicate in pushdown:
+                conditions.append(predicate.sql[0])
+                params.extend(predicate.sql[1])
+            query = f"SELECT {self.ROW_COLUMN} FROM {table} {self._where(conditions)} ORDER BY {self.ROW_COLUMN}"
+            try:
+                rows = cursor.execute(query, params).fetchnumpy()[self.ROW_COLUMN].astype(np.intp)
+            except duckdb.Error as e:
+                # Mis. regex yang valid di Python tetapi tidak didukung RE2: evaluasi di planner
+                logging.warning(f"[ENGINE] Filter SQL gagal ({e}), dievaluasi dengan planner.")
+                strategy = 'scan'
+                for predicate in pushdown:
+                    rows = rows[predicate.evaluate(frame, rows)]
+
+        explain["steps"].append({
+            "step": len(explain["steps"]) + 1,
+            "filter": " AND ".join(predicate.label for predicate in pushdown),
+            "column": ", ".join(dict.fromkeys(predicate.column for predicate in pushdown)),
+            "strategy": strategy,
+            "estimated_selectivity": round(float(np.prod([predicate.selectivity for predicate in pushdown])), 4),
+            "estimated_rows": int(round(np.prod([predicate.selectivity for predicate in pushdown]) * len(frame))),
+            "rows_evaluated": int(rows_evaluated),
+            "rows_after": int(len(rows)),
+            "executed": rows_evaluated > 0,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        })
+        explain["matched_rows"] = int(len(rows))
+        explain["filter_ms"] = round(explain["filter_ms"] + explain["steps"][-1]["elapsed_ms"], 3)
+        return rows, explain
+
+    def fetch(self, snapshot, frame, rows, columns, sort_column=None, ascending=True, limit=None):
+        if self._use_fallback(frame, rows):
+            return self.fallback.fetch(snapshot, frame, rows, columns, sort_column, ascending, limit)
+
+        cursor = self._cursor(snapshot, frame)
+        table, conditions = self._source(cursor, frame, rows)
+        order = self.ROW_COLUMN
+        if sort_column:
+            conditions.append(f"{self.planner.quote(sort_column)} IS NOT NULL")
+            order = f"{self.planner.quote(sort_column)} {'ASC' if ascending else 'DESC'}, {self.ROW_COLUMN}"
+        selected = ", ".join([self.ROW_COLUMN] + [self.planner.quote(col) for col in columns])
+        query = f"SELECT {selected} FROM {table} {self._where(conditions)} ORDER BY {order}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+
+        result = cursor.execute(query).df()
+        df = result.drop(columns=[self.ROW_COLUMN])
+        # Label baris mengikuti frame kanonik (RangeIndex: label = posisi), sama seperti take
+        df.index = frame.index.take(result[self.ROW_COLUMN].to_numpy())
+        return df
+
+    def value_counts(self, snapshot, frame, rows, column):
+        if self._use_fallback(frame, rows):
+            return self.fallback.value_counts(snapshot, frame, rows, column)
+        cursor = self._cursor(snapshot, frame)
+        table, conditions = self._source(cursor, frame, rows)
+        target = self.planner.quote(column)
+        conditions.append(f"{target} IS NOT NULL")
+        result = cursor.execute(
+            f"SELECT {target} AS value, COUNT(*) AS count, MIN({self.ROW_COLUMN}) AS first_row "
+            f"FROM {table} {self._where(conditions)} GROUP BY {target} ORDER BY first_row"
+        ).df()
+        # Urutan kemunculan pertama lalu sort_values yang sama dengan value_counts pandas
+        counts = pd.Series(
+            result['count'].to_numpy(dtype=np.int64),
+            index=pd.Index(result['value'].to_numpy(dtype=object), name=column),
+            name='count'
+        )
+        return counts.sort_values(ascending=False)
+
+    def top_per_group(self, snapshot, frame, rows, group_field, count_field):
+        if group_field == count_field or self._use_fallback(frame, rows):
+            return self.fallback.top_per_group(snapshot, frame, rows, group_field, count_field)
+        # Urutan groupby().value_counts(): grup terurut, jumlah menurun, lalu nilai terurut
+        result = self._pair_counts(snapshot, frame, rows, group_field, count_field, "g, count DESC, c")
+        result = result.drop_duplicates(subset='g', keep='first')
+        return pd.DataFrame({
+            group_field: result['g'].to_numpy(dtype=object),
+            count_field: result['c'].to_numpy(dtype=object),
+            'count': result['count'].to_numpy(dtype=np.int64),
+        })
+
+    def breakdown(self, snapshot, frame, rows, group_field, count_field):
+        if group_field == count_field or self._use_fallback(frame, rows):
+            return self.fallback.breakdown(snapshot, frame, rows, group_field, count_field)
+        result = self._pair_counts(snapshot, frame, rows, group_field, count_field, "g, c")
+        if result.empty:
+            return pd.DataFrame()
+        counts = pd.Series(
+            result['count'].to_numpy(dtype=np.int64),
+            index=pd.MultiIndex.from_arrays(
+                [result['g'].to_numpy(dtype=object), result['c'].to_numpy(dtype=object)],
+                names=[group_field, count_field]
+            ),
+            name='count'
+        )
+        return counts.unstack(fill_value=0)
+
+    def _pair_counts(self, snapshot, frame, rows, group_field, count_field, order: str) -> pd.DataFrame:
+        cursor = self._cursor(snapshot, frame)
+        table, conditions = self._source(cursor, frame, rows)
+        group, column = self.planner.quote(group_field), self.planner.quote(count_field)
+        conditions += [f"{group} IS NOT NULL", f"{column} IS NOT NULL"]
+        return cursor.execute(
+            f"SELECT {group} AS g, {column} AS c, COUNT(*) AS count "
+            f"FROM {table} {self._where(conditions)} GROUP BY {group}, {column} ORDER BY {order}"
+        ).df()
@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+
+class FinancialRollupService:
+    """
+    Rangkuman keuangan per AREA: total NILAI ASET, aset termahal, dan aset termurah
+    (nilai > 0). Dihitung dengan agregasi groupby atas seluruh frame (sum, idxmax, idxmin)
+    tanpa loop per grup, lalu disimpan sebagai artifact snapshot sehingga dashboard,
+    analisis, dan chat memakai hasil yang sama selama versi sheet tidak berubah.
+    """
+    ARTIFACT_NAME = 'financial_rollup'
+    REQUIRED_COLUMNS = ('AREA', 'NILAI ASET', 'NAMA ASET')
+
+    def __init__(self, normalizer: Optional[AssetFrameNormalizer] = None):
+        self.normalizer = normalizer or AssetFrameNormalizer()
+
+    def from_snapshot(self, snapshot: SheetSnapshot) -> List[Dict[str, Any]]:
+        return snapshot.get_artifact(
+            self.ARTIFACT_NAME,
+            lambda: self.build(self.normalizer.from_snapshot(snapshot))
+        )
+
+    def supports(self, df: pd.DataFrame) -> bool:
+        return all(col in df.columns for col in self.REQUIRED_COLUMNS)
+
+    def build(self, frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Satu entri per AREA (urutan kategori, AREA kosong dilewati):
+        {"area", "total_value", "asset_termahal": {"nama", "nilai"}, "asset_termurah": {"nama", "nilai"}}.
+        Jika beberapa aset bernilai sama, yang dipilih adalah kemunculan pertamanya.
+        Nama kolom dinormalisasi lebih dulu (huruf kecil, varian 'NILAI ASET (Rp)') sebelum dicek.
+        """
+        frame = self.normalizer.ensure(frame)
+        if frame.empty or not self.supports(frame):
+            return []
+
+        area_col = self.normalizer.category_column('AREA')
+        codes = frame[area_col].cat.codes.to_numpy()
+        areas = frame[area_col].cat.categories
+        valid = codes >= 0
+        # Posisi baris sebagai indeks agar idxmax/idxmin tidak bergantung pada label frame
+        values = pd.Series(frame[self.normalizer.COL_NILAI_NUMERIC].to_numpy()[valid], index=np.flatnonzero(valid))
+        groups = codes[valid]
+
+        grouped = values.groupby(groups)
+        totals = grouped.sum()
+        max_positions = grouped.idxmax()
+        non_zero = values > 0
+        min_positions = values[non_zero].groupby(groups[non_zero.to_numpy()]).idxmin()
+
+        nama = frame['NAMA ASET'].to_numpy(dtype=object)
+        nilai = frame[self.normalizer.COL_NILAI_NUMERIC].to_numpy()
+        summary = []
+        for code, total_value in totals.items():
+            max_position = max_positions[code]
+            min_position = min_positions.get(code)
+            summary.append({
+                "area": areas[code],
+                "total_value": int(total_value),
+                "asset_termahal": {"nama": nama[max_position], "nilai": int(nilai[max_position])},
+                "asset_termurah": (
+                    {"nama": nama[min_position], "nilai": int(nilai[min_position])}
+                    if min_position is not None else {"nama": "N/A", "nilai": 0}
+                ),
+            })
+        return summary
+
+    @staticmethod
+    def filter_areas(summary: List[Dict[str, Any]], area: Optional[str]) -> List[Dict[str, Any]]:
+        """Entri rollup untuk satu AREA (tanpa membedakan huruf besar/kecil); semua entri jika area kosong."""
+        if not area or area == "Semua Area":
+            return summary
+        target = str(area).strip().lower()
+        return [item for item in summary if str(item["area"]).strip().lower() == target]
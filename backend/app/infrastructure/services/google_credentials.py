@@ -0,0 +1,25 @@
+import os
+import json
+import logging
+from typing import List
+from google.oauth2 import service_account
+
+SERVICE_ACCOUNT_FILE = 'credentials.json'
+
+def load_service_account_credentials(scopes: List[str]) -> service_account.Credentials:
+    """
+    Memuat credentials service account Google, dari env var GOOGLE_SHEETS_CREDENTIALS
+    (isi JSON) atau dari file lokal credentials.json.
+    """
+    creds_json = os.getenv("GOOGLE_SHEETS_CREDENTIALS")
+
+    if creds_json:
+        creds_info = json.loads(creds_json)
+        creds = service_account.Credentials.from_service_account_info(creds_info, scopes=scopes)
+        logging.info("[INFO] Google Sheets service initialized via Env Var.")
+    elif os.path.exists(SERVICE_ACCOUNT_FILE):
+        creds = service_account.Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
+        logging.info("[INFO] Google Sheets service initialized via local file.")
+    else:
+        raise FileNotFoundError("Credentials Google tidak ditemukan.")
+    return creds
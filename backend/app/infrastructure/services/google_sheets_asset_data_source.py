@@ -1,28 +1,38 @@
 import os
 import pandas as pd
 import time
-import json
 import logging
-from typing import List, Optional, Tuple
-from google.oauth2 import service_account
+from typing import Dict, List, Optional, Tuple
 from googleapiclient.discovery import build
 from google.api_core.exceptions import GoogleAPIError
 
 from app.config import settings
+from app.domain.entities.sheet_snapshot import SheetSnapshot
 from app.domain.repositories.asset_data_source import IAssetDataSource
+from app.infrastructure.services.sheet_cache_service import SheetCacheService
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
+from app.infrastructure.services.google_credentials import load_service_account_credentials
 
 class GoogleSheetsAssetDataSource(IAssetDataSource):
     """
     Implementasi IAssetDataSource yang mendukung multi-spreadsheet (Master & Siklus)
     dan penanganan nama sheet dinamis dengan proteksi Length Mismatch serta Graceful Error Handling.
+    Hasil parsing setiap sheet di-cache in-process melalui SheetCacheService.
     """
-    SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
-    SERVICE_ACCOUNT_FILE = 'credentials.json'
-    COL_NO_ASET = 'NO ASSET'
-    COL_KONDISI = 'KONDISI'
+    SCOPES = [
+        'https://www.googleapis.com/auth/spreadsheets.readonly',
+        'https://www.googleapis.com/auth/drive.metadata.readonly'
+    ]
+    # Hasil probe revisi dipakai ulang selama interval ini (satu giliran chat = satu probe)
+    PROBE_INTERVAL_SECONDS = float(os.getenv("SHEET_PROBE_INTERVAL_SECONDS", "5"))
 
-    def __init__(self):
+    def __init__(self, cache_service: Optional[SheetCacheService] = None):
+        self.drive_files = None
         self.sheet = self._initialize_service()
+        self.cache_service = cache_service or SheetCacheService()
+        self.parser = SheetValuesParser()
+        self._revision_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._probe_enabled = self.drive_files is not None
         # Mengambil ID dari Environment Variables
         self.master_spreadsheet_id = os.getenv("GOOGLE_SHEET_ID_MASTER") or settings.GOOGLE_SHEET_ID
         self.siklus_spreadsheet_id = os.getenv("GOOGLE_SHEET_ID_SIKLUS")
@@ -30,28 +40,57 @@ class GoogleSheetsAssetDataSource(IAssetDataSource):
     def _initialize_service(self):
         """Menginisialisasi koneksi ke Google Sheets API."""
         try:
-            creds_json = os.getenv("GOOGLE_SHEETS_CREDENTIALS")
-            
-            if creds_json:
-                creds_info = json.loads(creds_json)
-                creds = service_account.Credentials.from_service_account_info(
-                    creds_info, scopes=self.SCOPES
-                )
-                logging.info("[INFO] Google Sheets service initialized via Env Var.")
-            elif os.path.exists(self.SERVICE_ACCOUNT_FILE):
-                creds = service_account.Credentials.from_service_account_file(
-                    self.SERVICE_ACCOUNT_FILE, scopes=self.SCOPES
-                )
-                logging.info("[INFO] Google Sheets service initialized via local file.")
-            else:
-                raise FileNotFoundError("Credentials Google tidak ditemukan.")
+            creds = load_service_account_credentials(self.SCOPES)
             
             service = build('sheets', 'v4', credentials=creds, cache_discovery=False)
+            self.drive_files = self._initialize_drive_files(creds)
             return service.spreadsheets()
         except Exception as e:
             logging.error(f"[FATAL] Gagal inisialisasi Google Sheets: {e}")
             raise
 
+    def _initialize_drive_files(self, creds):
+        """
+        Menginisialisasi Drive API yang hanya dipakai untuk probe revisi spreadsheet.
+        Jika gagal, probe dinonaktifkan dan cache kembali mengandalkan TTL.
+        """
+        try:
+            return build('drive', 'v3', credentials=creds, cache_discovery=False).files()
+        except Exception as e:
+            logging.warning(f"[INFO] Drive API tidak tersedia, probe revisi dinonaktifkan: {e}")
+            return None
+
+    def _probe_revision(self, spreadsheet_id: str) -> Optional[str]:
+        """
+        Probe murah untuk mendeteksi perubahan spreadsheet: membaca 'version' dan
+        'modifiedTime' dari Drive API tanpa mengunduh isi sheet.
+        Mengembalikan None jika probe tidak tersedia, sehingga cache memakai TTL biasa.
+        """
+        if not self._probe_enabled:
+            return None
+
+        now = time.monotonic()
+        cached = self._revision_cache.get(spreadsheet_id)
+        if cached and now - cached[0] < self.PROBE_INTERVAL_SECONDS:
+            return cached[1]
+
+        try:
+            metadata = self.drive_files.get(
+                fileId=spreadsheet_id, fields='version,modifiedTime', supportsAllDrives=True
+            ).execute()
+            revision = f"{metadata.get('version')}:{metadata.get('modifiedTime')}"
+        except Exception as e:
+            error_msg = str(e)
+            if "403" in error_msg or "insufficient" in error_msg.lower():
+                logging.warning(f"[INFO] Akses Drive metadata ditolak, probe revisi dinonaktifkan: {error_msg}")
+                self._probe_enabled = False
+            else:
+                logging.warning(f"[API-ERROR] Probe revisi untuk ID {spreadsheet_id} gagal: {error_msg}")
+            return None
+
+        self._revision_cache[spreadsheet_id] = (now, revision)
+        return revision
+
     def get_sheet_names(self, spreadsheet_id: Optional[str] = None) -> List[str]:
         """Mengambil semua nama sheet dari ID spreadsheet tertentu."""
         if not self.sheet:
@@ -73,49 +112,164 @@ class GoogleSheetsAssetDataSource(IAssetDataSource):
                     raise ConnectionError(f"Gagal mengambil nama sheet dari ID {target_id}")
         return []
 
-    def fetch_data(self, sheet_name: Optional[str], spreadsheet_id: Optional[str] = None) -> pd.DataFrame:
+    def fetch_data(
+        self,
+        sheet_name: Optional[str],
+        spreadsheet_id: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         """
-        Mengambil data dari Google Sheets. 
+        Mengambil data dari Google Sheets (melalui cache). 
         Jika sheet tidak ada, kembalikan DataFrame kosong tanpa melempar error teknis.
+        Yang dikembalikan adalah salinan, sehingga pemanggil bebas memodifikasinya.
+        Jika 'columns' diisi, hanya kolom tersebut yang dikembalikan; bila sheet belum
+        ada di cache, hanya rentang kolom itu yang diunduh.
         """
         if not self.sheet:
             raise ConnectionError("Service Google Sheets tidak aktif.")
         
         target_sheet = sheet_name or 'MASTER-SHEET'
         target_id = spreadsheet_id or self.master_spreadsheet_id
+        key = (target_id, target_sheet)
+        revision = self._probe_revision(target_id)
+
+        if columns:
+            projected = self._download_columns(key, columns, revision)
+            if projected is not None:
+                return projected
+
+        entry = self.cache_service.get_or_load(
+            key,
+            lambda: self._download_sheet(target_sheet, target_id),
+            revision=revision
+        )
+        if columns:
+            return self.parser.project(entry.dataframe, columns)
+        return entry.dataframe.copy()
+
+    def fetch_snapshot(self, sheet_name: Optional[str], spreadsheet_id: Optional[str] = None) -> SheetSnapshot:
+        """
+        Seperti fetch_data, tetapi mengembalikan entri cache apa adanya (tanpa salinan)
+        beserta versi dan artifacts-nya, untuk jalur baca yang memakai turunan data per versi.
+        """
+        if not self.sheet:
+            raise ConnectionError("Service Google Sheets tidak aktif.")
+
+        target_sheet = sheet_name or 'MASTER-SHEET'
+        target_id = spreadsheet_id or self.master_spreadsheet_id
+        entry = self.cache_service.get_or_load(
+            (target_id, target_sheet),
+            lambda: self._download_sheet(target_sheet, target_id),
+            revision=self._probe_revision(target_id)
+        )
+        return SheetSnapshot(target_id, target_sheet, entry.version, entry.dataframe, entry.artifacts)
+
+    def _download_columns(self, key: Tuple[str, str], columns: List[str], revision: Optional[str]) -> Optional[pd.DataFrame]:
+        """
+        Mengunduh hanya kolom yang diminta lewat values.batchGet, memakai posisi header
+        yang tersimpan dari pembacaan sebelumnya. Baris header ikut diminta untuk memastikan
+        susunan kolom belum berubah. Mengembalikan None jika harus membaca sheet penuh
+        (data penuh masih segar di cache, header belum diketahui, atau header berubah).
+        """
+        entry = self.cache_service.get(key)
+        if entry is not None and self.cache_service.is_current(entry, revision):
+            return None
+        header = self.cache_service.get_header(key)
+        if header is None:
+            return None
+        indexes = self.parser.resolve_columns(header.columns, columns)
+        if not indexes:
+            return None
+        projected = self.cache_service.get_projection(key, indexes, revision)
+        if projected is not None:
+            return projected.dataframe.copy()
+
+        target_id, target_sheet = key
+        header_row = header.row_index + 1
+        ranges = [f"'{target_sheet}'!A{header_row}:Z{header_row}"]
+        ranges += [f"'{target_sheet}'!{self.parser.column_letter(i)}:{self.parser.column_letter(i)}" for i in indexes]
+        try:
+            result = self.sheet.values().batchGet(spreadsheetId=target_id, ranges=ranges).execute()
+        except Exception as e:
+            logging.warning(f"[INFO] Pembacaan sebagian kolom sheet '{target_sheet}' gagal, membaca sheet penuh: {e}")
+            return None
+
+        value_ranges = result.get('valueRanges', [])
+        header_values = value_ranges[0].get('values', [[]]) if value_ranges else [[]]
+        if self.parser.clean_header_cells(header_values[0] if header_values else []) != header.cells:
+            logging.info(f"[INFO] Header sheet '{target_sheet}' berubah, membaca sheet penuh.")
+            return None
+
+        df = self.parser.columns_to_dataframe(
+            [value_range.get('values', []) for value_range in value_ranges[1:]], header, indexes
+        )
+        return self.cache_service.put_projection(key, indexes, df, revision=revision).dataframe.copy()
+
+    def invalidate_cache(self, sheet_name: Optional[str] = None, spreadsheet_id: Optional[str] = None) -> None:
+        """Menghapus cache sheet agar pembacaan berikutnya mengambil data terbaru dari API."""
+        self.cache_service.invalidate(spreadsheet_id=spreadsheet_id, sheet_name=sheet_name)
+        if spreadsheet_id:
+            self._revision_cache.pop(spreadsheet_id, None)
+        else:
+            self._revision_cache.clear()
+
+    def fetch_many(
+        self,
+        sheet_names: Optional[List[str]] = None,
+        spreadsheet_id: Optional[str] = None,
+        force_refresh: bool = False
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Mengambil banyak sheet sekaligus. Sheet yang masih segar di cache tidak diunduh ulang,
+        sisanya diambil dalam satu round trip values.batchGet.
+        Jika 'sheet_names' None dan belum ada sheet segar di cache, seluruh sheet diambil lewat
+        satu panggilan metadata (nama sheet + isi sekaligus); jika sebagian sudah segar, hanya
+        nama sheet yang dibaca lalu sisanya diunduh seperti daftar nama biasa.
+        Dengan force_refresh=True semua sheet diunduh ulang (revisi juga di-probe ulang). Entri
+        lama tidak dibuang lebih dulu, sehingga put tetap memakai ulang artifacts jika isinya sama.
+        Sheet yang tidak ada tidak disertakan dalam hasil.
+        """
+        if not self.sheet:
+            raise ConnectionError("Service Google Sheets tidak aktif.")
+
+        target_id = spreadsheet_id or self.master_spreadsheet_id
+        if force_refresh:
+            self._revision_cache.pop(target_id, None)
+        revision = self._probe_revision(target_id)
+
+        if sheet_names is None:
+            if force_refresh or not self.cache_service.current_sheet_names(target_id, revision):
+                frames = self._download_all_sheets(target_id)
+                for name, df in frames.items():
+                    self.cache_service.put((target_id, name), df, revision=revision)
+                return {name: df.copy() for name, df in frames.items()}
+            sheet_names = self.get_sheet_names(spreadsheet_id=target_id)
+
+        results: Dict[str, pd.DataFrame] = {}
+        missing = []
+        for name in dict.fromkeys(sheet_names):
+            entry = None if force_refresh else self.cache_service.get((target_id, name))
+            # Entri kosong bisa berarti sheet tidak ada, jadi keberadaannya dicek ulang lewat batchGet
+            if entry is not None and not entry.dataframe.empty and self.cache_service.is_current(entry, revision):
+                results[name] = entry.dataframe.copy()
+            else:
+                missing.append(name)
+
+        if missing:
+            for name, df in self._batch_download_sheets(missing, target_id).items():
+                results[name] = self.cache_service.put((target_id, name), df, revision=revision).dataframe.copy()
+
+        return {name: results[name] for name in dict.fromkeys(sheet_names) if name in results}
+
+    def _download_sheet(self, target_sheet: str, target_id: str) -> pd.DataFrame:
+        """Mengunduh dan mem-parsing satu sheet langsung dari Google Sheets API."""
         range_name = f"'{target_sheet}'!A:Z"
         
         try:
             result = self.sheet.values().get(
                 spreadsheetId=target_id, range=range_name
             ).execute()
-            
-            values = result.get('values', [])
-            if not values:
-                return pd.DataFrame()
-
-            # 1. Cari baris Header
-            header, header_row_index = self._find_header_row(values)
-            if header_row_index == -1:
-                return pd.DataFrame()
-
-            # 2. Proses Nama Kolom
-            unique_header = self._make_unique_columns([' '.join(str(col).strip().split()) for col in header])
-            num_expected_cols = len(unique_header)
-
-            # 3. Normalisasi baris data
-            data_rows = values[header_row_index + 1:]
-            normalized_data = []
-            for row in data_rows:
-                if not any(str(cell).strip() for cell in row): continue
-                if len(row) < num_expected_cols:
-                    row.extend([None] * (num_expected_cols - len(row)))
-                normalized_data.append(row[:num_expected_cols])
-            
-            if not normalized_data:
-                return pd.DataFrame()
-
-            return pd.DataFrame(normalized_data, columns=unique_header)
+            return self.parser.to_dataframe(result.get('values', []))
             
         except Exception as e:
             error_msg = str(e)
@@ -125,26 +279,51 @@ class GoogleSheetsAssetDataSource(IAssetDataSource):
             
             raise RuntimeError(f"Gagal akses Google API: {error_msg}")
 
-    def _find_header_row(self, values: List[List[str]]) -> Tuple[List[str], int]:
-        """Mencari baris header berdasarkan kolom kunci (NO ASSET & KONDISI)."""
-        key_header_columns = {self.COL_NO_ASET, self.COL_KONDISI}
-        for i, row in enumerate(values):
-            row_content = {str(cell).strip().upper() for cell in row if str(cell).strip()}
-            if key_header_columns.issubset(row_content):
-                return row, i
-        return [], -1
-
-    def _make_unique_columns(self, columns: List[str]) -> List[str]:
-        """Mencegah duplikasi nama kolom agar tidak error di Pandas."""
-        seen = {}
-        new_columns = []
-        for col in columns:
-            if not col:
-                col = "UNTITLED_COLUMN"
-            original_col = col
-            count = seen.get(original_col, 0)
-            if count > 0:
-                col = f"{original_col}_{count}"
-            seen[original_col] = count + 1
-            new_columns.append(col)
-        return new_columns
\ No newline at end of file
+    def _batch_download_sheets(self, sheet_names: List[str], target_id: str) -> Dict[str, pd.DataFrame]:
+        """
+        Mengunduh beberapa sheet dalam satu panggilan values.batchGet.
+        Jika ada nama sheet yang tidak valid (HTTP 400), daftar sheet dicocokkan dulu
+        dengan metadata lalu batchGet diulang hanya untuk sheet yang ada.
+        """
+        try:
+            result = self.sheet.values().batchGet(
+                spreadsheetId=target_id, ranges=[f"'{name}'!A:Z" for name in sheet_names]
+            ).execute()
+        except Exception as e:
+            error_msg = str(e)
+            if "Unable to parse range" not in error_msg and "400" not in error_msg:
+                raise RuntimeError(f"Gagal akses Google API: {error_msg}")
+
+            available = set(self.get_sheet_names(spreadsheet_id=target_id))
+            existing = [name for name in sheet_names if name in available]
+            skipped = [name for name in sheet_names if name not in available]
+            logging.warning(f"[INFO] Sheet {skipped} tidak ditemukan di ID: {target_id}. Dilewati.")
+            if len(existing) == len(sheet_names):
+                raise RuntimeError(f"Gagal akses Google API: {error_msg}")
+            return self._batch_download_sheets(existing, target_id) if existing else {}
+
+        value_ranges = result.get('valueRanges', [])
+        return {
+            name: self.parser.to_dataframe(value_range.get('values', []))
+            for name, value_range in zip(sheet_names, value_ranges)
+        }
+
+    def _download_all_sheets(self, target_id: str) -> Dict[str, pd.DataFrame]:
+        """
+        Mengambil nama dan isi seluruh sheet dalam satu panggilan spreadsheets.get
+        (includeGridData), dengan field mask hanya pada judul sheet dan nilai terformat.
+        """
+        try:
+            result = self.sheet.get(
+                spreadsheetId=target_id,
+                includeGridData=True,
+                fields='sheets(properties(title),data(rowData(values(formattedValue))))'
+            ).execute()
+        except Exception as e:
+            raise RuntimeError(f"Gagal akses Google API: {e}")
+
+        frames = {}
+        for sheet in result.get('sheets', []):
+            title, values = self.parser.grid_to_values(sheet)
+            frames[title] = self.parser.to_dataframe(values)
+        return frames
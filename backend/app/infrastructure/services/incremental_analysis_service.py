@@ -0,0 +1,401 @@
+import os
+import pickle
+import hashlib
+import logging
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+from app.infrastructure.services.financial_rollup_service import FinancialRollupService
+
+@dataclass
+class AnalysisBaseline:
+    """
+    Keadaan analisis tersimpan terakhir untuk satu sheet: indeks baris (kunci NO ASSET + hash isi
+    baris, beserta kolom yang dipakai agregat dan digest) dan agregat yang sudah dihitung.
+    'condition_counts' adalah tabel jumlah kondisi per AREA, 'duplicate_keys' NO ASSET yang muncul
+    lebih dari sekali.
+    """
+    source: str
+    sheet_name: str
+    content_version: str
+    created_at: str
+    columns: List[str]
+    rows: pd.DataFrame
+    condition_counts: Optional[pd.DataFrame]
+    financial_rollup: List[Dict[str, Any]]
+    duplicate_keys: Optional[pd.Index]
+    summary_text: Optional[str]
+
+@dataclass
+class AssetDelta:
+    """
+    Selisih baris sheet saat ini terhadap baseline. 'incoming' adalah baris baru dan versi baru
+    baris yang berubah (urutan sheet saat ini), 'outgoing' adalah baris yang dihapus dan versi
+    lama baris yang berubah. 'before'/'after' adalah pasangan baris berubah dengan urutan sama.
+    """
+    added: pd.DataFrame
+    removed: pd.DataFrame
+    before: pd.DataFrame
+    after: pd.DataFrame
+    incoming: pd.DataFrame
+    outgoing: pd.DataFrame
+    unchanged: int
+    total: int
+    previous_total: int
+
+    @property
+    def size(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.after)
+
+    @property
+    def change_ratio(self) -> float:
+        return self.size / max(self.total, self.previous_total, 1)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.size == 0
+
+    def describe(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added), "removed": len(self.removed), "changed": len(self.after),
+            "unchanged": self.unchanged, "total": self.total, "previous_total": self.previous_total,
+        }
+
+class IncrementalAnalysisService:
+    """
+    Analisis ulang inkremental: baris sheet dibandingkan dengan baseline analisis tersimpan
+    terakhir berdasarkan NO ASSET (ditambah urutan kemunculan agar NO ASSET ganda tetap unik),
+    lalu agregat (jumlah kondisi, rollup keuangan, NO ASSET ganda) diperbarui hanya dari
+    baris yang berubah, dan LLM menerima ringkasan perubahan alih-alih seluruh data.
+    Baseline disimpan per (sumber, sheet) sebagai file di INCREMENTAL_BASELINE_PATH.
+    """
+    # Di Azure, set ENV 'INCREMENTAL_BASELINE_PATH' ke direktori yang di-mount
+    BASE_DIR = Path(os.getenv("INCREMENTAL_BASELINE_PATH", "analysis_baseline"))
+    # Di atas rasio perubahan ini analisis penuh lebih murah dan lebih akurat
+    MAX_CHANGE_RATIO = float(os.getenv("INCREMENTAL_MAX_CHANGE_RATIO", "0.3"))
+    DIGEST_MAX_ROWS = int(os.getenv("INCREMENTAL_DIGEST_MAX_ROWS", "150"))
+
+    ARTIFACT_NAME = 'incremental_row_index'
+    KEY_COLUMN = 'NO ASSET'
+    ROW_HASH = '_ROW_HASH'
+    # Nomor urut bergeser setiap ada baris disisipkan/dihapus, bukan perubahan isi aset
+    IGNORED_COLUMNS = ('NO',)
+    DIGEST_COLUMNS = [
+        'NAMA ASET', 'AREA', 'KONDISI', 'HASIL INVENTORY', 'NILAI ASET',
+        'LOKASI SPESIFIK PER-INVENTORY', 'KETERANGAN',
+    ]
+
+    def __init__(self, normalizer: Optional[AssetFrameNormalizer] = None, base_dir: Optional[Path] = None):
+        self.normalizer = normalizer or AssetFrameNormalizer()
+        self.financial_rollup = FinancialRollupService(self.normalizer)
+        self.base_dir = Path(base_dir) if base_dir is not None else self.BASE_DIR
+        if not self.base_dir.exists():
+            try:
+                self.base_dir.mkdir(parents=True, exist_ok=True)
+            except Exception as e:
+                logging.error(f"[INCREMENTAL] Gagal membuat direktori baseline: {e}")
+
+    # --- Penyimpanan baseline ---
+
+    def load_baseline(self, source: str, sheet_name: str) -> Optional[AnalysisBaseline]:
+        path = self._path(source, sheet_name)
+        if not path.exists():
+            return None
+        try:
+            baseline = pickle.loads(path.read_bytes())
+        except Exception as e:
+            logging.warning(f"[INCREMENTAL] Baseline {source}/{sheet_name} tidak terbaca, diabaikan: {e}")
+            return None
+        return baseline if isinstance(baseline, AnalysisBaseline) else None
+
+    def save_baseline(self, baseline: AnalysisBaseline):
+        """Menyimpan baseline (menggantikan yang lama) secara atomik."""
+        path = self._path(baseline.source, baseline.sheet_name)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(pickle.dumps(baseline, protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp_path, path)
+            logging.info(f"[INCREMENTAL] Baseline {baseline.source}/{baseline.sheet_name} disimpan ({len(baseline.rows)} baris).")
+        except Exception as e:
+            logging.error(f"[INCREMENTAL] Gagal menyimpan baseline {baseline.source}/{baseline.sheet_name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def _path(self, source: str, sheet_name: str) -> Path:
+        digest = hashlib.sha1(f"{source}|{sheet_name}".encode("utf-8")).hexdigest()[:16]
+        return self.base_dir / f"baseline_{digest}.pkl"
+
+    # --- Indeks baris dan selisih ---
+
+    def supports(self, df: pd.DataFrame) -> bool:
+        return self.KEY_COLUMN in df.columns
+
+    def hashed_columns(self, df: pd.DataFrame) -> List[str]:
+        return [col for col in df.columns if not str(col).startswith('_') and col not in self.IGNORED_COLUMNS]
+
+    def from_snapshot(self, snapshot: SheetSnapshot) -> pd.DataFrame:
+        """Indeks baris untuk versi sheet ini; dibangun sekali lalu dipakai ulang dari cache."""
+        return snapshot.get_artifact(self.ARTIFACT_NAME, lambda: self.index_rows(self.normalizer.from_snapshot(snapshot)))
+
+    def index_rows(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Satu baris per baris sheet (urutan sama), berindeks kunci unik '<NO ASSET>#<kemunculan ke->'.
+        Berisi hash isi baris (semua kolom tampilan kecuali nomor urut), kolom digest, dan nilai numerik.
+        """
+        frame = self.normalizer.ensure(frame)
+        no_asset = frame[self.KEY_COLUMN].astype(str).str.strip()
+        occurrence = no_asset.groupby(no_asset, sort=False).cumcount()
+        keys = no_asset + '#' + occurrence.astype(str)
+
+        kept = [self.KEY_COLUMN] + [col for col in self.DIGEST_COLUMNS if col in frame.columns]
+        rows = frame[kept].copy()
+        rows[self.ROW_HASH] = pd.util.hash_pandas_object(frame[self.hashed_columns(frame)], index=False).to_numpy()
+        if self.normalizer.COL_NILAI_NUMERIC in frame.columns:
+            rows[self.normalizer.COL_NILAI_NUMERIC] = frame[self.normalizer.COL_NILAI_NUMERIC].to_numpy()
+        rows.index = pd.Index(keys.to_numpy(), name='_ROW_KEY')
+        return rows
+
+    def is_compatible(self, baseline: AnalysisBaseline, frame: pd.DataFrame) -> bool:
+        """Baseline hanya bisa dipakai jika susunan kolom sheet tidak berubah."""
+        return baseline.columns == self.hashed_columns(frame)
+
+    def diff(self, baseline: AnalysisBaseline, rows: pd.DataFrame) -> AssetDelta:
+        previous = baseline.rows
+        positions = previous.index.get_indexer(rows.index)
+        matched = positions >= 0
+        changed = np.zeros(len(rows), dtype=bool)
+        changed[matched] = rows[self.ROW_HASH].to_numpy()[matched] != previous[self.ROW_HASH].to_numpy()[positions[matched]]
+
+        kept = np.zeros(len(previous), dtype=bool)
+        kept[positions[matched]] = True
+        outgoing = ~kept
+        outgoing[positions[changed]] = True
+
+        return AssetDelta(
+            added=rows[~matched],
+            removed=previous[~kept],
+            before=previous.iloc[positions[changed]],
+            after=rows[changed],
+            incoming=rows[~matched | changed],
+            outgoing=previous[outgoing],
+            unchanged=int(matched.sum() - changed.sum()),
+            total=len(rows),
+            previous_total=len(previous),
+        )
+
+    # --- Pembaruan agregat dari selisih ---
+
+    @staticmethod
+    def update_condition_counts(
+        counts: pd.DataFrame,
+        delta: AssetDelta,
+        count_fn: Callable[[pd.DataFrame], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Tabel kondisi per AREA = baseline + hitungan baris masuk - hitungan baris keluar."""
+        updated = counts.add(count_fn(delta.incoming), fill_value=0).sub(count_fn(delta.outgoing), fill_value=0)
+        updated = updated[updated['total_assets'] > 0].astype('int64').sort_index()
+        updated.index.name = 'AREA'
+        return updated
+
+    def duplicate_keys(self, df: pd.DataFrame) -> pd.Index:
+        """NO ASSET (nilai asli, seperti df.duplicated) yang muncul lebih dari sekali."""
+        counts = df[self.KEY_COLUMN].value_counts(dropna=False)
+        return counts.index[counts.to_numpy() > 1]
+
+    def update_duplicate_keys(self, duplicate_keys: pd.Index, delta: AssetDelta, rows: pd.DataFrame) -> pd.Index:
+        """Hanya NO ASSET yang tersentuh perubahan yang dihitung ulang pada baris saat ini."""
+        affected = pd.Index(pd.concat([delta.incoming[self.KEY_COLUMN], delta.outgoing[self.KEY_COLUMN]]).unique())
+        if affected.empty:
+            return duplicate_keys
+        current = rows[self.KEY_COLUMN]
+        recounted = self.duplicate_keys(current[current.isin(affected)].to_frame())
+        return duplicate_keys.difference(affected, sort=False).append(recounted)
+
+    def update_financial_rollup(
+        self,
+        rollup: List[Dict[str, Any]],
+        delta: AssetDelta,
+        rows: pd.DataFrame,
+        frame: pd.DataFrame
+    ) -> List[Dict[str, Any]]:
+        """
+        Total per AREA diperbarui dengan selisih nilai. Aset termahal/termurah diganti jika baris
+        masuk melampauinya; AREA yang baris termahal/termurahnya keluar atau menyamai nilai baru
+        dihitung ulang dari frame (hanya AREA itu) agar pilihan kemunculan pertama tetap sama.
+        """
+        nilai_col = self.normalizer.COL_NILAI_NUMERIC
+        frame = self.normalizer.ensure(frame)
+        if not self.financial_rollup.supports(frame) or nilai_col not in rows.columns:
+            return self.financial_rollup.build(frame)
+
+        entries = {
+            item["area"]: {**item, "asset_termahal": dict(item["asset_termahal"]), "asset_termurah": dict(item["asset_termurah"])}
+            for item in rollup
+        }
+        present = set(rows['AREA'].dropna().unique())
+        incoming, outgoing = delta.incoming, delta.outgoing
+        touched = set(incoming['AREA'].dropna().unique()) | set(outgoing['AREA'].dropna().unique())
+        recompute = []
+
+        for area in touched:
+            if area not in present:
+                entries.pop(area, None)
+                continue
+            entry = entries.get(area)
+            if entry is None:
+                recompute.append(area)
+                continue
+            area_in = incoming[incoming['AREA'] == area]
+            in_values = area_in[nilai_col].to_numpy()
+            out_values = outgoing.loc[outgoing['AREA'] == area, nilai_col].to_numpy()
+
+            max_value = entry["asset_termahal"]["nilai"]
+            min_value = entry["asset_termurah"]["nilai"]
+            has_min = min_value > 0
+            if (out_values == max_value).any() or (in_values == max_value).any() or (
+                has_min and ((out_values == min_value).any() or (in_values == min_value).any())
+            ):
+                recompute.append(area)
+                continue
+
+            entry["total_value"] = int(entry["total_value"] + in_values.sum() - out_values.sum())
+            if in_values.size and in_values.max() > max_value:
+                # Baris masuk berurutan seperti sheet, argmax = kemunculan pertama
+                position = int(in_values.argmax())
+                entry["asset_termahal"] = {"nama": area_in['NAMA ASET'].iloc[position], "nilai": int(in_values[position])}
+            positive = in_values > 0
+            if positive.any():
+                candidate = np.where(positive, in_values, np.iinfo(np.int64).max)
+                position = int(candidate.argmin())
+                if not has_min or in_values[position] < min_value:
+                    entry["asset_termurah"] = {"nama": area_in['NAMA ASET'].iloc[position], "nilai": int(in_values[position])}
+
+        if recompute:
+            area_col = self.normalizer.category_column('AREA')
+            frame = self.normalizer.ensure(frame)
+            for item in self.financial_rollup.build(frame[frame[area_col].isin(recompute)]):
+                entries[item["area"]] = item
+        return [entries[area] for area in sorted(entries)]
+
+    def build_baseline(
+        self,
+        source: str,
+        sheet_name: str,
+        content_version: str,
+        frame: pd.DataFrame,
+        rows: pd.DataFrame,
+        condition_counts: Optional[pd.DataFrame],
+        financial_rollup: List[Dict[str, Any]],
+        duplicate_keys: Optional[pd.Index],
+        summary_text: Optional[str]
+    ) -> AnalysisBaseline:
+        return AnalysisBaseline(
+            source=source,
+            sheet_name=sheet_name,
+            content_version=content_version,
+            created_at=datetime.now(timezone.utc).isoformat(),
+            columns=self.hashed_columns(frame),
+            rows=rows,
+            condition_counts=condition_counts,
+            financial_rollup=financial_rollup,
+            duplicate_keys=duplicate_keys,
+            summary_text=summary_text,
+        )
+
+    def compact_baseline(self, baseline: AnalysisBaseline) -> AnalysisBaseline:
+        """Baseline tanpa indeks baris (agregat dan ringkasan saja), untuk disimpan di cache hasil analisis."""
+        return replace(baseline, rows=baseline.rows.iloc[:0])
+
+    def restore_baseline(self, compact: AnalysisBaseline, snapshot: SheetSnapshot) -> AnalysisBaseline:
+        """Melengkapi baseline ringkas dengan indeks baris versi sheet ini (artifact snapshot)."""
+        return replace(
+            compact, rows=self.from_snapshot(snapshot), content_version=snapshot.version,
+            created_at=datetime.now(timezone.utc).isoformat()
+        )
+
+    # --- Digest perubahan untuk LLM ---
+
+    def build_digest(
+        self,
+        baseline: AnalysisBaseline,
+        delta: AssetDelta,
+        condition_counts: Optional[pd.DataFrame] = None,
+        condition_labels: Optional[List[tuple]] = None,
+        financial_rollup: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """
+        Teks ringkas perubahan sejak baseline: jumlah aset, perubahan jumlah kondisi dan total
+        nilai per AREA, lalu detail baris (maks DIGEST_MAX_ROWS) dengan nilai lama -> baru.
+        """
+        stats = delta.describe()
+        parts = [
+            f"PERUBAHAN DATA SEJAK ANALISIS TERSIMPAN ({baseline.created_at[:10]})",
+            f"- Jumlah aset: {stats['previous_total']} -> {stats['total']} "
+            f"(baru {stats['added']}, dihapus {stats['removed']}, berubah {stats['changed']}, tetap {stats['unchanged']})",
+        ]
+
+        if condition_counts is not None and baseline.condition_counts is not None and condition_labels:
+            columns = ['total_assets'] + [key for key, _, _ in condition_labels]
+            labels = dict([('total_assets', 'Total Aset')] + [(key, label) for key, _, label in condition_labels])
+            before = baseline.condition_counts.reindex(columns=columns)
+            after = condition_counts.reindex(columns=columns)
+            areas = before.index.union(after.index)
+            before = before.reindex(areas, fill_value=0)
+            after = after.reindex(areas, fill_value=0)
+            lines = []
+            for area in areas:
+                changes = [
+                    f"{labels[col]} {int(before.at[area, col])} -> {int(after.at[area, col])}"
+                    for col in columns if before.at[area, col] != after.at[area, col]
+                ]
+                if changes:
+                    lines.append(f"- Area {area}: " + ", ".join(changes))
+            if lines:
+                parts.append("\nPERUBAHAN KONDISI PER AREA:")
+                parts.extend(lines)
+
+        if financial_rollup is not None:
+            previous_totals = {item["area"]: item["total_value"] for item in baseline.financial_rollup}
+            current_totals = {item["area"]: item["total_value"] for item in financial_rollup}
+            lines = [
+                f"- Area {area}: Rp {previous_totals.get(area, 0):,.0f} -> Rp {current_totals.get(area, 0):,.0f}"
+                for area in sorted(set(previous_totals) | set(current_totals))
+                if previous_totals.get(area, 0) != current_totals.get(area, 0)
+            ]
+            if lines:
+                parts.append("\nPERUBAHAN TOTAL NILAI ASET PER AREA:")
+                parts.extend(lines)
+
+        details = self._changed_row_lines(delta.before, delta.after)
+        details += [f"[BARU] {self._describe_row(row)}" for row in delta.added.head(self.DIGEST_MAX_ROWS).to_dict('records')]
+        details += [f"[DIHAPUS] {self._describe_row(row)}" for row in delta.removed.head(self.DIGEST_MAX_ROWS).to_dict('records')]
+        if details:
+            parts.append(f"\nDETAIL PERUBAHAN (maks {self.DIGEST_MAX_ROWS} baris):")
+            parts.extend(details[:self.DIGEST_MAX_ROWS])
+            if delta.size > self.DIGEST_MAX_ROWS:
+                parts.append(f"... dan {delta.size - self.DIGEST_MAX_ROWS} perubahan lain tidak ditampilkan.")
+        return "\n".join(parts)
+
+    def _changed_row_lines(self, before: pd.DataFrame, after: pd.DataFrame) -> List[str]:
+        before, after = before.head(self.DIGEST_MAX_ROWS), after.head(self.DIGEST_MAX_ROWS)
+        columns = [col for col in self.DIGEST_COLUMNS if col in before.columns and col in after.columns]
+        # Perbandingan per kolom sekaligus; nilai kosong di kedua sisi dianggap sama
+        differs = {
+            col: ~((before[col].to_numpy() == after[col].to_numpy()) | (before[col].isna().to_numpy() & after[col].isna().to_numpy()))
+            for col in columns
+        }
+        lines = []
+        for i, (old, new) in enumerate(zip(before.to_dict('records'), after.to_dict('records'))):
+            changes = [f"{col} '{old[col]}' -> '{new[col]}'" for col in columns if differs[col][i]]
+            label = f"{self.KEY_COLUMN} {new[self.KEY_COLUMN]} - {new.get('NAMA ASET', '')}"
+            lines.append(f"[BERUBAH] {label}: " + ("; ".join(changes) if changes else "kolom lain berubah"))
+        return lines
+
+    def _describe_row(self, row: Dict[str, Any]) -> str:
+        details = ", ".join(f"{row[col]}" for col in ('AREA', 'KONDISI') if col in row)
+        return f"{self.KEY_COLUMN} {row[self.KEY_COLUMN]} - {row.get('NAMA ASET', '')} ({details})"
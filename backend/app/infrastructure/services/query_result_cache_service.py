@@ -0,0 +1,77 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+ScopeKey = Tuple[str, str]
+
+class QueryResultCacheService:
+    """
+    Cache LRU in-process untuk hasil query agregasi (distribusi, top values, breakdown, count/sum).
+    Setiap entri terikat pada (spreadsheet_id, sheet_name) dan versi konten sheet:
+    begitu versi baru terlihat untuk sheet yang sama, semua hasil versi lama dibuang.
+    Dipakai bersama sebagai singleton karena use case dibuat ulang per permintaan.
+    """
+    MAX_ENTRIES = int(os.getenv("QUERY_RESULT_CACHE_MAX_ENTRIES", "512"))
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = self.MAX_ENTRIES if max_entries is None else max_entries
+        self._entries: "OrderedDict[Tuple[ScopeKey, Hashable], Any]" = OrderedDict()
+        self._versions: Dict[ScopeKey, str] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, scope: ScopeKey, version: str, key: Hashable) -> Optional[Any]:
+        """Hasil tersimpan untuk query 'key' pada versi sheet ini, atau None."""
+        with self._lock:
+            self._sync_version(scope, version)
+            value = self._entries.get((scope, key))
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end((scope, key))
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, scope: ScopeKey, version: str, key: Hashable, value: Any):
+        with self._lock:
+            if self._versions.setdefault(scope, version) != version:
+                # Versi sheet sudah berganti selama query berjalan; hasil lama tidak disimpan
+                return
+            self._entries[(scope, key)] = value
+            self._entries.move_to_end((scope, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, spreadsheet_id: Optional[str] = None, sheet_name: Optional[str] = None) -> int:
+        """Menghapus hasil untuk sheet tertentu (atau semuanya). Mengembalikan jumlah entri terhapus."""
+        with self._lock:
+            targets = [
+                entry_key for entry_key in self._entries
+                if (spreadsheet_id is None or entry_key[0][0] == spreadsheet_id)
+                and (sheet_name is None or entry_key[0][1] == sheet_name)
+            ]
+            for entry_key in targets:
+                del self._entries[entry_key]
+            for scope in [s for s in self._versions if (spreadsheet_id is None or s[0] == spreadsheet_id) and (sheet_name is None or s[1] == sheet_name)]:
+                del self._versions[scope]
+        return len(targets)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "max_entries": self.max_entries}
+
+    def _sync_version(self, scope: ScopeKey, version: str):
+        """Mencatat versi terbaru sheet; versi berbeda membuang semua hasil sheet tersebut."""
+        current = self._versions.get(scope)
+        if current == version:
+            return
+        if current is not None:
+            stale = [entry_key for entry_key in self._entries if entry_key[0] == scope]
+            for entry_key in stale:
+                del self._entries[entry_key]
+            self._stats["invalidations"] += 1
+            logging.info(f"[CACHE] Versi sheet '{scope[1]}' berubah, {len(stale)} hasil query dibuang.")
+        self._versions[scope] = version
@@ -0,0 +1,82 @@
+import os
+import json
+import base64
+import hashlib
+import binascii
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+class InvalidCursorError(ValueError):
+    """Cursor rusak, milik query lain, atau dibuat untuk versi sheet yang sudah berubah."""
+
+@dataclass
+class PageRequest:
+    offset: int
+    page_size: int
+
+class ResultPaginator:
+    """
+    Paginasi berbasis cursor untuk hasil baris (query_assets task filter, get_master_data).
+    Cursor bersifat opaque (base64 JSON) dan mengikat offset ke versi konten sheet serta
+    sidik jari parameter query, sehingga halaman berikutnya selalu konsisten dengan halaman
+    sebelumnya; jika sheet berubah, cursor ditolak dan klien harus mulai dari halaman pertama.
+    """
+    DEFAULT_PAGE_SIZE = int(os.getenv("PAGINATION_DEFAULT_PAGE_SIZE", "100"))
+    MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", "1000"))
+
+    @staticmethod
+    def fingerprint(params: Dict[str, Any]) -> str:
+        """Sidik jari parameter query (tanpa parameter paginasi)."""
+        canonical = json.dumps({k: v for k, v in params.items() if v is not None}, sort_keys=True, default=str)
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+    def resolve(
+        self,
+        page_size: Optional[int],
+        cursor: Optional[str],
+        version: str,
+        fingerprint: str
+    ) -> Optional[PageRequest]:
+        """PageRequest untuk permintaan ini, atau None jika klien tidak meminta paginasi."""
+        if page_size is None and not cursor:
+            return None
+
+        offset = 0
+        if cursor:
+            state = self._decode(cursor)
+            if state.get("q") != fingerprint:
+                raise InvalidCursorError("Cursor tidak cocok dengan parameter query ini.")
+            if state.get("v") != version:
+                raise InvalidCursorError("Data sheet sudah berubah sejak cursor dibuat. Mulai ulang dari halaman pertama.")
+            offset = int(state.get("o", 0))
+            page_size = page_size or state.get("n")
+
+        size = int(page_size or self.DEFAULT_PAGE_SIZE)
+        return PageRequest(offset=max(offset, 0), page_size=max(1, min(size, self.MAX_PAGE_SIZE)))
+
+    def page_info(self, request: PageRequest, total_count: int, version: str, fingerprint: str) -> Dict[str, Any]:
+        next_offset = request.offset + request.page_size
+        has_more = next_offset < total_count
+        return {
+            "offset": request.offset,
+            "page_size": request.page_size,
+            "total_count": int(total_count),
+            "has_more": has_more,
+            "next_cursor": self._encode({"v": version, "q": fingerprint, "o": next_offset, "n": request.page_size}) if has_more else None,
+        }
+
+    @staticmethod
+    def _encode(state: Dict[str, Any]) -> str:
+        raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode(cursor: str) -> Dict[str, Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidCursorError("Cursor tidak valid.")
+        if not isinstance(state, dict):
+            raise InvalidCursorError("Cursor tidak valid.")
+        return state
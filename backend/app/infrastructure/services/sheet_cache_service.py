@@ -0,0 +1,423 @@
+import os
+import sys
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from itertools import islice
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from app.domain.entities.sheet_snapshot import SnapshotArtifacts
+
+CacheKey = Tuple[str, str]
+
+@dataclass
+class SheetCacheEntry:
+    """
+    Satu entri cache: DataFrame hasil parsing sebuah sheet beserta metadatanya.
+    'version' adalah hash konten, sehingga reload dengan isi yang sama tidak mengubah versi.
+    'revision' adalah penanda revisi dari sumber (mis. Drive version) saat data dimuat.
+    'artifacts' menampung turunan data (per versi) yang ingin ikut di-cache; ukurannya
+    ikut dihitung dalam 'size_bytes' sehingga tunduk pada batas memori cache.
+    """
+    dataframe: pd.DataFrame
+    version: str
+    loaded_at: float
+    size_bytes: int
+    revision: Optional[str] = None
+    artifacts: SnapshotArtifacts = field(default_factory=SnapshotArtifacts)
+
+class SheetCacheService:
+    """
+    Cache in-process untuk DataFrame sheet, dengan kunci (spreadsheet_id, sheet_name).
+    Mendukung TTL, batas memori dengan eviksi LRU, stale-while-revalidate,
+    serta invalidasi eksplisit agar analisis dapat memaksa pembacaan ulang.
+    Batas memori mencakup DataFrame sheet, artifact per versinya, dan hasil pembacaan sebagian kolom.
+    Artifact entri yang diganti versi baru, dieviksi, atau diinvalidasi dilepas (dispose).
+    """
+    TTL_SECONDS = float(os.getenv("SHEET_CACHE_TTL_SECONDS", "300"))
+    STALE_TTL_SECONDS = float(os.getenv("SHEET_CACHE_STALE_TTL_SECONDS", "900"))
+    # Mencakup artifact per versi (frame kanonik, indeks, cube, dll.), sekitar 3x ukuran sheet mentah
+    MAX_BYTES = int(os.getenv("SHEET_CACHE_MAX_MB", "1024")) * 1024 * 1024
+    MAX_PROJECTIONS = int(os.getenv("SHEET_CACHE_MAX_PROJECTIONS", "32"))
+    # Jumlah elemen sampel untuk memperkirakan ukuran koleksi/kolom teks yang besar
+    SIZE_SAMPLE = 1000
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        stale_ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.ttl_seconds = self.TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.stale_ttl_seconds = self.STALE_TTL_SECONDS if stale_ttl_seconds is None else stale_ttl_seconds
+        self.max_bytes = self.MAX_BYTES if max_bytes is None else max_bytes
+
+        self._entries: "OrderedDict[CacheKey, SheetCacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self._key_locks: Dict[CacheKey, threading.Lock] = {}
+        self._async_key_locks: Dict[CacheKey, asyncio.Lock] = {}
+        self._refreshing: set = set()
+        # Posisi header per sheet; kecil dan tidak ikut dieviksi/diinvalidasi karena
+        # selalu diverifikasi ulang saat dipakai untuk pembacaan sebagian kolom.
+        self._headers: Dict[CacheKey, Any] = {}
+        # Hasil pembacaan sebagian kolom, per (sheet, indeks kolom); segar dengan aturan yang sama
+        # seperti entri penuh dan dibuang saat sheet penuh dimuat ulang atau diinvalidasi.
+        self._projections: "OrderedDict[Tuple[CacheKey, Tuple[int, ...]], SheetCacheEntry]" = OrderedDict()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "projection_hits": 0}
+
+    @staticmethod
+    def compute_version(df: pd.DataFrame) -> str:
+        """Menghitung hash konten DataFrame (kolom + nilai) sebagai penanda versi."""
+        hasher = hashlib.sha1("|".join(map(str, df.columns)).encode("utf-8"))
+        if not df.empty:
+            hasher.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return hasher.hexdigest()[:16]
+
+    @staticmethod
+    def estimate_size(value: Any) -> int:
+        """
+        Perkiraan ukuran memori sebuah artifact: DataFrame/Series/Index (deep), array NumPy,
+        koleksi dan atribut objek (mis. dataclass indeks) dijumlahkan secara rekursif.
+        Objek yang sama hanya dihitung sekali.
+        """
+        seen = set()
+        pending = [value]
+        total = 0
+        while pending:
+            item = pending.pop()
+            if item is None or id(item) in seen:
+                continue
+            seen.add(id(item))
+            if isinstance(item, pd.DataFrame):
+                total += SheetCacheService._array_size(item.index)
+                total += sum(SheetCacheService._array_size(column) for _, column in item.items())
+            elif isinstance(item, (pd.Series, pd.Index)):
+                total += SheetCacheService._array_size(item)
+            elif isinstance(item, np.ndarray):
+                total += item.nbytes
+            elif isinstance(item, (dict, list, tuple, set, frozenset)):
+                total += sys.getsizeof(item)
+                elements = item.items() if isinstance(item, dict) else item
+                if len(item) > SheetCacheService.SIZE_SAMPLE:
+                    # Koleksi besar (mis. peta kunci indeks -> posisi) diperkirakan dari sampel elemen awal
+                    sample = list(islice(elements, SheetCacheService.SIZE_SAMPLE))
+                    total += int(SheetCacheService.estimate_size(sample) * len(item) / len(sample))
+                else:
+                    pending.extend(elements)
+            elif hasattr(item, '__dict__') and not isinstance(item, type):
+                total += sys.getsizeof(item)
+                pending.extend(vars(item).values())
+            else:
+                total += sys.getsizeof(item)
+        return total
+
+    @staticmethod
+    def _array_size(values: Any) -> int:
+        """Ukuran Series/Index; isi kolom object diperkirakan dari sampel (deep penuh terlalu lambat untuk artifact besar)."""
+        if values.dtype != object or len(values) == 0:
+            return int(values.memory_usage(deep=False))
+        step = max(len(values) // SheetCacheService.SIZE_SAMPLE, 1)
+        sample = values[::step]
+        average = sum(sys.getsizeof(value) for value in sample) / len(sample)
+        return int(values.memory_usage(deep=False) + average * len(values))
+
+    def get(self, key: CacheKey) -> Optional[SheetCacheEntry]:
+        """Mengambil entri tanpa memuat ulang (tanpa memperhatikan umur entri)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: CacheKey, df: pd.DataFrame, revision: Optional[str] = None) -> SheetCacheEntry:
+        """Menyimpan DataFrame ke cache. Artifacts lama dipertahankan jika versinya sama."""
+        version = self.compute_version(df)
+        size_bytes = int(df.memory_usage(deep=True).sum()) if not df.empty else 0
+        entry = SheetCacheEntry(
+            dataframe=df, version=version, loaded_at=time.monotonic(),
+            size_bytes=size_bytes, revision=revision
+        )
+
+        with self._lock:
+            header = df.attrs.get('sheet_header')
+            if header is not None:
+                self._headers[key] = header
+
+            self._drop_projections(lambda projected_key: projected_key == key)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.size_bytes
+                # Artifacts dipertahankan untuk versi yang sama, kecuali jika bersama sheet-nya melampaui batas memori
+                if previous.version == version and size_bytes + previous.artifacts.size_bytes <= self.max_bytes:
+                    entry.artifacts = previous.artifacts
+                    entry.size_bytes += previous.artifacts.size_bytes
+                else:
+                    previous.artifacts.dispose()
+            self._bind_artifacts(key, entry)
+
+            if entry.size_bytes > self.max_bytes:
+                logging.warning(f"[CACHE] Sheet {key[1]} ({entry.size_bytes} bytes) melebihi batas memori cache, tidak disimpan.")
+                return entry
+
+            self._entries[key] = entry
+            self._total_bytes += entry.size_bytes
+            self._evict_if_needed(keep=key)
+        return entry
+
+    def get_projection(self, key: CacheKey, indexes: List[int], revision: Optional[str] = None) -> Optional[SheetCacheEntry]:
+        """Hasil pembacaan sebagian kolom yang masih segar untuk sheet dan kolom ini, atau None."""
+        projection_key = (key, tuple(indexes))
+        with self._lock:
+            entry = self._projections.get(projection_key)
+            if entry is None or not self.is_current(entry, revision):
+                return None
+            self._projections.move_to_end(projection_key)
+            self._stats["projection_hits"] += 1
+            return entry
+
+    def put_projection(self, key: CacheKey, indexes: List[int], df: pd.DataFrame, revision: Optional[str] = None) -> SheetCacheEntry:
+        """Menyimpan hasil pembacaan sebagian kolom; entri terlama dibuang jika melebihi MAX_PROJECTIONS."""
+        entry = SheetCacheEntry(
+            dataframe=df, version=self.compute_version(df), loaded_at=time.monotonic(),
+            size_bytes=int(df.memory_usage(deep=True).sum()) if not df.empty else 0, revision=revision
+        )
+        projection_key = (key, tuple(indexes))
+        with self._lock:
+            previous = self._projections.pop(projection_key, None)
+            if previous is not None:
+                self._total_bytes -= previous.size_bytes
+            self._projections[projection_key] = entry
+            self._total_bytes += entry.size_bytes
+            while len(self._projections) > max(self.MAX_PROJECTIONS, 0):
+                self._total_bytes -= self._projections.popitem(last=False)[1].size_bytes
+            self._evict_if_needed()
+        return entry
+
+    def get_header(self, key: CacheKey) -> Optional[Any]:
+        """Mengembalikan SheetHeader terakhir yang diketahui untuk sheet, atau None."""
+        with self._lock:
+            return self._headers.get(key)
+
+    def get_or_load(
+        self,
+        key: CacheKey,
+        loader: Callable[[], pd.DataFrame],
+        force_refresh: bool = False,
+        revision: Optional[str] = None
+    ) -> SheetCacheEntry:
+        """
+        Mengembalikan entri dari cache, atau memanggil 'loader' jika belum ada/kedaluwarsa.
+        Jika 'revision' dari probe sumber diberikan, revisi itu yang menentukan kesegaran:
+        sama berarti entri tetap valid (TTL diperpanjang), berbeda berarti dimuat ulang seketika.
+        Tanpa revisi, entri yang melewati TTL tetapi masih dalam jendela stale dikembalikan
+        langsung sementara pembaruan dijalankan di background thread.
+        """
+        if not force_refresh:
+            entry = self.get(key)
+            if entry is not None and revision is not None and entry.revision is not None:
+                if entry.revision == revision:
+                    entry.loaded_at = time.monotonic()
+                    self._stats["hits"] += 1
+                    return entry
+            elif entry is not None:
+                age = time.monotonic() - entry.loaded_at
+                if age < self.ttl_seconds:
+                    self._stats["hits"] += 1
+                    return entry
+                if age < self.ttl_seconds + self.stale_ttl_seconds:
+                    self._stats["stale_hits"] += 1
+                    self._refresh_in_background(key, loader, revision)
+                    return entry
+
+        with self._get_key_lock(key):
+            # Cek ulang: thread lain mungkin sudah memuat data selama kita menunggu lock.
+            if not force_refresh:
+                entry = self.get(key)
+                if entry is not None and self.is_current(entry, revision):
+                    self._stats["hits"] += 1
+                    return entry
+
+            self._stats["misses"] += 1
+            return self.put(key, loader(), revision=revision)
+
+    async def get_or_load_async(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Awaitable[pd.DataFrame]],
+        force_refresh: bool = False,
+        revision: Optional[str] = None
+    ) -> SheetCacheEntry:
+        """
+        Varian async dari get_or_load untuk data source async. Aturan kesegaran sama,
+        refresh stale-while-revalidate dijalankan sebagai task di event loop.
+        """
+        if not force_refresh:
+            entry = self.get(key)
+            if entry is not None and revision is not None and entry.revision is not None:
+                if entry.revision == revision:
+                    entry.loaded_at = time.monotonic()
+                    self._stats["hits"] += 1
+                    return entry
+            elif entry is not None:
+                age = time.monotonic() - entry.loaded_at
+                if age < self.ttl_seconds:
+                    self._stats["hits"] += 1
+                    return entry
+                if age < self.ttl_seconds + self.stale_ttl_seconds:
+                    self._stats["stale_hits"] += 1
+                    self._refresh_in_background_async(key, loader, revision)
+                    return entry
+
+        async with self._get_async_key_lock(key):
+            if not force_refresh:
+                entry = self.get(key)
+                if entry is not None and self.is_current(entry, revision):
+                    self._stats["hits"] += 1
+                    return entry
+
+            self._stats["misses"] += 1
+            df = await loader()
+            # Hash versi dihitung di worker thread agar tidak memblokir event loop
+            return await asyncio.to_thread(self.put, key, df, revision)
+
+    def current_sheet_names(self, spreadsheet_id: str, revision: Optional[str] = None) -> List[str]:
+        """Nama sheet dari spreadsheet ini yang entrinya masih segar (tidak kosong) di cache."""
+        with self._lock:
+            return [
+                key[1] for key, entry in self._entries.items()
+                if key[0] == spreadsheet_id and not entry.dataframe.empty and self.is_current(entry, revision)
+            ]
+
+    def invalidate(self, spreadsheet_id: Optional[str] = None, sheet_name: Optional[str] = None) -> int:
+        """
+        Menghapus entri dari cache. Tanpa argumen, seluruh cache dibersihkan.
+        Mengembalikan jumlah entri yang dihapus.
+        """
+        with self._lock:
+            targets = [
+                key for key in self._entries
+                if (spreadsheet_id is None or key[0] == spreadsheet_id)
+                and (sheet_name is None or key[1] == sheet_name)
+            ]
+            for key in targets:
+                removed = self._entries.pop(key)
+                self._total_bytes -= removed.size_bytes
+                removed.artifacts.dispose()
+            self._drop_projections(
+                lambda key: (spreadsheet_id is None or key[0] == spreadsheet_id)
+                and (sheet_name is None or key[1] == sheet_name)
+            )
+        if targets:
+            logging.info(f"[CACHE] {len(targets)} entri sheet diinvalidasi.")
+        return len(targets)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistik cache untuk monitoring."""
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "projections": len(self._projections),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def is_current(self, entry: SheetCacheEntry, revision: Optional[str] = None) -> bool:
+        """Menentukan apakah entri masih segar berdasarkan revisi sumber, atau TTL jika revisi tidak ada."""
+        if revision is not None and entry.revision is not None:
+            return entry.revision == revision
+        return time.monotonic() - entry.loaded_at < self.ttl_seconds
+
+    def _drop_projections(self, matches: Callable[[CacheKey], bool]):
+        for projection_key in [k for k in self._projections if matches(k[0])]:
+            self._total_bytes -= self._projections.pop(projection_key).size_bytes
+
+    def _bind_artifacts(self, key: CacheKey, entry: SheetCacheEntry):
+        """Menghubungkan artifacts entri ke akuntansi memori cache (artifact baru menambah ukuran entri)."""
+        entry.artifacts.measure = self.estimate_size
+        entry.artifacts.on_added = lambda size: self._add_artifact_bytes(key, entry, size)
+
+    def _add_artifact_bytes(self, key: CacheKey, entry: SheetCacheEntry, size: int):
+        with self._lock:
+            entry.size_bytes += size
+            # Entri yang sudah diganti/dibuang tidak lagi dihitung dalam total cache
+            if self._entries.get(key) is not entry:
+                return
+            self._total_bytes += size
+            self._evict_if_needed(keep=key)
+
+    def _get_key_lock(self, key: CacheKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _evict_if_needed(self, keep: Optional[CacheKey] = None):
+        """
+        Eviksi sampai total ukuran kembali di bawah batas memori: hasil pembacaan sebagian kolom
+        terlama lebih dulu, lalu entri sheet secara LRU. Entri 'keep' (yang sedang dipakai) dilewati.
+        """
+        while self._total_bytes > self.max_bytes and self._projections:
+            self._total_bytes -= self._projections.popitem(last=False)[1].size_bytes
+        for evicted_key in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if evicted_key == keep:
+                continue
+            evicted = self._entries.pop(evicted_key)
+            self._total_bytes -= evicted.size_bytes
+            evicted.artifacts.dispose()
+            self._stats["evictions"] += 1
+            logging.info(f"[CACHE] Evict sheet '{evicted_key[1]}' ({evicted.size_bytes} bytes).")
+
+    def _refresh_in_background(self, key: CacheKey, loader: Callable[[], pd.DataFrame], revision: Optional[str] = None):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._get_key_lock(key):
+                    # Revisi hasil probe ikut disimpan agar entri hasil refresh tetap divalidasi lewat probe
+                    self.put(key, loader(), revision=revision)
+            except Exception as e:
+                logging.warning(f"[CACHE] Refresh background sheet '{key[1]}' gagal, data lama tetap dipakai: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _get_async_key_lock(self, key: CacheKey) -> asyncio.Lock:
+        with self._lock:
+            return self._async_key_locks.setdefault(key, asyncio.Lock())
+
+    def _refresh_in_background_async(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Awaitable[pd.DataFrame]],
+        revision: Optional[str] = None
+    ):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                async with self._get_async_key_lock(key):
+                    df = await loader()
+                    await asyncio.to_thread(self.put, key, df, revision)
+            except Exception as e:
+                logging.warning(f"[CACHE] Refresh background sheet '{key[1]}' gagal, data lama tetap dipakai: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        asyncio.get_running_loop().create_task(refresh())
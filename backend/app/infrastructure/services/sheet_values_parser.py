@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+@dataclass
+class SheetHeader:
+    """
+    Posisi dan isi baris header sebuah sheet. Disimpan di DataFrame hasil parsing
+    (df.attrs['sheet_header']) agar pembacaan berikutnya bisa meminta kolom tertentu saja.
+    'cells' adalah isi header yang sudah dirapikan spasinya, sebelum dibuat unik.
+    """
+    row_index: int
+    cells: List[str]
+    columns: List[str]
+
+class SheetValuesParser:
+    """
+    Mengubah nilai mentah dari Google Sheets API (list of rows) menjadi DataFrame.
+    Dipakai bersama oleh data source sinkron maupun async agar hasilnya identik.
+    """
+    COL_NO_ASET = 'NO ASSET'
+    COL_KONDISI = 'KONDISI'
+    MAX_COLUMNS = 26  # Rentang A:Z
+
+    def to_dataframe(self, values: List[List[str]]) -> pd.DataFrame:
+        """Mengubah nilai mentah sheet menjadi DataFrame dengan header yang terdeteksi."""
+        if not values:
+            return pd.DataFrame()
+
+        # 1. Cari baris Header
+        header, header_row_index = self.find_header_row(values)
+        if header_row_index == -1:
+            return pd.DataFrame()
+
+        # 2. Proses Nama Kolom
+        header_cells = self.clean_header_cells(header)
+        unique_header = self.make_unique_columns(header_cells)
+        num_expected_cols = len(unique_header)
+
+        # 3. Normalisasi baris data secara vektor: pandas membangun matriks object langsung
+        #    dari baris ragged (sel yang kurang diisi None), lalu baris kosong dibuang
+        #    dan lebar dipotong/di-pad sesuai jumlah kolom header.
+        data_rows = values[header_row_index + 1:]
+        if not data_rows:
+            return pd.DataFrame()
+
+        matrix = pd.DataFrame(data_rows).to_numpy(dtype=object)
+        matrix = matrix[self._non_blank_rows(matrix)]
+        if not len(matrix):
+            return pd.DataFrame()
+
+        if matrix.shape[1] >= num_expected_cols:
+            matrix = matrix[:, :num_expected_cols]
+        else:
+            padding = np.full((len(matrix), num_expected_cols - matrix.shape[1]), None, dtype=object)
+            matrix = np.hstack([matrix, padding])
+
+        df = pd.DataFrame(matrix, columns=unique_header)
+        df.attrs['sheet_header'] = SheetHeader(header_row_index, header_cells, unique_header)
+        return df
+
+    def columns_to_dataframe(self, column_values: List[List[List[str]]], header: SheetHeader, indexes: List[int]) -> pd.DataFrame:
+        """
+        Menyusun DataFrame dari respons batchGet per kolom (rentang seperti 'C:C').
+        Baris yang kosong di semua kolom yang diminta dibuang, sama seperti to_dataframe.
+        """
+        columns = [
+            [row[0] if row else '' for row in values[header.row_index + 1:]]
+            for values in column_values
+        ]
+        num_rows = max((len(cells) for cells in columns), default=0)
+        if num_rows == 0:
+            return pd.DataFrame()
+
+        # Sel setelah nilai terakhir sebuah kolom tidak dikirim API, diisi None seperti baris ragged
+        matrix = np.full((num_rows, len(columns)), None, dtype=object)
+        for col_idx, cells in enumerate(columns):
+            matrix[:len(cells), col_idx] = cells
+        matrix = matrix[self._non_blank_rows(matrix)]
+        if not len(matrix):
+            return pd.DataFrame()
+
+        df = pd.DataFrame(matrix, columns=[header.columns[i] for i in indexes])
+        df.attrs['sheet_header'] = header
+        return df
+
+    def resolve_columns(self, header_columns: List[str], requested: List[str]) -> List[int]:
+        """
+        Menerjemahkan nama kolom yang diminta menjadi indeks kolom header (urutan permintaan).
+        Pencocokan tidak peka huruf besar/spasi; jika tidak ada yang sama persis,
+        dipakai kolom pertama yang mengandung nama tersebut (mis. 'NILAI ASET' -> 'NILAI ASET (Rp)').
+        Nama yang tidak ditemukan diabaikan.
+        """
+        normalized = [col.upper() for col in header_columns]
+        indexes = []
+        for name in requested:
+            target = ' '.join(str(name).strip().split()).upper()
+            if not target:
+                continue
+            if target in normalized:
+                idx = normalized.index(target)
+            else:
+                idx = next((i for i, col in enumerate(normalized) if target in col), -1)
+            if idx != -1 and idx not in indexes:
+                indexes.append(idx)
+        return indexes
+
+    def project(self, df: pd.DataFrame, requested: List[str]) -> pd.DataFrame:
+        """Mengambil salinan DataFrame yang hanya berisi kolom yang diminta."""
+        if df.empty:
+            return df.copy()
+        indexes = self.resolve_columns([str(col) for col in df.columns], requested)
+        return df.iloc[:, indexes].copy()
+
+    @staticmethod
+    def column_letter(index: int) -> str:
+        """Indeks kolom (0-based) ke huruf A1, mis. 0 -> 'A', 27 -> 'AB'."""
+        letters = ''
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            letters = chr(65 + remainder) + letters
+        return letters
+
+    @staticmethod
+    def clean_header_cells(header: List[Any]) -> List[str]:
+        """Merapikan spasi pada isi baris header."""
+        return [' '.join(str(col).strip().split()) for col in header]
+
+    def _non_blank_rows(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Mask baris yang memiliki minimal satu sel berisi (bukan kosong/spasi saja).
+        Nilai dari Sheets API selalu string, sehingga cukup cek truthiness lalu isspace.
+        Diperiksa per kolom hanya untuk baris yang belum terbukti berisi, sehingga
+        biasanya cukup kolom pertama yang dipindai.
+        """
+        keep = np.zeros(len(matrix), dtype=bool)
+        pending = np.arange(len(matrix))
+        for col_idx in range(matrix.shape[1]):
+            if not len(pending):
+                break
+            cells = matrix[pending, col_idx]
+            filled = cells.astype(bool)
+            if filled.any():
+                whitespace_only = pd.Series(cells[filled], dtype=object).str.isspace().fillna(False).to_numpy(dtype=bool)
+                filled[np.flatnonzero(filled)[whitespace_only]] = False
+            keep[pending[filled]] = True
+            pending = pending[~filled]
+        return keep
+
+    def grid_to_values(self, sheet: Dict[str, Any]) -> Tuple[str, List[List[str]]]:
+        """
+        Mengubah satu sheet dari respons spreadsheets.get (includeGridData) menjadi
+        (judul, nilai) dengan bentuk yang sama seperti respons values.get.
+        """
+        title = sheet.get('properties', {}).get('title', '')
+        values = []
+        for grid in sheet.get('data', [])[:1]:
+            for row_data in grid.get('rowData', []):
+                # Samakan dengan values.get: batasi kolom A:Z dan buang sel kosong di ujung baris
+                row = [cell.get('formattedValue', '') for cell in row_data.get('values', [])[:self.MAX_COLUMNS]]
+                while row and row[-1] == '':
+                    row.pop()
+                values.append(row)
+        return title, values
+
+    def find_header_row(self, values: List[List[str]]) -> Tuple[List[str], int]:
+        """Mencari baris header berdasarkan kolom kunci (NO ASSET & KONDISI)."""
+        key_header_columns = {self.COL_NO_ASET, self.COL_KONDISI}
+        for i, row in enumerate(values):
+            row_content = {str(cell).strip().upper() for cell in row if str(cell).strip()}
+            if key_header_columns.issubset(row_content):
+                return row, i
+        return [], -1
+
+    def make_unique_columns(self, columns: List[str]) -> List[str]:
+        """Mencegah duplikasi nama kolom agar tidak error di Pandas."""
+        seen = {}
+        new_columns = []
+        for col in columns:
+            if not col:
+                col = "UNTITLED_COLUMN"
+            original_col = col
+            count = seen.get(original_col, 0)
+            if count > 0:
+                col = f"{original_col}_{count}"
+            seen[original_col] = count + 1
+            new_columns.append(col)
+        return new_columns
@@ -12,6 +12,7 @@ from app.dependencies import AppContainer, get_user_repository
 from app.presentation.schemas import AnalysisOptions, UserRole
 from app.infrastructure.database.database import SessionLocal
 from app.presentation.auth import get_current_user_from_token
+from app.infrastructure.services.columnar_encoder import ColumnarEncoder
 
 class McpServer:
     """
@@ -96,6 +97,24 @@ class McpServer:
             
         return response
 
+    def encode_response(self, response: dict) -> str:
+        """
+        Serialisasi respons JSON-RPC untuk dikirim sebagai frame teks WebSocket. orjson dipakai agar
+        hasil kolumnar (array NumPy) ditulis langsung tanpa dikonversi ke list Python lebih dulu.
+        """
+        return ColumnarEncoder.dumps(response, default=self._json_default).decode('utf-8')
+
+    @staticmethod
+    def _json_default(o):
+        """JSON Serializer untuk tipe data kompleks."""
+        if is_dataclass(o): 
+            return asdict(o)
+        if isinstance(o, datetime): 
+            return o.isoformat()
+        if isinstance(o, Enum): 
+            return o.value
+        return str(o)
+
     def _create_error_structure(self, code: int, message: str, data: dict = None) -> dict:
         error_obj = {"code": code, "message": message}
         if data: 
@@ -110,6 +129,12 @@ class McpServer:
         Definisi skema input untuk LLM. 
         PENTING: Deskripsi di sini menentukan seberapa akurat LLM memanggil tool.
         """
+        format_schema = {
+            "type": "string",
+            "enum": ColumnarEncoder.FORMATS,
+            "default": ColumnarEncoder.FORMAT_RECORDS,
+            "description": "Bentuk hasil baris. 'records' (list of dict) atau 'columnar' ({columns, data} per kolom, lebih ringkas untuk hasil besar)."
+        }
         return {
             "get_dashboard_data": {
                 "properties": {
@@ -132,7 +157,17 @@ class McpServer:
                     "summarize": {"type": "boolean"},
                     "insight": {"type": "boolean"},
                     "check_duplicates": {"type": "boolean"},
-                    "financial_analysis": {"type": "boolean"}
+                    "financial_analysis": {"type": "boolean"},
+                    "force_refresh": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Jalankan analisis penuh walaupun hasil untuk data dan opsi yang sama sudah tersimpan."
+                    },
+                    "incremental": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Proses hanya aset yang berubah sejak analisis tersimpan terakhir untuk sheet yang sama."
+                    }
                 }
             },
             "create_user": {
@@ -173,8 +208,8 @@ class McpServer:
                 "properties": {
                     "task": {
                         "type": "string", 
-                        "description": "JENIS TUGAS. 'filter' (cari list), 'get_top_per_group' (mencari item terbanyak di setiap kategori), 'breakdown' (tabel silang), 'get_distribution_analysis' (statistik %), 'get_top_values' (ranking).",
-                        "enum": ["filter", "breakdown", "get_distribution_analysis", "get_top_values", "get_top_per_group"]
+                        "description": "JENIS TUGAS. 'filter' (cari list), 'get_top_per_group' (mencari item terbanyak di setiap kategori), 'breakdown' (tabel silang), 'get_distribution_analysis' (statistik %), 'get_top_values' (ranking), 'get_financial_summary' (total nilai aset, aset termahal & termurah per area).",
+                        "enum": ["filter", "breakdown", "get_distribution_analysis", "get_top_values", "get_top_per_group", "get_financial_summary"]
                     },
                     "no_asset": {
                         "type": "string",
@@ -251,11 +286,42 @@ class McpServer:
                         "default": "ascending"
                     },
                     "limit": {
-                        "type": "integer", 
+                        "type": "integer",
                         "default": 10
-                    }
+                    },
+                    "explain": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Jika true, sertakan rencana filter (urutan, strategi, estimasi, waktu per langkah) di samping hasil."
+                    },
+                    "page_size": {
+                        "type": "integer",
+                        "description": "Opsional. Aktifkan paginasi hasil baris (task filter); hasil menjadi {data, page}."
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor 'page.next_cursor' dari halaman sebelumnya untuk mengambil halaman berikutnya."
+                    },
+                    "format": format_schema
                 }
             },
+            "query_assets_batch": {
+                "properties": {
+                    "source": {
+                        "type": "string",
+                        "enum": ["master", "siklus"],
+                        "default": "master",
+                        "description": "Sumber data untuk semua query di batch ini."
+                    },
+                    "sheet_name": {"type": "string", "description": "Nama sheet untuk semua query (default sesuai sumber)."},
+                    "queries": {
+                        "type": "array",
+                        "description": "Daftar query. Setiap item memakai parameter yang sama dengan tool query_assets (task, filter, calculation, group_by_field, dst.).",
+                        "items": {"type": "object"}
+                    }
+                },
+                "required": ["queries"]
+            },
             "query_resource": {
                 "properties": {
                     "resource_name": {
@@ -265,7 +331,8 @@ class McpServer:
                     "no_asset": {"type": "string", "description": "Nomor unik aset."},
                     "nama_aset": {"type": "string", "description": "Nama perangkat (SERVER, PC, dll)."},
                     "area": {"type": "string"},
-                    "kondisi": {"type": "string"}
+                    "kondisi": {"type": "string"},
+                    "format": format_schema
                 },
                 "required": ["resource_name"]
             },
@@ -278,7 +345,8 @@ class McpServer:
                     "area": {
                         "type": "string",
                         "description": "Filter area. Contoh: 'COASTAL', 'DURI', 'MINAS', atau 'Semua Area'."
-                    }
+                    },
+                    "format": format_schema
                 }
             },
             "get_master_data": {
@@ -289,7 +357,21 @@ class McpServer:
                         "default": "master",
                         "description": "Pilih sumber data yang ingin diambil."
                     },
-                    "sheet_name": {"type": "string", "description": "Nama sheet spesifik (Master default: MASTER-SHEET)."}
+                    "sheet_name": {"type": "string", "description": "Nama sheet spesifik (Master default: MASTER-SHEET)."},
+                    "columns": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Opsional. Hanya ambil kolom ini (mis. ['NO ASSET', 'NAMA ASET', 'AREA'])."
+                    },
+                    "page_size": {
+                        "type": "integer",
+                        "description": "Opsional. Jumlah baris per halaman; hasil menjadi {data, page} dengan total_count dan next_cursor."
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor 'page.next_cursor' dari halaman sebelumnya."
+                    },
+                    "format": format_schema
                 }
             },
             "get_all_users": {
@@ -319,7 +401,17 @@ class McpServer:
             if tool_name not in schemas: 
                 raise ValueError(f"Tool '{tool_name}' unknown.")
             
-            if tool_name == "query_assets" and arguments.get("task") == "breakdown":
+            if tool_name == "query_assets":
+                self._apply_query_defaults(arguments)
+
+            if tool_name == "query_assets_batch" and isinstance(arguments.get("queries"), list):
+                for spec in arguments["queries"]:
+                    if isinstance(spec, dict):
+                        self._apply_query_defaults(spec)
+
+    @staticmethod
+    def _apply_query_defaults(arguments: dict):
+            if arguments.get("task") == "breakdown":
                 if not arguments.get("group_by_field"):
                     if arguments.get("kode_lokasi_sap"):
                         arguments["group_by_field"] = "KODE LOKASI SAP"
@@ -348,6 +440,7 @@ class McpServer:
         descriptions = {
             "trigger_analysis": "HANYA digunakan untuk merefresh atau membuat ulang Dashboard Analisis utama secara keseluruhan. MENDUKUNG pemilihan sumber 'master' atau 'siklus'. Tool ini tidak memberikan teks jawaban langsung ke chat.",
             "query_assets": "Tool UTAMA untuk mencari, memfilter, menghitung jumlah (count), menghitung total nilai uang (sum_value), atau membuat statistik. PENTING: Gunakan ini untuk pertanyaan 'Berapa jumlah' agar hasil akurat 100%. Untuk Dumai gunakan area 'COASTAL', untuk rusak gunakan 'Rusak Berat, Rusak Ringan'.",
+            "query_assets_batch": "Menjalankan beberapa query_assets sekaligus pada satu sumber/sheet (mis. jumlah per area, top manufaktur, dan total nilai aset rusak) dalam satu panggilan. Gunakan ini jika satu pertanyaan membutuhkan beberapa hitungan atas data yang sama.",
             "query_resource": "Mencari data spesifik (filter by no_asset, nama_aset, area, atau kondisi) dari file hasil analisis (resource JSON) yang sudah disimpan sebelumnya.",
             "save_analysis": "Menyimpan hasil analisis terbaru yang ada di pratinjau ke dalam database riwayat.",
             "get_dashboard_data": "Mengambil data ringkasan cepat (summary) untuk tampilan dashboard.",
@@ -400,6 +493,7 @@ class McpServer:
             "update_user_email": "update_user_email", 
             "update_user_role": "update_user_role",      
             "query_assets": "query_assets",
+            "query_assets_batch": "query_assets_batch",
             "query_resource": "query_resource",
             "get_stats_data": "get_stats_data",
         }
@@ -444,21 +538,25 @@ class McpServer:
 
         try:
             use_case = self.container.get_use_case(use_case_name, db_session)
-            result = use_case.execute(**use_case_args)
+            # Use case berbasis Google Sheets punya varian async agar event loop tidak terblokir
+            if hasattr(use_case, 'execute_async'):
+                result = await use_case.execute_async(**use_case_args)
+            else:
+                result = use_case.execute(**use_case_args)
             
-            # JSON Serializer untuk tipe data kompleks
-            def json_converter(o):
-                if is_dataclass(o): 
-                    return asdict(o)
-                if isinstance(o, datetime): 
-                    return o.isoformat()
-                if isinstance(o, Enum): 
-                    return o.value
-                return str(o)
-
-            result_str = json.dumps(result, default=json_converter)
+            batch_specs = arguments.get("queries") if tool_name == "query_assets_batch" else None
+            columnar = ColumnarEncoder.wants_columnar(arguments.get("format")) or any(
+                isinstance(spec, dict) and ColumnarEncoder.wants_columnar(spec.get("format"))
+                for spec in batch_specs or []
+            )
+            if columnar:
+                # Hasil kolumnar berisi array NumPy; dibiarkan apa adanya dan diserialisasi sekali
+                # oleh orjson bersama seluruh respons di encode_response
+                content = result
+            else:
+                content = json.loads(json.dumps(result, default=self._json_default))
             return {
-                "content": json.loads(result_str), 
+                "content": content, 
                 "isError": False
             }
             
@@ -14,6 +14,11 @@ class AnalysisOptions(BaseModel):
     insight: bool = True
     check_duplicates: bool = False
     financial_analysis: bool = False
+    # Abaikan hasil analisis tersimpan (cache) dan jalankan analisis penuh
+    force_refresh: bool = False
+    # Proses hanya baris yang berubah sejak analisis tersimpan terakhir untuk sheet yang sama.
+    # Hanya analisis dengan opsi ini yang menyimpan baseline untuk analisis inkremental berikutnya.
+    incremental: bool = False
 
     class Config:
         extra = "allow"
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark INSIGHT UTAMA: membandingkan TriggerAnalysisUseCase._calculate_asset_condition_summary
+(klasifikasi KONDISI sekali + tabel silang dengan AREA) dengan versi groupby + tujuh lambda
+str.contains sebelumnya, sekaligus memastikan teks hasilnya identik.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_condition_summary.py --rows 100000
+"""
+import os
+import sys
+import argparse
+import timeit
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_sheet_ingest import build_values
+from app.domain.use_cases.analysis.trigger_analysis import TriggerAnalysisUseCase
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
+
+def legacy_condition_summary(df: pd.DataFrame) -> str:
+    """Implementasi groupby + lambda per kategori sebelum versi vektor (referensi)."""
+    if 'AREA' not in df.columns or 'KONDISI' not in df.columns:
+        return ""
+    text_parts = ["INSIGHT UTAMA"]
+    df_copy = df.copy()
+    df_copy['KONDISI'] = df_copy['KONDISI'].astype(str)
+    summary = df_copy.groupby('AREA').agg(
+        total_assets=('AREA', 'size'),
+        baik=('KONDISI', lambda x: x.str.contains('Baik', case=False, na=False).sum()),
+        digunakan=('KONDISI', lambda x: x.str.contains('Digunakan', case=False, na=False).sum()),
+        cadangan=('KONDISI', lambda x: x.str.contains('Cadangan', case=False, na=False).sum()),
+        rusak_ringan=('KONDISI', lambda x: x.str.contains('Rusak Ringan', case=False, na=False).sum()),
+        rusak_berat=('KONDISI', lambda x: x.str.contains('Rusak Berat', case=False, na=False).sum()),
+        tidak_ditemukan=('KONDISI', lambda x: x.str.contains('Tidak Ditemukan', case=False, na=False).sum()),
+        penghapusan=('KONDISI', lambda x: x.str.contains('Penghapusan', case=False, na=False).sum())
+    ).reset_index()
+    for _, row in summary.iterrows():
+        text_parts.append(
+            f"\nArea {row['AREA']}:\n"
+            f"- Total Aset: {row['total_assets']}\n"
+            f"- Kondisi Baik: {int(row['baik'])}\n"
+            f"- Digunakan: {int(row['digunakan'])}\n"
+            f"- Cadangan: {int(row['cadangan'])}\n"
+            f"- Rusak Ringan: {int(row['rusak_ringan'])}\n"
+            f"- Rusak Berat: {int(row['rusak_berat'])}\n"
+            f"- Tidak Ditemukan: {int(row['tidak_ditemukan'])}\n"
+            f"- Penghapusan: {int(row['penghapusan'])}"
+        )
+    return "\n".join(text_parts)
+
+def with_edge_cases(df: pd.DataFrame) -> pd.DataFrame:
+    """Menambahkan KONDISI gabungan/kosong dan AREA kosong agar kategori tumpang tindih ikut diuji."""
+    df = df.copy()
+    step = max(len(df) // 50, 1)
+    df.loc[df.index[::step], 'KONDISI'] = 'Baik - Digunakan (Cadangan)'
+    df.loc[df.index[1::step], 'KONDISI'] = None
+    df.loc[df.index[2::step], 'KONDISI'] = 'rusak berat, usul PENGHAPUSAN'
+    df.loc[df.index[3::step], 'AREA'] = None
+    return df
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, default=100000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    use_case = TriggerAnalysisUseCase(None, None, None, None)
+    df = with_edge_cases(SheetValuesParser().to_dataframe(build_values(args.rows)))
+
+    for frame in (df, df.head(0)):
+        expected = legacy_condition_summary(frame)
+        actual = use_case._calculate_asset_condition_summary(frame)
+        assert actual == expected, f"Output berbeda:\n{actual}\n---\n{expected}"
+    print(f"Output identik: {len(df)} baris, {df['AREA'].nunique()} area")
+
+    for label, func in [
+        ("groupby+lambda (lama)", legacy_condition_summary),
+        ("klasifikasi+crosstab (baru)", use_case._calculate_asset_condition_summary),
+    ]:
+        timer = timeit.Timer(lambda: func(df))
+        best = min(timer.repeat(repeat=args.repeat, number=1))
+        print(f"{label:<28}: {best * 1000:8.1f} ms (terbaik dari {args.repeat})")
+
+if __name__ == "__main__":
+    main()
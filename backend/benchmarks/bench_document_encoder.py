@@ -0,0 +1,42 @@
+"""
+Micro-benchmark dokumen input ringkasan eksekutif: membandingkan df.to_string() (encoder 'text')
+dengan encoder ringkas CSV/TSV (kolom relevan, kamus nilai, agregat di atas anggaran token)
+dari sisi waktu encoding, jumlah karakter, dan estimasi token.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_document_encoder.py --rows 1000 10000 100000
+"""
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_sheet_ingest import build_values
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+from app.infrastructure.services.document_encoder import create_document_encoder
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, nargs='+', default=[1000, 10000, 100000])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    normalizer = AssetFrameNormalizer()
+    encoders = [create_document_encoder(name, normalizer) for name in ('text', 'csv', 'tsv')]
+    print(f"{'baris':>8} {'encoder':<8} {'mode':<11} {'waktu':>10} {'karakter':>12} {'~token':>10}")
+    for rows in args.rows:
+        frame = normalizer.normalize(SheetValuesParser().to_dataframe(build_values(rows)))
+        for encoder in encoders:
+            document = encoder.encode(frame)
+            best = min(timeit.Timer(lambda: encoder.encode(frame)).repeat(repeat=args.repeat, number=1))
+            print(
+                f"{len(frame):>8} {encoder.name:<8} {document.mode:<11} {best * 1000:8.1f}ms "
+                f"{len(document.text):>12,} {document.token_estimate:>10,}"
+            )
+
+if __name__ == "__main__":
+    main()
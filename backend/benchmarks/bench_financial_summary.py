@@ -0,0 +1,79 @@
+"""
+Micro-benchmark ANALISA KEUANGAN ASET: membandingkan FinancialRollupService.build (sum/idxmax/idxmin
+groupby atas seluruh frame) dengan loop per grup AREA versi sebelumnya, sekaligus memastikan
+hasil dan teks laporannya identik.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_financial_summary.py --rows 100000
+"""
+import os
+import sys
+import json
+import argparse
+import timeit
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_sheet_ingest import build_values
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+from app.infrastructure.services.financial_rollup_service import FinancialRollupService
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
+
+def legacy_financial_summary(normalizer: AssetFrameNormalizer, df: pd.DataFrame):
+    """Implementasi loop groupby per AREA sebelum versi vektor (referensi)."""
+    if 'AREA' not in df.columns or 'NILAI ASET' not in df.columns or 'NAMA ASET' not in df.columns:
+        return []
+    df_copy = normalizer.ensure(df).rename(columns={normalizer.COL_NILAI_NUMERIC: 'NILAI_NUMERIC'})
+    summary = []
+    for area, group in df_copy.groupby(normalizer.category_column('AREA'), observed=True):
+        if group.empty or pd.isna(area):
+            continue
+        total_value = group['NILAI_NUMERIC'].sum()
+        max_row = group.loc[group['NILAI_NUMERIC'].idxmax()]
+        asset_termahal = {"nama": max_row.get('NAMA ASET', 'N/A'), "nilai": max_row['NILAI_NUMERIC']}
+        non_zero_assets = group[group['NILAI_NUMERIC'] > 0]
+        if not non_zero_assets.empty:
+            min_row = non_zero_assets.loc[non_zero_assets['NILAI_NUMERIC'].idxmin()]
+            asset_termurah = {"nama": min_row.get('NAMA ASET', 'N/A'), "nilai": min_row['NILAI_NUMERIC']}
+        else:
+            asset_termurah = {"nama": "N/A", "nilai": 0}
+        summary.append({"area": area, "total_value": total_value, "asset_termahal": asset_termahal, "asset_termurah": asset_termurah})
+    return summary
+
+def with_edge_cases(df: pd.DataFrame) -> pd.DataFrame:
+    """Nilai kosong/nol, nama aset kosong, AREA kosong, dan satu AREA yang seluruh nilainya nol."""
+    df = df.copy()
+    step = max(len(df) // 50, 1)
+    df.loc[df.index[::step], 'NILAI ASET'] = '-'
+    df.loc[df.index[1::step], 'NAMA ASET'] = None
+    df.loc[df.index[2::step], 'AREA'] = None
+    df.loc[df.index[3:6], 'AREA'] = 'AREA NOL'
+    df.loc[df.index[3:6], 'NILAI ASET'] = 'Rp 0'
+    return df
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, default=100000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    normalizer = AssetFrameNormalizer()
+    service = FinancialRollupService(normalizer)
+    frame = normalizer.normalize(with_edge_cases(SheetValuesParser().to_dataframe(build_values(args.rows))))
+
+    dump = lambda summary: json.dumps(summary, default=lambda value: value.item() if hasattr(value, 'item') else str(value))
+    expected, actual = legacy_financial_summary(normalizer, frame), service.build(frame)
+    assert dump(actual) == dump(expected), f"Output berbeda:\n{dump(actual)}\n---\n{dump(expected)}"
+    print(f"Output identik: {len(frame)} baris, {len(actual)} area")
+
+    for label, func in [
+        ("loop per grup (lama)", lambda: legacy_financial_summary(normalizer, frame)),
+        ("groupby vektor (baru)", lambda: service.build(frame)),
+    ]:
+        best = min(timeit.Timer(func).repeat(repeat=args.repeat, number=1))
+        print(f"{label:<22}: {best * 1000:8.1f} ms (terbaik dari {args.repeat})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Micro-benchmark analisis inkremental: sebagian kecil baris diubah/ditambah/dihapus dari baseline,
+lalu agregat yang diperbarui dari selisih (jumlah kondisi per AREA, rollup keuangan, laporan
+duplikasi) dibandingkan dengan hitungan penuh atas frame baru, dari sisi hasil dan waktu.
+Ukuran digest perubahan dibandingkan dengan dokumen data penuh untuk prompt ringkasan.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_incremental_analysis.py --rows 100000 --change 0.01
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+import timeit
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_sheet_ingest import build_values
+from app.domain.use_cases.analysis.trigger_analysis import TriggerAnalysisUseCase
+from app.infrastructure.services.asset_frame_normalizer import AssetFrameNormalizer
+from app.infrastructure.services.document_analyzer import DocumentAnalyzer
+from app.infrastructure.services.document_encoder import create_document_encoder
+from app.infrastructure.services.incremental_analysis_service import IncrementalAnalysisService
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
+
+def mutate(df: pd.DataFrame, fraction: float, seed: int = 7) -> pd.DataFrame:
+    """Mengubah KONDISI/NILAI/AREA sebagian baris, menghapus beberapa baris, dan menambah baris baru (termasuk NO ASSET ganda)."""
+    rng = random.Random(seed)
+    df = df.copy()
+    count = max(int(len(df) * fraction), 4)
+    positions = rng.sample(range(len(df)), count * 3)
+    changed, removed = positions[:count * 2], positions[count * 2:]
+    for i, pos in enumerate(changed):
+        col = ['KONDISI', 'NILAI ASET', 'AREA', 'KETERANGAN'][i % 4]
+        df.iat[pos, df.columns.get_loc(col)] = {
+            'KONDISI': rng.choice(['Rusak Berat', 'Penghapusan', 'Baik']),
+            'NILAI ASET': f"{rng.randint(1, 20)}.{rng.randint(100, 999)}.000",
+            'AREA': rng.choice(['DURI', 'MINAS', 'AREA BARU']),
+            'KETERANGAN': 'Perlu cek ulang',
+        }[col]
+    added = df.iloc[rng.sample(range(len(df)), count)].copy()
+    added['NO ASSET'] = [str(900000 + i) if i % 3 else df['NO ASSET'].iat[i] for i in range(len(added))]
+    added['NILAI ASET'] = '99.999.999'
+    df = pd.concat([df.drop(df.index[removed]), added], ignore_index=True)
+    df['NO'] = [str(i + 1) for i in range(len(df))]
+    return df
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, default=100000)
+    arg_parser.add_argument("--change", type=float, default=0.01)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    normalizer = AssetFrameNormalizer()
+    use_case = TriggerAnalysisUseCase(None, None, None, None)
+    service = IncrementalAnalysisService(normalizer, base_dir=tempfile.mkdtemp())
+    raw = SheetValuesParser().to_dataframe(build_values(args.rows))
+    old_frame = normalizer.normalize(raw)
+    new_frame = normalizer.normalize(mutate(raw, args.change))
+    old_df, new_df = normalizer.display_frame(old_frame), normalizer.display_frame(new_frame)
+
+    baseline = service.build_baseline(
+        'siklus', 'BENCH', 'v1', old_frame, service.index_rows(old_frame),
+        use_case._condition_counts(old_df), use_case.financial_rollup.build(old_frame),
+        service.duplicate_keys(old_df), "RINGKASAN EKSEKUTIF\n1. ..."
+    )
+
+    # generate_duplicate_report hanya memakai COL_NO_ASET, tanpa model LLM
+    duplicate_report_host = DocumentAnalyzer.__new__(DocumentAnalyzer)
+
+    def full():
+        counts = use_case._condition_counts(new_df)
+        rollup = use_case.financial_rollup.build(new_frame)
+        report = DocumentAnalyzer.generate_duplicate_report(duplicate_report_host, new_df)
+        return counts, rollup, report
+
+    # Indeks baris dibangun sekali per versi sheet (artifact snapshot) dan diukur terpisah
+    rows = service.index_rows(new_frame)
+
+    def incremental():
+        delta = service.diff(baseline, rows)
+        counts = service.update_condition_counts(baseline.condition_counts, delta, use_case._condition_counts)
+        rollup = service.update_financial_rollup(baseline.financial_rollup, delta, rows, new_frame)
+        duplicate_keys = service.update_duplicate_keys(baseline.duplicate_keys, delta, rows)
+        report = DocumentAnalyzer.generate_duplicate_report(duplicate_report_host, new_df, duplicate_keys)
+        return counts, rollup, report, delta
+
+    expected, actual = full(), incremental()
+    delta = actual[3]
+    pd.testing.assert_frame_equal(actual[0], expected[0], check_dtype=False, check_index_type=False)
+    dump = lambda value: json.dumps(value, default=str)
+    assert dump(actual[1]) == dump(expected[1]), f"Rollup berbeda:\n{dump(actual[1])}\n---\n{dump(expected[1])}"
+    assert actual[2] == expected[2], "Laporan duplikasi berbeda"
+    print(f"Output identik: {len(new_frame)} baris, selisih {delta.describe()}")
+
+    for label, func in [
+        ("hitungan penuh", full),
+        ("indeks baris (per versi)", lambda: service.index_rows(new_frame)),
+        ("selisih + pembaruan agregat", incremental),
+    ]:
+        best = min(timeit.Timer(func).repeat(repeat=args.repeat, number=1))
+        print(f"{label:<28}: {best * 1000:8.1f} ms (terbaik dari {args.repeat})")
+
+    digest = service.build_digest(baseline, delta, actual[0], TriggerAnalysisUseCase.CONDITION_CATEGORIES, actual[1])
+    document = create_document_encoder(normalizer=normalizer).encode(new_frame)
+    print(f"Prompt ringkasan: dokumen penuh ~{document.token_estimate:,} token ({document.mode}), "
+          f"digest perubahan ~{create_document_encoder().estimate_tokens(len(digest)):,} token")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark query engine QueryAssetsUseCase: engine pandas (bawaan) vs DuckDB.
+Setiap kasus dijalankan atas sheet sintetis yang sama dengan engine pandas, DuckDB yang dipaksa
+selalu memakai SQL (min_rows=0), dan DuckDB dengan ambang bawaan (untuk waktu). Hasil tetap
+dibandingkan sebagai pemeriksaan cepat pada ukuran sheet besar; uji paritasnya sendiri ada di
+tests/test_query_engine_parity.py (python -m pytest tests).
+
+Jalankan dari folder backend (butuh paket duckdb):
+    python benchmarks/bench_query_engines.py --rows 100000
+"""
+import os
+import sys
+import json
+import argparse
+import timeit
+import warnings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_sheet_ingest import build_values
+from app.domain.entities.sheet_snapshot import SheetSnapshot
+from app.domain.use_cases.analysis.query_assets import QueryAssetsUseCase
+from app.infrastructure.services.asset_query_engine import PandasQueryEngine
+from app.infrastructure.services.duckdb_query_engine import DuckDBQueryEngine
+from app.infrastructure.services.sheet_cache_service import SheetCacheService
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
+
+CASES = [
+    {},
+    {"nama_aset": "server"},
+    {"nama_aset": "server", "area": "duri", "kondisi": "rusak"},
+    {"manufaktur": "h.", "limit": 50},
+    {"manufaktur": "hp", "calculation": "count"},
+    {"model_type": "MDL-4", "sort_by": "nilai", "sort_direction": "descending", "limit": 25},
+    {"serial_number": "SN12", "sort_by": "NO ASSET", "limit": 40},
+    {"nilai_aset_min": 3000000, "nilai_aset_max": 6000000, "calculation": "sum_value"},
+    {"nilai_aset_min": 8000000, "sort_by": "nilai", "limit": 10, "calculation": "sum_value"},
+    {"start_date": "2022-04-05", "end_date": "2022-04-10", "limit": 30},
+    {"start_date": "2022-04-20", "kondisi_not": "Baik", "calculation": "count"},
+    {"kode_lokasi_sap": "LOC1, LOC7", "nama_aset": "print", "sort_by": "tanggal", "sort_direction": "descending"},
+    {"task": "get_distribution_analysis", "group_by_field": "KODE LOKASI SAP", "nama_aset": "pc"},
+    {"task": "get_distribution_analysis", "group_by_field": "MODEL/TYPE", "manufaktur": "de.l"},
+    {"task": "get_top_values", "group_by_field": "MODEL/TYPE", "area": "minas", "nama_aset": "router", "limit": 7},
+    {"task": "get_top_per_group", "group_by_field": "AREA", "count_field": "MODEL/TYPE"},
+    {"task": "get_top_per_group", "group_by_field": "KODE LOKASI SAP", "count_field": "MANUFACTURE", "nilai_aset_min": 5000000},
+    {"task": "breakdown", "group_by_field": "KODE LOKASI SAP", "count_field": "MODEL/TYPE", "nama_aset": "server"},
+    {"task": "breakdown", "group_by_field": "AREA", "count_field": "KONDISI", "model_type": "MDL-1"},
+    {"task": "breakdown", "group_by_field": "AREA", "count_field": "KONDISI", "nama_aset": "tidak-ada"},
+    {"nama_aset": "(server|router)", "page_size": 100},
+]
+
+class InMemoryAssetDataSource:
+    """Data source minimal: satu sheet sintetis lewat SheetCacheService (versi + artifact)."""
+    def __init__(self, dataframe):
+        self.dataframe = dataframe
+        self.cache = SheetCacheService()
+
+    def fetch_snapshot(self, sheet_name, spreadsheet_id=None):
+        entry = self.cache.get_or_load(('bench', sheet_name), lambda: self.dataframe)
+        return SheetSnapshot('bench', sheet_name, entry.version, entry.dataframe, entry.artifacts)
+
+def sort_key_of(case):
+    sort_by = str(case.get("sort_by") or "").upper()
+    if not sort_by and (case.get("start_date") or case.get("end_date")):
+        sort_by = "TANGGAL"
+    return {"NILAI": "NILAI ASET", "TANGGAL": "TANGGAL INVENTORY"}.get(sort_by, sort_by) or None
+
+def same_result(case, expected, actual) -> bool:
+    dump = lambda value: json.dumps(value, default=str, sort_keys=True)
+    if dump(expected) == dump(actual):
+        return True
+    # Pengurutan pandas tidak stabil untuk nilai kunci yang sama: bandingkan urutan kunci dan himpunan baris
+    key = sort_key_of(case)
+    rows_expected = expected["data"] if isinstance(expected, dict) and "data" in expected else expected
+    rows_actual = actual["data"] if isinstance(actual, dict) and "data" in actual else actual
+    if not key or not isinstance(rows_expected, list) or not isinstance(rows_actual, list):
+        return False
+    keys = [row.get(key) for row in rows_expected]
+    if keys != [row.get(key) for row in rows_actual]:
+        return False
+    # Jika limit memotong di tengah kelompok nilai yang sama, baris kelompok terakhir boleh berbeda
+    truncated = case.get("limit") and len(rows_expected) == case["limit"]
+    boundary = keys[-1] if truncated and keys else object()
+    comparable = lambda rows: sorted(dump(row) for row in rows if row.get(key) != boundary)
+    return comparable(rows_expected) == comparable(rows_actual)
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, default=100000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+    # Pola regex dengan grup (mis. '(server|router)') memicu UserWarning pandas str.contains
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    dataframe = SheetValuesParser().to_dataframe(build_values(args.rows))
+    data_source = InMemoryAssetDataSource(dataframe)
+    engines = {
+        "pandas": QueryAssetsUseCase(data_source, engine=PandasQueryEngine()),
+        "duckdb (sql)": QueryAssetsUseCase(data_source, engine=DuckDBQueryEngine(min_rows=0)),
+        "duckdb (auto)": QueryAssetsUseCase(data_source, engine=DuckDBQueryEngine()),
+    }
+
+    failures = 0
+    print(f"Sheet sintetis: {len(dataframe)} baris")
+    print(f"{'kasus':<80} " + " ".join(f"{name:>14}" for name in engines) + "  paritas")
+    for case in CASES:
+        results, timings = {}, {}
+        for name, use_case in engines.items():
+            results[name] = use_case.execute(**case)
+            timer = timeit.Timer(lambda: use_case.execute(**case))
+            timings[name] = min(timer.repeat(repeat=args.repeat, number=1)) * 1000
+        ok = all(same_result(case, results["pandas"], results[name]) for name in engines if name != "pandas")
+        failures += not ok
+        print(f"{json.dumps(case)[:80]:<80} " + " ".join(f"{timings[name]:12.1f}ms" for name in engines) + f"  {'OK' if ok else 'BERBEDA'}")
+
+    if failures:
+        print(f"{failures} kasus berbeda antara engine pandas dan DuckDB.")
+        sys.exit(1)
+    print("Semua kasus identik.")
+
+if __name__ == "__main__":
+    main()
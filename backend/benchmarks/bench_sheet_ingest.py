@@ -0,0 +1,85 @@
+"""
+Micro-benchmark ingest sheet: membandingkan SheetValuesParser.to_dataframe (vektor)
+dengan loop normalisasi baris per baris versi sebelumnya, sekaligus memastikan hasilnya identik.
+
+Jalankan dari folder backend:
+    python benchmarks/bench_sheet_ingest.py --rows 50000
+"""
+import os
+import sys
+import copy
+import random
+import argparse
+import timeit
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.infrastructure.services.sheet_values_parser import SheetValuesParser
+
+HEADER = [
+    'NO', 'NO ASSET', 'NAMA ASET', 'KONDISI', 'AREA', 'MANUFACTURE', 'MODEL/TYPE',
+    'SERIAL NUMBER', 'KODE LOKASI SAP', 'NILAI ASET', 'TANGGAL INVENTORY', 'HASIL INVENTORY',
+    'PIC TEAM FAV', 'KETERANGAN', 'LOKASI SPESIFIK PER-INVENTORY', 'TANGGAL UPDATE'
+]
+
+def build_values(rows: int, seed: int = 42):
+    """Membuat nilai mentah mirip respons values.get: baris ragged, baris kosong, dan judul di atas header."""
+    rng = random.Random(seed)
+    values = [['LAPORAN INVENTARIS ASET'], [], HEADER]
+    for i in range(rows):
+        if rng.random() < 0.01:
+            values.append([] if rng.random() < 0.5 else ['', '  '])
+            continue
+        row = [
+            str(i + 1), str(100000 + i), rng.choice(['PRINTER HP', 'SERVER DELL', 'ROUTER CISCO', 'PC LENOVO']),
+            rng.choice(['Baik', 'Rusak Ringan', 'Rusak Berat', 'Tidak Ditemukan']),
+            rng.choice(['DURI', 'COASTAL', 'MINAS', 'BENGKALIS']), rng.choice(['HP', 'DELL', 'CISCO']),
+            f"MDL-{rng.randint(1, 500)}", f"SN{rng.randint(10**6, 10**7)}", f"LOC{rng.randint(1, 80)}",
+            f"{rng.randint(1, 9)}.{rng.randint(100, 999)}.000", f"{rng.randint(1, 28):02d}-Apr-2022",
+            rng.choice(['Match', 'Not Match']), 'TEAM A', rng.choice(['-', 'Perlu cek']), 'GEDUNG 1', '03/04/2022'
+        ]
+        cut = rng.choice([len(row), len(row), len(row) - 3, 9, len(row) + 2])
+        values.append((row + ['EXTRA', 'EXTRA'])[:cut])
+    return values
+
+def legacy_to_dataframe(parser: SheetValuesParser, values):
+    """Implementasi normalisasi berbasis loop Python sebelum versi vektor (referensi)."""
+    header, header_row_index = parser.find_header_row(values)
+    if header_row_index == -1:
+        return pd.DataFrame()
+    unique_header = parser.make_unique_columns([' '.join(str(col).strip().split()) for col in header])
+    num_expected_cols = len(unique_header)
+    normalized_data = []
+    for row in values[header_row_index + 1:]:
+        if not any(str(cell).strip() for cell in row): continue
+        if len(row) < num_expected_cols:
+            row.extend([None] * (num_expected_cols - len(row)))
+        normalized_data.append(row[:num_expected_cols])
+    if not normalized_data:
+        return pd.DataFrame()
+    return pd.DataFrame(normalized_data, columns=unique_header)
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rows", type=int, default=50000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    parser = SheetValuesParser()
+    values = build_values(args.rows)
+
+    expected = legacy_to_dataframe(parser, copy.deepcopy(values))
+    actual = parser.to_dataframe(copy.deepcopy(values))
+    pd.testing.assert_frame_equal(actual, expected)
+    print(f"Output identik: {actual.shape[0]} baris x {actual.shape[1]} kolom")
+
+    # Salinan dibuat di luar pengukuran karena versi lama memodifikasi baris input (row.extend)
+    for label, func in [("loop (lama)", legacy_to_dataframe), ("vektor (baru)", lambda p, v: p.to_dataframe(v))]:
+        copies = [copy.deepcopy(values) for _ in range(args.repeat)]
+        timer = timeit.Timer(lambda: func(parser, copies.pop()))
+        best = min(timer.repeat(repeat=args.repeat, number=1))
+        print(f"{label:<15}: {best * 1000:8.1f} ms (terbaik dari {args.repeat})")
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,10 @@ import uvicorn
 import logging
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from app.infrastructure.database.database import engine, Base
+from app.infrastructure.database.database import engine, Base, add_missing_columns
 from app.presentation.routes import web_api
 from app.presentation.protocols.mcp_server import McpServer
+from app.dependencies import async_asset_data_source_instance
 
 # Konfigurasi Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - [%(levelname)s] - %(message)s')
@@ -13,6 +14,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - [%(levelname)s] -
 # --- Inisialisasi Tabel Database ---
 try:
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
     logging.info("Tabel database berhasil diperiksa/dibuat.")
 except Exception as e:
     logging.error(f"Gagal membuat tabel database: {e}", exc_info=True)
@@ -44,6 +46,11 @@ app.add_middleware(
 app.include_router(web_api.router) 
 logging.info("REST API router berhasil didaftarkan di /api/web.")
 
+# --- Shutdown: tutup pool koneksi HTTP Google Sheets ---
+@app.on_event("shutdown")
+async def shutdown_event():
+    await async_asset_data_source_instance.aclose()
+
 # --- Endpoint Root ---
 @app.get("/", tags=["Root"])
 async def root():
@@ -65,7 +72,8 @@ async def mcp_websocket_endpoint(websocket: WebSocket):
             request_data = await websocket.receive_json()
             response_data = await mcp_server.handle_request(request_data, websocket)
             if response_data:
-                await websocket.send_json(response_data)
+                # Respons diserialisasi sekali dengan orjson (termasuk hasil kolumnar NumPy)
+                await websocket.send_text(mcp_server.encode_response(response_data))
                 
     except WebSocketDisconnect:
         logging.info(f"Klien MCP terputus: {websocket.client.host}")
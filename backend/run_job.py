@@ -7,7 +7,7 @@ import pytz
 # Menambahkan path agar bisa membaca modul 'app'
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.infrastructure.database.database import SessionLocal, engine, Base
+from app.infrastructure.database.database import SessionLocal, engine, Base, add_missing_columns
 from app.dependencies import AppContainer
 from app.presentation.schemas import AnalysisOptions
 
@@ -48,6 +48,7 @@ def run_daily_automation():
     try:
         # 1. Pastikan tabel database sinkron
         Base.metadata.create_all(bind=engine)
+        add_missing_columns()
         logger.info("Koneksi database stabil dan skema diverifikasi.")
 
         # 2. Tentukan sheet berdasarkan waktu saat ini
@@ -62,7 +63,9 @@ def run_daily_automation():
             insight=True,
             check_duplicates=True,
             financial_analysis=True,
-            sheet_name=target_sheet 
+            sheet_name=target_sheet,
+            # Antar hari hanya sebagian kecil aset berubah: bandingkan dengan riwayat tersimpan terakhir
+            incremental=True
         )
 
         # 4. Ambil Use Case dari Container
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tes dijalankan dari folder backend: 'app' dan data sintetis di 'benchmarks' harus bisa diimpor
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)